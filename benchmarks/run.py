@@ -0,0 +1,249 @@
+"""
+Performance benchmarks, run fully offline against the fake PokéAPI.
+
+    python benchmarks/run.py                          # write benchmarks/results.json
+    python benchmarks/run.py --save-baseline          # ... and benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json --threshold 0.25
+
+With --baseline the run exits non-zero when any metric is worse than the
+baseline by more than --threshold (a fraction).
+"""
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import asyncio
+import json
+import platform
+import random
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEARCH_QUERIES = ["pika", "char", "saur", "pikachu", "chrmander", "mew", "dra"]
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict[str, Any]:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+async def bench_resources(http, session, latency: float, cold: int, warm: int) -> Dict[str, Any]:
+    """Cold: a Pokémon no tier has seen (upstream + normalize + store). Warm: memory hit."""
+    from src.pokemon.testing import KANTO
+    session.latency = latency
+    cold_ms = []
+    for name in [n for n in KANTO if n not in ("pikachu", "eevee")][:cold]:
+        start = time.perf_counter()
+        r = await http.get(f"/resources/pokemon/{name}")
+        cold_ms.append((time.perf_counter() - start) * 1e3)
+        r.raise_for_status()
+    warm_us = []
+    for _ in range(warm):
+        start = time.perf_counter()
+        r = await http.get("/resources/pokemon/pikachu")
+        warm_us.append((time.perf_counter() - start) * 1e6)
+    session.latency = 0.0
+    return {
+        "resource.cold.p50_ms": _metric(_percentile(cold_ms, 0.5), "ms"),
+        "resource.warm.p50_us": _metric(_percentile(warm_us, 0.5), "us"),
+        "resource.warm.p99_us": _metric(_percentile(warm_us, 0.99), "us"),
+    }
+
+
+def bench_normalize(session, repeat: int) -> Dict[str, Any]:
+    """normalize_pokemon on a raw document, with moves and chain already in the client caches."""
+    from src.pokemon.poke_client import PokeAPIClient
+    from src.pokemon.normalizer import normalize_pokemon
+    api = PokeAPIClient()
+    api.session = session
+    raw = api.get_pokemon("pikachu")
+    normalize_pokemon(raw, api)
+    return {"normalize_pokemon.us": _metric(_per_call_us(lambda: normalize_pokemon(raw, api), repeat), "us")}
+
+
+def bench_search(sizes: List[int], repeat: int) -> Dict[str, Any]:
+    """Ranked name search against rosters of increasing size."""
+    from src.pokemon.name_index import NameIndex
+    from src.pokemon.testing import KANTO
+    out = {}
+    for size in sizes:
+        names = list(KANTO) + [f"{KANTO[i % len(KANTO)]}-{i}" for i in range(max(0, size - len(KANTO)))]
+        index = NameIndex(names[:size])
+        queries = iter(SEARCH_QUERIES * repeat)
+        us = _per_call_us(lambda: index.search(next(queries)), repeat * len(SEARCH_QUERIES))
+        out[f"search.{size}.us"] = _metric(us, "us")
+    return out
+
+
+def bench_simulator(battles: int, vectorized_battles: int) -> Dict[str, Any]:
+    """Scalar simulator turns/sec and battles/sec, plus the lockstep kernel."""
+    from src.battle.simulator import simulate_battle, load_pokemon
+    from src.battle.compiled import compile_matchup
+    from src.battle import vectorized
+    p1, p2 = load_pokemon("pikachu"), load_pokemon("eevee")
+    matchup = compile_matchup(p1, p2)
+    out = {}
+    for label, log_level in (("none", "none"), ("text", "text")):
+        rng = random.Random(7)
+        turns = 0
+        start = time.perf_counter()
+        for _ in range(battles):
+            turns += simulate_battle(p1, p2, deterministic=False, rng=rng, log_level=log_level,
+                                     matchup=matchup)["turns"]
+        elapsed = time.perf_counter() - start
+        out[f"simulator.{label}.battles_per_sec"] = _metric(battles / elapsed, "1/s", "higher")
+        out[f"simulator.{label}.turns_per_sec"] = _metric(turns / elapsed, "1/s", "higher")
+    start = time.perf_counter()
+    vectorized.simulate_many(p1, p2, vectorized_battles, seed=7)
+    out["vectorized.battles_per_sec"] = _metric(vectorized_battles / (time.perf_counter() - start), "1/s", "higher")
+    return out
+
+
+async def bench_load(http, requests_total: int, concurrency: int) -> Dict[str, Any]:
+    """End-to-end latency of a warm request mix under concurrent load."""
+    from src.pokemon.testing import KANTO
+    names = KANTO[:40]
+    rng = random.Random(3)
+    plan = []
+    for _ in range(requests_total):
+        roll = rng.random()
+        if roll < 0.6:
+            plan.append(("GET", f"/resources/pokemon/{rng.choice(names)}", None))
+        elif roll < 0.8:
+            plan.append(("GET", f"/resources/pokemon?search={rng.choice(SEARCH_QUERIES)}", None))
+        else:
+            plan.append(("POST", "/tools/battle", {"pokemon1": rng.choice(names), "pokemon2": rng.choice(names),
+                                                    "deterministic": rng.random() < 0.5, "log_level": "structured"}))
+    # Warm the tiers and the search index first.
+    for name in names:
+        await http.get(f"/resources/pokemon/{name}")
+    await http.get("/resources/pokemon?search=pika")
+
+    queue = iter(plan)
+    latencies: List[float] = []
+
+    async def worker():
+        for method, url, body in queue:
+            start = time.perf_counter()
+            r = await http.request(method, url, json=body)
+            latencies.append((time.perf_counter() - start) * 1e3)
+            r.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "e2e.p50_ms": _metric(_percentile(latencies, 0.5), "ms"),
+        "e2e.p99_ms": _metric(_percentile(latencies, 0.99), "ms"),
+        "e2e.requests_per_sec": _metric(len(latencies) / elapsed, "1/s", "higher"),
+    }
+
+
+async def _run_http(args, session) -> Dict[str, Any]:
+    import httpx
+    from src.server import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        metrics = await bench_resources(http, session, args.latency, args.cold, args.warm)
+        metrics.update(await bench_load(http, args.requests, args.concurrency))
+    return metrics
+
+
+def run(args) -> Dict[str, Any]:
+    # The server keeps its store in ./data: run against a scratch directory.
+    os.chdir(tempfile.mkdtemp(prefix="pokemon-bench-"))
+    from src.pokemon.poke_client import client
+    from src.pokemon.testing import FakePokeAPISession
+    session = FakePokeAPISession()
+    client.session = session
+
+    metrics = asyncio.run(_run_http(args, session))
+    metrics.update(bench_normalize(session, args.repeat))
+    metrics.update(bench_search(args.search_sizes, args.repeat))
+    metrics.update(bench_simulator(args.battles, args.vectorized_battles))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "fake_latency_s": args.latency,
+            "quick": args.quick,
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Metrics worse than the baseline by more than `threshold` (fraction)."""
+    regressions = []
+    for name, metric in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base or not base["value"]:
+            continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        worse = change > threshold if metric["better"] == "lower" else change < -threshold
+        if worse:
+            regressions.append(f"{name}: {base['value']} -> {metric['value']} {metric['unit']} ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("--output", default=os.path.join(HERE, "results.json"))
+    parser.add_argument("--baseline", help="Fail on regressions against this results file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing (fraction)")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write benchmarks/baseline.json")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake upstream latency per request (s)")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for CI smoke runs")
+    args = parser.parse_args(argv)
+    args.output = os.path.abspath(args.output)
+    if args.baseline:
+        args.baseline = os.path.abspath(args.baseline)
+    scale = 0.1 if args.quick else 1.0
+    args.cold = max(3, int(30 * scale))
+    args.warm = max(50, int(2000 * scale))
+    args.repeat = max(20, int(500 * scale))
+    args.search_sizes = [151, 1000, 10000]
+    args.battles = max(100, int(5000 * scale))
+    args.vectorized_battles = max(1000, int(100_000 * scale))
+    args.requests = max(100, int(3000 * scale))
+    args.concurrency = 32
+
+    results = run(args)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(os.path.join(HERE, "baseline.json"), "w") as f:
+            json.dump(results, f, indent=2)
+
+    width = max(len(name) for name in results["metrics"])
+    for name, metric in results["metrics"].items():
+        print(f"{name:<{width}}  {metric['value']:>14,.3f} {metric['unit']}")
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nregressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
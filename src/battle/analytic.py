@@ -0,0 +1,250 @@
+# src/battle/analytic.py
+"""
+Exact battle odds without sampling.
+
+Under greedy move choice every random draw in iter_battle (which of the top
+moves the greedy pick takes, the 25% paralysis roll, the uniform(0.85, 1.0)
+damage roll, the speed-tie coin) is independent of the HP left, so each
+side's damage per action has one fixed distribution. The battle is then a
+Markov chain on (HP1, HP2): battle_odds propagates the probability of every
+HP pair turn by turn (a shifted sum per damage value, in NumPy) and collects
+the mass that faints, giving outcome, turn-count and remaining-HP
+distributions in milliseconds.
+
+Damage probabilities are exact: for a move dealing floor(k * rand), the
+roll yields d for rand in [d / k, (d + 1) / k), so its probability is that
+interval's share of [0.85, 1.0].
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.pokemon.models import PokemonResource
+from src.battle.compiled import CompiledCombatant, CompiledMove, TOP_MOVES, compile_matchup
+
+# Conditions iter_battle applies: paralysis (speed, 25% stuck), burn and poison.
+STATUSES = ("burn", "paralysis", "poison")
+ROLL_LOW, ROLL_HIGH = 0.85, 1.0
+PARALYSIS_STUCK = 0.25
+
+Distribution = List[Tuple[int, float]]
+
+
+def _merge(outcomes: Sequence[Tuple[int, float]]) -> Distribution:
+    merged: Dict[int, float] = {}
+    for damage, p in outcomes:
+        if p > 0:
+            merged[damage] = merged.get(damage, 0.0) + p
+    return sorted(merged.items())
+
+
+def damage_distribution(move: CompiledMove, burned: bool = False, deterministic: bool = False) -> Distribution:
+    """[(damage, probability)] of one hit of `move` over the damage roll."""
+    if not move.has_power:
+        return [(0, 1.0)]
+    if deterministic:
+        return [(move.damage(1.0, burned), 1.0)]
+    k = move.base * move.mult * (0.5 if move.is_physical and burned else 1.0)
+    if k < 1:
+        # floor(k * rand) is 0 for every roll (e.g. an immune defender): damage's minimum of 1.
+        return [(1, 1.0)]
+    span = ROLL_HIGH - ROLL_LOW
+    outcomes = []
+    for d in range(math.floor(k * ROLL_LOW), math.floor(k * ROLL_HIGH) + 1):
+        low, high = max(ROLL_LOW, d / k), min(ROLL_HIGH, (d + 1) / k)
+        if high > low:
+            # CompiledMove.damage: at least 1
+            outcomes.append((max(1, d), (high - low) / span))
+    return _merge(outcomes)
+
+
+def action_distribution(combatant: CompiledCombatant, status: Sequence[str] = (),
+                        deterministic: bool = False) -> Distribution:
+    """Damage dealt by one of `combatant`'s actions: move choice, paralysis and roll combined."""
+    if not combatant.ranked:
+        return [(0, 1.0)]
+    if deterministic or combatant.fallback:
+        moves = [(combatant.ranked[0], 1.0)]
+    else:
+        top = combatant.ranked[:TOP_MOVES]
+        moves = [(m, 1.0 / len(top)) for m in top]
+    burned = "burn" in status
+    outcomes = [(d, p_move * p) for m, p_move in moves for d, p in damage_distribution(m, burned, deterministic)]
+    if "paralysis" in status:
+        # iter_battle: always stuck when deterministic, 25% otherwise.
+        stuck = 1.0 if deterministic else PARALYSIS_STUCK
+        outcomes = [(0, stuck)] + [(d, p * (1 - stuck)) for d, p in outcomes]
+    return _merge(outcomes)
+
+
+def _end_of_turn(max_hp: int, status: Sequence[str]) -> int:
+    """apply_status_end_of_turn's damage."""
+    damage = 0
+    if "poison" in status:
+        damage += math.floor(max_hp / 8)
+    if "burn" in status:
+        damage += math.floor(max_hp / 16)
+    return damage
+
+
+def _hit(live: np.ndarray, dist: Distribution, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One attack on the side along `axis` of `live` (probability by HP pair).
+    Returns the surviving mass and, indexed by the attacker's HP, the mass
+    that fainted.
+    """
+    view = live if axis == 1 else live.T
+    size = view.shape[1]
+    out = np.zeros_like(view)
+    fainted = np.zeros(view.shape[0])
+    for d, p in dist:
+        if d == 0:
+            out += p * view
+            continue
+        if d < size - 1:
+            out[:, 1:size - d] += p * view[:, 1 + d:]
+        fainted += p * view[:, :min(d, size - 1) + 1].sum(axis=1)
+    return (out if axis == 1 else out.T), fainted
+
+
+class _Tally:
+    """
+    Probability of each outcome by turn, and the expected HP left at the end.
+    The per-turn arrays grow with the turns actually reached, not max_turns.
+    """
+
+    def __init__(self, size: int = 64):
+        self.wins = {"p1": np.zeros(size), "p2": np.zeros(size), "draw": np.zeros(size)}
+        self.hp = {"p1": 0.0, "p2": 0.0}
+        self.last = 0
+
+    def add(self, side: str, turn: int, mass: float, hp1: float = 0.0, hp2: float = 0.0) -> None:
+        size = len(self.wins[side])
+        if turn >= size:
+            grown = max(turn + 1, 2 * size)
+            self.wins = {k: np.concatenate([w, np.zeros(grown - size)]) for k, w in self.wins.items()}
+        self.last = max(self.last, turn)
+        self.wins[side][turn] += mass
+        self.hp["p1"] += hp1
+        self.hp["p2"] += hp2
+
+
+def _turn(live: np.ndarray, first: str, d1: Distribution, d2: Distribution, tally: _Tally, turn: int) -> np.ndarray:
+    """One turn's attacks in the given order; fainting mass goes to `tally`."""
+    hp1 = np.arange(live.shape[0])
+    hp2 = np.arange(live.shape[1])
+    if first == "p1":
+        live, fainted = _hit(live, d1, axis=1)
+        tally.add("p1", turn, fainted.sum(), hp1=(fainted * hp1).sum())
+        live, fainted = _hit(live, d2, axis=0)
+        tally.add("p2", turn, fainted.sum(), hp2=(fainted * hp2).sum())
+    else:
+        live, fainted = _hit(live, d2, axis=0)
+        tally.add("p2", turn, fainted.sum(), hp2=(fainted * hp2).sum())
+        live, fainted = _hit(live, d1, axis=1)
+        tally.add("p1", turn, fainted.sum(), hp1=(fainted * hp1).sum())
+    return live
+
+
+def _apply_end_of_turn(live: np.ndarray, e1: int, e2: int, tally: _Tally, turn: int) -> np.ndarray:
+    if not e1 and not e2:
+        return live
+    rows, cols = live.shape
+    out = np.zeros_like(live)
+    if e1 < rows - 1 and e2 < cols - 1:
+        out[1:rows - e1, 1:cols - e2] = live[1 + e1:, 1 + e2:]
+    # p2 down, p1 up / p1 down, p2 up / both down
+    p1_wins = live[1 + e1:, :e2 + 1]
+    tally.add("p1", turn, p1_wins.sum(), hp1=(p1_wins.sum(axis=1) * np.arange(1, p1_wins.shape[0] + 1)).sum())
+    p2_wins = live[:e1 + 1, 1 + e2:]
+    tally.add("p2", turn, p2_wins.sum(), hp2=(p2_wins.sum(axis=0) * np.arange(1, p2_wins.shape[1] + 1)).sum())
+    tally.add("draw", turn, live[:e1 + 1, :e2 + 1].sum())
+    return out
+
+
+def _percentile(cdf: np.ndarray, q: float) -> int:
+    return int(min(len(cdf) - 1, np.searchsorted(cdf, q - 1e-12)))
+
+
+def battle_odds(p1: PokemonResource, p2: PokemonResource, level: int = 50, max_turns: int = 200,
+                deterministic: bool = False, status1: Sequence[str] = (), status2: Sequence[str] = (),
+                matchup: Optional[Tuple[CompiledCombatant, CompiledCombatant]] = None) -> Dict[str, Any]:
+    """
+    Exact outcome distribution of simulate_battle(p1, p2) under greedy move
+    choice: win/draw probabilities, the turn-count distribution and mean
+    remaining HP (the fields run_batch estimates by sampling).
+    Battles start without status conditions; `status1`/`status2` instead
+    assume statuses held for the whole battle (e.g. ["paralysis"]).
+    """
+    if max_turns < 1:
+        raise ValueError("max_turns must be at least 1")
+    c1, c2 = matchup or compile_matchup(p1, p2, level)
+    d1 = action_distribution(c1, status1, deterministic)
+    d2 = action_distribution(c2, status2, deterministic)
+    e1, e2 = _end_of_turn(c1.max_hp, status1), _end_of_turn(c2.max_hp, status2)
+
+    s1 = math.floor(c1.speed * 0.5) if "paralysis" in status1 else c1.speed
+    s2 = math.floor(c2.speed * 0.5) if "paralysis" in status2 else c2.speed
+    if s1 != s2:
+        orders = [("p1" if s1 > s2 else "p2", 1.0)]
+    elif deterministic:
+        orders = [("p1", 1.0)]
+    else:
+        orders = [("p1", 0.5), ("p2", 0.5)]
+
+    tally = _Tally(min(max_turns + 1, 64))
+    h1, h2 = max(0, c1.max_hp), max(0, c2.max_hp)
+    live = np.zeros((h1 + 1, h2 + 1))
+    live[h1, h2] = 1.0
+    turns_played = max_turns
+    for turn in range(1, max_turns + 1):
+        if h1 == 0 or h2 == 0:
+            # Nobody can act on a fainted side; the end of turn 1 decides.
+            break
+        if len(orders) == 1:
+            live = _turn(live, orders[0][0], d1, d2, tally, turn)
+        else:
+            live = sum(_turn(weight * live, first, d1, d2, tally, turn) for first, weight in orders)
+        live = _apply_end_of_turn(live, e1, e2, tally, turn)
+        if not live.any():
+            turns_played = turn
+            break
+    if h1 == 0 or h2 == 0:
+        live[...] = 0.0
+        side = "draw" if h1 == h2 == 0 else ("p2" if h1 == 0 else "p1")
+        tally.add(side, 1, 1.0, hp1=h1, hp2=h2)
+        turns_played = 1
+    # Still standing after max_turns: a draw.
+    left = live.sum()
+    if left:
+        tally.add("draw", max_turns, left, hp1=(live.sum(axis=1) * np.arange(h1 + 1)).sum(),
+                  hp2=(live.sum(axis=0) * np.arange(h2 + 1)).sum())
+
+    wins = {side: w[:tally.last + 1] for side, w in tally.wins.items()}
+    by_turn = wins["p1"] + wins["p2"] + wins["draw"]
+    cdf = np.cumsum(by_turn)
+    total = float(cdf[-1])
+    nonzero = np.nonzero(by_turn)[0]
+    return {
+        "pokemon1": p1.name,
+        "pokemon2": p2.name,
+        "level": level,
+        "deterministic": deterministic,
+        "outcomes": {side: float(w.sum()) for side, w in wins.items()},
+        "turns": {
+            "mean": float((by_turn * np.arange(len(by_turn))).sum() / total),
+            "min": int(nonzero[0]),
+            "p50": _percentile(cdf / total, 0.5),
+            "p90": _percentile(cdf / total, 0.9),
+            "max": int(min(turns_played, nonzero[-1])),
+            "distribution": {str(t): float(by_turn[t]) for t in nonzero},
+        },
+        "mean_remaining_hp": {
+            "p1": tally.hp["p1"],
+            "p2": tally.hp["p2"],
+            "p1_fraction": tally.hp["p1"] / max(1, p1.base_stats["hp"]),
+            "p2_fraction": tally.hp["p2"] / max(1, p2.base_stats["hp"]),
+        },
+        "damage_per_action": {"p1": {str(d): p for d, p in d1}, "p2": {str(d): p for d, p in d2}},
+    }
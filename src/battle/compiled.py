@@ -0,0 +1,135 @@
+# src/battle/compiled.py
+"""
+Per-battle precomputation, and the one definition of move choice and
+damage. Everything derived from the two PokemonResources (type ids, STAB,
+type multipliers, base damage, move ranking) is fixed for a whole battle, so
+it is computed once here and the turn loop only does arithmetic.
+
+Moves are scored power * 1.5 (STAB) * type multiplier. Damage is
+floor(base * stab * type_mult * rand), halved for physical moves of a burned
+attacker and at least 1, where base = ((2L/5 + 2) * power * atk/def) / 50 + 2.
+"""
+import hashlib
+import json
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.pokemon.models import PokemonResource, MoveShort
+from src.battle.type_chart import type_id, effectiveness
+
+# Moves are picked among this many best-scored ones when not deterministic.
+TOP_MOVES = 3
+
+
+def battle_fingerprint(resource: PokemonResource) -> str:
+    """
+    Content hash of everything a battle reads from a resource (name, stats,
+    types, moves). Changes whenever the underlying data changes.
+    """
+    payload = {
+        "name": resource.name,
+        "base_stats": resource.base_stats,
+        "types": resource.types,
+        "moves": [[m.name, m.type, m.power, m.damage_class] for m in resource.moves],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class CompiledMove:
+    """One move of one attacker against one specific defender."""
+
+    __slots__ = ("move", "score", "base", "stab", "type_mult", "mult", "is_physical", "has_power")
+
+    def __init__(self, move: MoveShort, score: float, base: float, stab: float, type_mult: float,
+                 is_physical: bool, has_power: bool):
+        self.move = move
+        self.score = score
+        self.base = base
+        self.stab = stab
+        self.type_mult = type_mult
+        self.mult = stab * type_mult
+        self.is_physical = is_physical
+        self.has_power = has_power
+
+    def damage(self, rand: float, burned: bool) -> int:
+        """Damage of this move given the random factor."""
+        modifier = self.mult * rand
+        if self.is_physical and burned:
+            modifier *= 0.5
+        damage = math.floor(self.base * modifier)
+        return damage if damage >= 1 else 1
+
+    def detail(self, rand: float, burned: bool) -> Dict[str, Any]:
+        """Breakdown of damage() (only built when logging)."""
+        if not self.has_power:
+            return {"reason": "move has no power"}
+        modifier = self.mult * rand
+        if self.is_physical and burned:
+            modifier *= 0.5
+        return {"base": self.base, "stab": self.stab, "type_mult": self.type_mult, "rand": rand,
+                "modifier": modifier, "final_damage": self.damage(rand, burned)}
+
+
+class CompiledCombatant:
+    """A PokemonResource reduced to the scalars one battle needs."""
+
+    __slots__ = ("name", "max_hp", "speed", "type_ids", "ranked", "fallback")
+
+    def __init__(self, name: str, max_hp: int, speed: int, type_ids: Tuple[int, ...],
+                 ranked: List[CompiledMove], fallback: bool):
+        self.name = name
+        self.max_hp = max_hp
+        self.speed = speed
+        self.type_ids = type_ids
+        # Moves best-first against the opponent; the pick candidates.
+        self.ranked = ranked
+        # True when no move has power and pick falls back to moves[0].
+        self.fallback = fallback
+
+    def pick(self, deterministic: bool, rng: Optional[random.Random] = None) -> Optional[CompiledMove]:
+        """The best move, or uniform among the top TOP_MOVES."""
+        if not self.ranked:
+            return None
+        if deterministic or self.fallback:
+            return self.ranked[0]
+        return (rng or random).choice(self.ranked[:TOP_MOVES])
+
+
+def _compile_side(attacker: PokemonResource, defender: PokemonResource, level: int) -> CompiledCombatant:
+    attacker_ids = tuple(type_id(t) for t in attacker.types)
+    defender_ids = tuple(type_id(t) for t in defender.types)
+    attacker_types = [t.lower() for t in attacker.types]
+
+    ranked: List[CompiledMove] = []
+    for move in attacker.moves:
+        if move.power is None:
+            continue
+        stab = 1.5 if (move.type and move.type.lower() in attacker_types) else 1.0
+        type_mult = effectiveness(type_id(move.type), defender_ids)
+        score = move.power
+        if stab != 1.0:
+            score *= 1.5
+        score *= type_mult
+
+        is_physical = move.damage_class == "physical"
+        atk = attacker.base_stats["attack"] if is_physical else attacker.base_stats["special_attack"]
+        defe = defender.base_stats["defense"] if is_physical else defender.base_stats["special_defense"]
+        base = (((2 * level) / 5) + 2) * move.power * (atk / max(1, defe))
+        base = base / 50.0 + 2
+        ranked.append(CompiledMove(move, score, base, stab, type_mult, is_physical, move.power != 0))
+    # stable sort, best first: ties keep move order
+    ranked.sort(key=lambda m: m.score, reverse=True)
+
+    fallback = False
+    if not ranked and attacker.moves:
+        ranked = [CompiledMove(attacker.moves[0], 0.0, 0.0, 1.0, 1.0, False, False)]
+        fallback = True
+
+    return CompiledCombatant(attacker.name, attacker.base_stats["hp"], attacker.base_stats["speed"],
+                             attacker_ids, ranked, fallback)
+
+
+def compile_matchup(p1: PokemonResource, p2: PokemonResource, level: int = 50) -> Tuple[CompiledCombatant, CompiledCombatant]:
+    """Compile both sides of a battle, each ranked against the other."""
+    return _compile_side(p1, p2, level), _compile_side(p2, p1, level)
@@ -0,0 +1,216 @@
+# src/battle/jobs.py
+"""
+Asynchronous battle jobs.
+
+Battles and Monte Carlo batches are submitted to the shared process pool
+and tracked by id, so the web process only loads the Pokémon and hands off
+plain dicts: the simulation itself never holds a web worker or the GIL of
+the process serving /resources/*. Admission control caps the number of
+unfinished jobs; beyond it submissions are rejected (HTTP 429) instead of
+growing the pool's queue without bound.
+
+Each job's timeout is derived from the work it may do (max_turns, times n
+for batches, plus the search budget). The worker enforces it from the
+moment it picks the job up: the battle loop stops at its deadline, the
+worker is freed and the job is reported as "timeout". Time spent queued
+is bounded by admission control instead.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.pokemon.models import PokemonResource
+from src.battle.simulator import simulate_battle
+from src.battle.montecarlo import run_batch
+from src.battle.pool import get_pool
+from src import metrics
+
+KINDS = ("battle", "batch")
+
+# Unfinished (queued + running) jobs admitted at once.
+MAX_PENDING = int(os.getenv("BATTLE_JOB_QUEUE", "64"))
+# Finished jobs kept for polling, oldest dropped first.
+MAX_FINISHED = 1000
+
+# Timeout = base + turns * per-turn allowance (+ search time per turn).
+TIMEOUT_BASE = 5.0
+TIMEOUT_PER_TURN = 0.005
+
+FINISHED = ("done", "failed", "timeout", "cancelled")
+
+
+class QueueFull(Exception):
+    """Admission control refused a job; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _run_job(kind: str, p1: Dict[str, Any], p2: Dict[str, Any], options: Dict[str, Any],
+             timeout: float) -> Tuple[float, Dict[str, Any]]:
+    """Worker entry point: (time.time() the job started, result); TimeoutError past `timeout` seconds."""
+    started = time.time()
+    deadline = time.monotonic() + timeout
+    r1, r2 = PokemonResource(**p1), PokemonResource(**p2)
+    if kind == "battle":
+        result = simulate_battle(r1, r2, deadline=deadline, **options)
+    else:
+        # Already inside a pool worker: run the batch in this process.
+        result = run_batch(r1, r2, parallel=False, deadline=deadline, **options)
+    return started, result
+
+
+def job_timeout(kind: str, options: Dict[str, Any]) -> float:
+    """Seconds a job may take, from the number of turns it can simulate."""
+    turns = options.get("max_turns", 200) * (options.get("n", 1000) if kind == "batch" else 1)
+    per_turn = TIMEOUT_PER_TURN
+    if options.get("policy", "greedy") != "greedy":
+        # Up to two searching sides, each bounded per move.
+        per_turn += 2 * (options.get("search_time") or 0.05)
+    return TIMEOUT_BASE + turns * per_turn
+
+
+class Job:
+    __slots__ = ("id", "kind", "future", "submitted", "finished", "timeout", "started", "status", "result", "error")
+
+    def __init__(self, job_id: str, kind: str, timeout: float):
+        self.id = job_id
+        self.kind = kind
+        self.future: Optional[Future] = None
+        self.submitted = time.time()
+        self.finished: Optional[float] = None
+        self.timeout = timeout
+        # time.time() the worker picked the job up, reported with its result
+        self.started: Optional[float] = None
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        out = {"job_id": self.id, "kind": self.kind, "status": self.status, "submitted_at": self.submitted}
+        if self.finished is not None:
+            out["seconds"] = round(self.finished - self.submitted, 6)
+        if self.started is not None:
+            out["started_at"] = self.started
+        if self.status == "done":
+            out["result"] = self.result
+        elif self.error:
+            out["error"] = self.error
+        return out
+
+
+class JobQueue:
+    """Tracks jobs submitted to the process pool, with a cap on unfinished jobs."""
+
+    def __init__(self, max_pending: int = MAX_PENDING, max_finished: int = MAX_FINISHED):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, p1: PokemonResource, p2: PokemonResource, **options: Any) -> Job:
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.battle_jobs.inc("rejected")
+                raise QueueFull(f"{self._pending} battle jobs pending (limit {self.max_pending})")
+            self._pending += 1
+            job = Job(f"{int(time.time())}-{next(self._ids)}", kind, job_timeout(kind, options))
+            self._jobs[job.id] = job
+        try:
+            job.future = get_pool().submit(_run_job, kind, p1.model_dump(), p2.model_dump(), options, job.timeout)
+        except Exception as e:
+            with self._lock:
+                self._pending -= 1
+            self._finish(job, "failed", error=str(e))
+            raise
+        job.future.add_done_callback(lambda future: self._completed(job, future))
+        return job
+
+    def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None) -> None:
+        with self._lock:
+            if job.status in FINISHED:
+                return
+            job.status, job.result, job.error = status, result, error
+            job.finished = time.time()
+            self._trim()
+        metrics.battle_jobs.inc(status)
+        # Workers' own counters stay in their processes: record completed work here.
+        if status == "done" and job.kind == "battle":
+            metrics.record_battles("scalar", 1, result["turns"])
+        elif status == "done":
+            metrics.record_battles(result["engine"], result["n"], round(result["turns"]["mean"] * result["n"]))
+
+    def _completed(self, job: Job, future: Future) -> None:
+        # A timed-out job still holds its worker until here, so it counts as pending until then.
+        with self._lock:
+            self._pending -= 1
+        try:
+            job.started, result = future.result()
+            self._finish(job, "done", result=result)
+        except TimeoutError:
+            self._finish(job, "timeout", error="job exceeded its time limit")
+        except CancelledError:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            self._finish(job, "failed", error=str(e))
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _refresh(self, job: Job) -> None:
+        """Apply the queued -> running transition."""
+        # The pool marks a task running once it is handed to its call queue,
+        # which may be just before a worker picks it up.
+        with self._lock:
+            if job.status == "queued" and job.future is not None and job.future.running():
+                job.status = "running"
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            self._refresh(job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job that has not started; running jobs finish normally."""
+        job = self.get(job_id)
+        if job is not None and job.future is not None and job.future.cancel():
+            self._finish(job, "cancelled")
+        return job
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self._refresh(job)
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"pending": self._pending, "max_pending": self.max_pending, "jobs": counts}
+
+
+job_queue = JobQueue()
+
+
+def _collect_jobs() -> List[str]:
+    return metrics.format_metric("battle_jobs_pending", "Battle jobs queued or running.", "gauge", [],
+                                 {(): job_queue.pending})
+
+
+metrics.registry.register_collector(_collect_jobs)
@@ -0,0 +1,141 @@
+# src/battle/montecarlo.py
+import math
+import random
+import secrets
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.pokemon.models import PokemonResource
+from src.battle.simulator import simulate_battle
+from src.battle.compiled import compile_matchup
+from src.battle import vectorized
+from src.battle.pool import cpu_workers, get_pool
+from src import metrics
+
+ENGINES = ("scalar", "vectorized")
+
+# Below this many runs the process-pool round-trip costs more than it saves.
+MIN_PARALLEL_RUNS = 256
+
+
+def run_rng(seed: int, index: int) -> random.Random:
+    """Independent, reproducible stream for run `index` of a batch seeded with `seed`."""
+    return random.Random(f"{seed}:{index}")
+
+
+def _run_chunk(p1: Dict[str, Any], p2: Dict[str, Any], start: int, stop: int, seed: int,
+               level: int, max_turns: int, include_logs: bool, deadline: Optional[float] = None) -> List[Tuple]:
+    """Worker entry point: simulate runs [start, stop) and return compact outcomes."""
+    r1, r2 = PokemonResource(**p1), PokemonResource(**p2)
+    matchup = compile_matchup(r1, r2, level)
+    out = []
+    for i in range(start, stop):
+        result = simulate_battle(r1, r2, level=level, deterministic=False, max_turns=max_turns,
+                                 rng=run_rng(seed, i), log_level="text" if include_logs else "none", matchup=matchup,
+                                 deadline=deadline)
+        states = result["final_states"]
+        out.append((result["winner_side"], result["turns"],
+                    max(0, states["p1"]["current_hp"]), max(0, states["p2"]["current_hp"]),
+                    result["log"] if include_logs else None))
+    return out
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score confidence interval for a binomial proportion."""
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _percentile(sorted_values: List[int], q: float) -> int:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_batch(p1: PokemonResource, p2: PokemonResource, n: int = 1000, seed: Optional[int] = None,
+              level: int = 50, max_turns: int = 200, include_logs: bool = False,
+              parallel: bool = True, engine: str = "scalar", deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run `n` stochastic battles of one matchup and summarize them.
+
+    engine="scalar": run i always uses stream `run_rng(seed, i)`, so a
+    (seed, n) pair reproduces the same outcomes regardless of how runs are
+    split across workers.
+    engine="vectorized": all runs advance in lockstep in the NumPy kernel,
+    drawing from one Generator seeded with `seed` (reproducible, but not the
+    same draws as the scalar engine). No per-battle logs.
+    Past `deadline` (a time.monotonic() value) the batch raises TimeoutError.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if include_logs and engine != "scalar":
+        raise ValueError("include_logs requires the scalar engine")
+    if seed is None:
+        seed = secrets.randbits(63)
+
+    workers = cpu_workers()
+    args = (p1.model_dump(), p2.model_dump())
+    if engine == "vectorized":
+        res = vectorized.simulate_many(p1, p2, n, level=level, max_turns=max_turns, seed=seed, deadline=deadline)
+        sides = {vectorized.P1: "p1", vectorized.P2: "p2", vectorized.DRAW: "draw"}
+        hp = res["hp"].clip(min=0)
+        outcomes = [(sides[w], t, h1, h2, None) for w, t, h1, h2
+                    in zip(res["winner"].tolist(), res["turns"].tolist(), hp[:, 0].tolist(), hp[:, 1].tolist())]
+    elif not parallel or n < MIN_PARALLEL_RUNS or workers == 1:
+        outcomes = _run_chunk(*args, 0, n, seed, level, max_turns, include_logs, deadline)
+    else:
+        # A few chunks per worker keeps the pool busy when runs vary in length.
+        chunk = max(1, math.ceil(n / (workers * 4)))
+        pool = get_pool()
+        # time.monotonic() is system-wide, so the deadline holds in the workers too.
+        futures = [pool.submit(_run_chunk, *args, start, min(n, start + chunk), seed, level, max_turns,
+                               include_logs, deadline)
+                   for start in range(0, n, chunk)]
+        outcomes = [o for f in futures for o in f.result()]
+
+    wins = {"p1": 0, "p2": 0, "draw": 0}
+    turn_hist: Dict[int, int] = {}
+    hp1_total = hp2_total = 0
+    for side, turns, hp1, hp2, _ in outcomes:
+        wins[side] += 1
+        turn_hist[turns] = turn_hist.get(turns, 0) + 1
+        hp1_total += hp1
+        hp2_total += hp2
+    turns_sorted = sorted(o[1] for o in outcomes)
+    # Recorded here rather than per battle: runs may have happened in pool workers.
+    metrics.record_battles(engine, n, sum(turns_sorted))
+
+    def rate(side: str) -> Dict[str, Any]:
+        low, high = wilson_interval(wins[side], n)
+        return {"count": wins[side], "rate": wins[side] / n, "ci95": [low, high]}
+
+    result = {
+        "pokemon1": p1.name,
+        "pokemon2": p2.name,
+        "n": n,
+        "seed": seed,
+        "level": level,
+        "engine": engine,
+        "outcomes": {"p1": rate("p1"), "p2": rate("p2"), "draw": rate("draw")},
+        "turns": {
+            "mean": sum(turns_sorted) / n,
+            "min": turns_sorted[0],
+            "p50": _percentile(turns_sorted, 0.5),
+            "p90": _percentile(turns_sorted, 0.9),
+            "max": turns_sorted[-1],
+            "histogram": {str(t): c for t, c in sorted(turn_hist.items())},
+        },
+        "mean_remaining_hp": {
+            "p1": hp1_total / n,
+            "p2": hp2_total / n,
+            "p1_fraction": hp1_total / n / max(1, p1.base_stats["hp"]),
+            "p2_fraction": hp2_total / n / max(1, p2.base_stats["hp"]),
+        },
+    }
+    if include_logs:
+        result["logs"] = [o[4] for o in outcomes]
+    return result
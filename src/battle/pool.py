@@ -0,0 +1,18 @@
+# src/battle/pool.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def cpu_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by the CPU-bound battle tools (created on first use)."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=cpu_workers())
+    return _pool
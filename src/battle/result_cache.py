@@ -0,0 +1,104 @@
+# src/battle/result_cache.py
+"""
+Memoization of deterministic battles.
+
+A deterministic simulate_battle is a pure function of both resources plus
+level and max_turns, so its encoded response is cached under a hash of
+those inputs. Because the key covers the resource content rather than the
+names, an entry stops matching as soon as the underlying data changes.
+"""
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from src.pokemon.cache import TTLCache
+from src.pokemon.models import PokemonResource
+from src.pokemon.store import ResourceStore
+from src.pokemon.repository import repository
+from src import metrics
+
+
+def result_key(p1: PokemonResource, p2: PokemonResource, level: int, max_turns: int, **options: Any) -> str:
+    """Content hash of everything a deterministic battle's response depends on."""
+    h = hashlib.sha256()
+    for resource in (p1, p2):
+        h.update(resource.model_dump_json().encode())
+        h.update(b"\0")
+    h.update(f"{level}:{max_turns}".encode())
+    for name in sorted(options):
+        h.update(f":{name}={options[name]}".encode())
+    return h.hexdigest()
+
+
+class BattleResultCache:
+    """
+    Bounded LRU of encoded battle responses, optionally backed by the
+    SQLite store so results survive restarts and are shared by workers.
+    The store keeps at most `max_stored` results (the newest ones).
+    """
+
+    def __init__(self, maxsize: int = 4096, store: Optional[ResourceStore] = None, max_stored: int = 100_000):
+        self.store = store
+        self.max_stored = max_stored
+        self._memory = TTLCache(maxsize, None)
+        self._counts_lock = threading.Lock()
+        self._counts = {"memory.hit": 0, "disk.hit": 0, "miss": 0}
+
+    def _count(self, name: str) -> None:
+        with self._counts_lock:
+            self._counts[name] += 1
+
+    def get(self, key: str, memory_only: bool = False) -> Optional[bytes]:
+        """
+        Memory, then the store. With `memory_only` a memory miss returns None
+        without counting, so the caller can retry the disk tier off the event loop.
+        """
+        body = self._memory.get(key)
+        if body is not None:
+            self._count("memory.hit")
+            return body
+        if memory_only:
+            return None
+        if self.store is not None:
+            body = self.store.get_battle_result(key)
+            if body is not None:
+                self._memory.set(key, body)
+                self._count("disk.hit")
+                return body
+        self._count("miss")
+        return None
+
+    def put(self, key: str, body: bytes) -> None:
+        self._memory.set(key, body)
+        if self.store is not None:
+            self.store.put_battle_result(key, body, max_rows=self.max_stored)
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counts_lock:
+            counts = dict(self._counts)
+        return {"counts": counts, "memory_entries": len(self._memory), "persistent": self.store is not None}
+
+
+# Shared by the server; BATTLE_CACHE_PERSIST=0 keeps it memory-only.
+result_cache = BattleResultCache(
+    maxsize=int(os.getenv("BATTLE_CACHE_SIZE", "4096")),
+    max_stored=int(os.getenv("BATTLE_CACHE_STORED", "100000")),
+    store=repository.store if os.getenv("BATTLE_CACHE_PERSIST", "1") != "0" else None,
+)
+
+
+def _collect_result_cache():
+    stats = result_cache.stats()
+    return (
+        metrics.format_metric("battle_result_cache_lookups_total", "Battle result cache lookups by outcome.",
+                              "counter", ["result"], {(k,): v for k, v in stats["counts"].items()})
+        + metrics.format_metric("battle_result_cache_entries", "Battle results held in memory.",
+                                "gauge", [], {(): stats["memory_entries"]})
+    )
+
+
+metrics.registry.register_collector(_collect_result_cache)
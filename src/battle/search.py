@@ -0,0 +1,253 @@
+# src/battle/search.py
+"""
+Search-based move selection.
+
+MoveSearch picks a move by depth-limited expectimax over the battle rules
+of iter_battle: our move is a max node; the opponent's greedy pick
+distribution, the speed-tie coin, paralysis and the damage roll are chance
+nodes. Iterative deepening runs until a per-move node (or time) budget is
+spent and the deepest completed iteration decides. Values are cached in a
+transposition table keyed on the compact state (both HPs, both statuses and
+the turns left when the turn limit is within the horizon), which persists
+across the turns of a battle, and each move's damage distribution is
+computed once.
+
+The opponent is modelled by its greedy policy. Under the current rules
+(no accuracy, recoil or secondary effects) a move that deals at least as
+much damage on every roll is never worse, so pointwise-dominated moves are
+pruned before searching.
+"""
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.battle.compiled import CompiledCombatant, CompiledMove, TOP_MOVES
+
+POLICIES = ("greedy", "search")
+
+# Per-move search budget: value-node expansions, optional wall time, depth (turns).
+DEFAULT_NODES = 400
+MAX_DEPTH = 6
+# The damage roll: 16 steps of uniform(0.85, 1.0), merged into this many buckets.
+ROLLS = 16
+ROLL_BUCKETS = 4
+# Terminal values; leaf evaluations lie in [-1, 1].
+WIN, LOSS, DRAW = 2.0, -2.0, 0.0
+# Entries kept in the transposition table before it is cleared.
+TT_SIZE = 200_000
+
+Outcomes = Tuple[Tuple[int, float], ...]
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+def _merge(outcomes: Sequence[Tuple[int, float]]) -> Outcomes:
+    merged: Dict[int, float] = {}
+    for damage, p in outcomes:
+        merged[damage] = merged.get(damage, 0.0) + p
+    return tuple(sorted(merged.items()))
+
+
+class MoveSearch:
+    """Expectimax move choice for `me` against `opp` over one battle."""
+
+    def __init__(self, me: CompiledCombatant, opp: CompiledCombatant, me_is_p1: bool, deterministic: bool,
+                 nodes: int = DEFAULT_NODES, seconds: Optional[float] = None, max_depth: int = MAX_DEPTH,
+                 prune: bool = True):
+        self.me = me
+        self.opp = opp
+        self.me_is_p1 = me_is_p1
+        self.deterministic = deterministic
+        self.node_budget = nodes
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.prune = prune
+        self.tt: Dict[tuple, Tuple[int, float, int]] = {}
+        self._rolls: Dict[Tuple[int, bool], Tuple[int, ...]] = {}
+        self._acts: Dict[tuple, Outcomes] = {}
+        self._candidates: Dict[tuple, List[Optional[CompiledMove]]] = {}
+        self.nodes = 0
+        self.depth_reached = 0
+        self._limited = False
+        self._deadline: Optional[float] = None
+        # Chance over the opponent's greedy pick.
+        if not opp.ranked:
+            self.opp_moves: List[Tuple[Optional[CompiledMove], float]] = [(None, 1.0)]
+        elif deterministic or opp.fallback:
+            self.opp_moves = [(opp.ranked[0], 1.0)]
+        else:
+            top = opp.ranked[:TOP_MOVES]
+            self.opp_moves = [(m, 1.0 / len(top)) for m in top]
+
+    # -- damage -------------------------------------------------------------
+
+    def rolls(self, move: CompiledMove, burned: bool) -> Tuple[int, ...]:
+        """Damage for each roll step, lowest roll first (memoized)."""
+        key = (id(move), burned)
+        rolls = self._rolls.get(key)
+        if rolls is None:
+            if not move.has_power:
+                rolls = (0,)
+            elif self.deterministic:
+                rolls = (move.damage(1.0, burned),)
+            else:
+                rolls = tuple(move.damage(0.85 + 0.15 * i / (ROLLS - 1), burned) for i in range(ROLLS))
+            self._rolls[key] = rolls
+        return rolls
+
+    def _act(self, move: Optional[CompiledMove], status: tuple) -> Outcomes:
+        """Distribution of damage dealt by one action, with paralysis and roll buckets."""
+        key = (id(move), status)
+        act = self._acts.get(key)
+        if act is not None:
+            return act
+        if move is None:
+            act = ((0, 1.0),)
+        else:
+            rolls = self.rolls(move, "burn" in status)
+            size = max(1, len(rolls) // ROLL_BUCKETS)
+            buckets = [rolls[i:i + size] for i in range(0, len(rolls), size)]
+            outcomes = [(b[len(b) // 2], len(b) / len(rolls)) for b in buckets]
+            if "paralysis" in status:
+                # iter_battle: always stuck when deterministic, 25% otherwise.
+                stuck = 1.0 if self.deterministic else 0.25
+                outcomes = [(0, stuck)] + [(d, p * (1 - stuck)) for d, p in outcomes]
+            act = _merge(outcomes)
+        self._acts[key] = act
+        return act
+
+    def candidates(self, status: tuple) -> List[CompiledMove]:
+        """Our moves minus those dealing no more damage than another on every roll."""
+        moves = self.me.ranked
+        if not self.prune:
+            return list(moves)
+        burned = "burn" in status
+        keep = []
+        for i, move in enumerate(moves):
+            rolls = self.rolls(move, burned)
+            dominated = False
+            for j, other in enumerate(moves):
+                if i == j:
+                    continue
+                other_rolls = self.rolls(other, burned)
+                if all(a <= b for a, b in zip(rolls, other_rolls)) and (rolls != other_rolls or j < i):
+                    dominated = True
+                    break
+            if not dominated:
+                keep.append(move)
+        return keep
+
+    # -- search -------------------------------------------------------------
+
+    def _speed(self, combatant: CompiledCombatant, status: tuple) -> int:
+        return math.floor(combatant.speed * 0.5) if "paralysis" in status else combatant.speed
+
+    def _orders(self, st_me: tuple, st_opp: tuple) -> List[Tuple[bool, float]]:
+        """(we move first, probability)."""
+        s_me, s_opp = self._speed(self.me, st_me), self._speed(self.opp, st_opp)
+        if s_me != s_opp:
+            return [(s_me > s_opp, 1.0)]
+        if self.deterministic:
+            return [(self.me_is_p1, 1.0)]
+        return [(True, 0.5), (False, 0.5)]
+
+    def _eot(self, max_hp: int, status: tuple) -> int:
+        damage = 0
+        if "poison" in status:
+            damage += math.floor(max_hp / 8)
+        if "burn" in status:
+            damage += math.floor(max_hp / 16)
+        return damage
+
+    def _turn(self, hp_me: int, hp_opp: int, st_me: tuple, st_opp: tuple, my_move: Optional[CompiledMove],
+              depth: int, turns_left: int) -> float:
+        """Expected value of one turn in which we use `my_move`."""
+        eot_me, eot_opp = self._eot(self.me.max_hp, st_me), self._eot(self.opp.max_hp, st_opp)
+        mine = self._act(my_move, st_me)
+        total = 0.0
+        for opp_move, p_move in self.opp_moves:
+            theirs = self._act(opp_move, st_opp)
+            for me_first, p_order in self._orders(st_me, st_opp):
+                first, second = (mine, theirs) if me_first else (theirs, mine)
+                hp_first, hp_second = (hp_me, hp_opp) if me_first else (hp_opp, hp_me)
+                first_wins = WIN if me_first else LOSS
+                value = 0.0
+                for d1, p1 in first:
+                    if hp_second - d1 <= 0:
+                        value += p1 * first_wins
+                        continue
+                    for d2, p2 in second:
+                        if hp_first - d2 <= 0:
+                            value += p1 * p2 * -first_wins
+                            continue
+                        if me_first:
+                            me_hp, opp_hp = hp_me - d2, hp_opp - d1
+                        else:
+                            me_hp, opp_hp = hp_me - d1, hp_opp - d2
+                        me_hp -= eot_me
+                        opp_hp -= eot_opp
+                        if me_hp <= 0 or opp_hp <= 0:
+                            outcome = DRAW if me_hp <= 0 and opp_hp <= 0 else (LOSS if me_hp <= 0 else WIN)
+                        elif turns_left <= 1:
+                            outcome = DRAW
+                        else:
+                            outcome = self._value(me_hp, opp_hp, st_me, st_opp, depth - 1, turns_left - 1)
+                        value += p1 * p2 * outcome
+                total += p_move * p_order * value
+        return total
+
+    def _value(self, hp_me: int, hp_opp: int, st_me: tuple, st_opp: tuple, depth: int, turns_left: int) -> float:
+        if depth == 0:
+            return hp_me / self.me.max_hp - hp_opp / self.opp.max_hp
+        # The turn limit only matters once it is within the horizon.
+        key = (hp_me, hp_opp, st_me, st_opp, turns_left if turns_left <= depth else -1)
+        entry = self.tt.get(key)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+        self._spend()
+        best, best_index = -math.inf, 0
+        for i, move in enumerate(self._moves(st_me)):
+            value = self._turn(hp_me, hp_opp, st_me, st_opp, move, depth, turns_left)
+            if value > best:
+                best, best_index = value, i
+        if len(self.tt) >= TT_SIZE:
+            self.tt.clear()
+        self.tt[key] = (depth, best, best_index)
+        return best
+
+    def _moves(self, status: tuple) -> List[Optional[CompiledMove]]:
+        moves = self._candidates.get(status)
+        if moves is None:
+            moves = self._candidates[status] = self.candidates(status) or [None]
+        return moves
+
+    def _spend(self) -> None:
+        self.nodes += 1
+        if self._limited and (self.nodes > self.node_budget or
+                              (self._deadline is not None and time.perf_counter() > self._deadline)):
+            raise _OutOfBudget
+
+    def choose(self, hp_me: int, hp_opp: int, status_me: Sequence[str] = (), status_opp: Sequence[str] = (),
+               turns_left: int = 200) -> Optional[CompiledMove]:
+        """Best move for the current state within the per-move budget."""
+        if not self.me.ranked:
+            return None
+        st_me, st_opp = tuple(sorted(status_me)), tuple(sorted(status_opp))
+        moves = self._moves(st_me)
+        if len(moves) == 1:
+            return moves[0]
+        self.nodes = 0
+        self._deadline = time.perf_counter() + self.seconds if self.seconds is not None else None
+        best = moves[0]
+        for depth in range(1, min(self.max_depth, turns_left) + 1):
+            # The first iteration always completes so there is an answer.
+            self._limited = depth > 1
+            try:
+                values = [self._turn(hp_me, hp_opp, st_me, st_opp, m, depth, turns_left) for m in moves]
+            except _OutOfBudget:
+                break
+            best = moves[max(range(len(moves)), key=lambda i: values[i])]
+            self.depth_reached = depth
+        return best
@@ -1,82 +1,15 @@
 # src/battle/simulator.py
 import random
 import math
-from typing import Dict, Any, List, Tuple, Optional
+import time
+from typing import Dict, Any, Generator, List, Tuple, Optional, Union
 
-# Reuse your existing client/normalizer
-from src.pokemon.poke_client import PokeAPIClient
-from src.pokemon.normalizer import normalize_pokemon
-from src.pokemon.models import PokemonResource, MoveShort
-
-client = PokeAPIClient()
-
-# Basic type effectiveness chart (extendable)
-TYPE_CHART = {
-    # Attacking type: {defending_type: multiplier}
-    "normal": {"rock": 0.5, "ghost": 0.0, "steel": 0.5},
-    "fire": {"fire": 0.5, "water": 0.5, "grass": 2.0, "ice": 2.0, "bug": 2.0, "rock": 0.5, "dragon": 0.5, "steel": 2.0},
-    "water": {"fire": 2.0, "water": 0.5, "grass": 0.5, "ground": 2.0, "rock": 2.0, "dragon": 0.5},
-    "electric": {"water": 2.0, "electric": 0.5, "grass": 0.5, "ground": 0.0, "flying": 2.0, "dragon": 0.5},
-    "grass": {"fire": 0.5, "water": 2.0, "grass": 0.5, "poison": 0.5, "ground": 2.0, "flying": 0.5, "bug": 0.5, "rock": 2.0, "dragon": 0.5, "steel": 0.5},
-    "ice": {"fire": 0.5, "water": 0.5, "grass": 2.0, "ice": 0.5, "ground": 2.0, "flying": 2.0, "dragon": 2.0, "steel": 0.5},
-    "fighting": {"normal": 2.0, "ice": 2.0, "rock": 2.0, "dark": 2.0, "steel": 2.0, "poison": 0.5, "flying": 0.5, "psychic": 0.5, "bug": 0.5, "ghost": 0.0, "fairy": 0.5},
-    "poison": {"grass": 2.0, "poison": 0.5, "ground": 0.5, "rock": 0.5, "ghost": 0.5, "steel": 0.0, "fairy": 2.0},
-    "ground": {"fire": 2.0, "electric": 2.0, "grass": 0.5, "poison": 2.0, "flying": 0.0, "bug": 0.5, "rock": 2.0, "steel": 2.0},
-    "flying": {"electric": 0.5, "grass": 2.0, "fighting": 2.0, "bug": 2.0, "rock": 0.5, "steel": 0.5},
-    "psychic": {"fighting": 2.0, "poison": 2.0, "psychic": 0.5, "dark": 0.0, "steel": 0.5},
-    "bug": {"fire": 0.5, "grass": 2.0, "fighting": 0.5, "poison": 0.5, "flying": 0.5, "psychic": 2.0, "ghost": 0.5, "dark": 2.0, "steel": 0.5, "fairy": 0.5},
-    "rock": {"fire": 2.0, "ice": 2.0, "fighting": 0.5, "ground": 0.5, "flying": 2.0, "bug": 2.0, "steel": 0.5},
-    "ghost": {"normal": 0.0, "psychic": 2.0, "ghost": 2.0, "dark": 0.5},
-    "dragon": {"dragon": 2.0, "steel": 0.5, "fairy": 0.0},
-    "dark": {"fighting": 0.5, "psychic": 2.0, "ghost": 2.0, "dark": 0.5, "fairy": 0.5},
-    "steel": {"fire": 0.5, "water": 0.5, "electric": 0.5, "ice": 2.0, "rock": 2.0, "fairy": 2.0, "steel": 0.5},
-    "fairy": {"fire": 0.5, "fighting": 2.0, "poison": 0.5, "dragon": 2.0, "dark": 2.0, "steel": 0.5}
-}
-
-def type_effectiveness(move_type: str, defender_types: List[str]) -> float:
-    m = 1.0
-    move_type = (move_type or "").lower()
-    for d in defender_types:
-        d = d.lower()
-        if move_type in TYPE_CHART and d in TYPE_CHART[move_type]:
-            m *= TYPE_CHART[move_type][d]
-    return m
-
-def choose_move(pokemon: PokemonResource, defender: PokemonResource, deterministic: bool = True) -> Optional[MoveShort]:
-    """
-    Choose a move prioritizing:
-    1. STAB moves
-    2. Super-effective moves
-    3. Highest power
-    """
-    if not pokemon.moves:
-        return None
-
-    scored = []
-    for move in pokemon.moves:
-        if move.power is None:
-            continue
-        score = move.power
-
-        # STAB bonus
-        if move.type.lower() in [t.lower() for t in pokemon.types]:
-            score *= 1.5
-
-        # Type effectiveness bonus
-        mult = type_effectiveness(move.type, defender.types)
-        score *= mult
-
-        scored.append((score, move))
-
-    if not scored:
-        return pokemon.moves[0]
-
-    # Deterministic = pick best, else random weighted choice
-    scored.sort(key=lambda x: x[0], reverse=True)
-    if deterministic:
-        return scored[0][1]
-    else:
-        return random.choice(scored[:min(3, len(scored))])
+# Resources come through the shared tiered repository
+from src.pokemon.repository import repository
+from src.pokemon.models import PokemonResource
+from src.battle.compiled import CompiledCombatant, compile_matchup
+from src.battle.search import MoveSearch, POLICIES, DEFAULT_NODES
+from src import metrics
 
 def load_pokemon(poke_input: Any) -> PokemonResource:
     """
@@ -87,62 +20,14 @@ def load_pokemon(poke_input: Any) -> PokemonResource:
         return PokemonResource(**poke_input)
     if isinstance(poke_input, PokemonResource):
         return poke_input
-    # else assume name and fetch + normalize
-    raw = client.get_pokemon(str(poke_input))
-    return normalize_pokemon(raw)
-
-def compute_damage(attacker: PokemonResource, defender: PokemonResource,
-                   move: MoveShort, level: int, attacker_status: List[str],
-                   deterministic: bool) -> Tuple[int, Dict[str, Any]]:
-    """
-    Returns (damage, detail_dict)
-    detail_dict contains breakdown: base, stab, type_mult, final_damage
-    """
-    power = move.power or 0
-    if power == 0:
-        return 0, {"reason": "move has no power"}
-
-    # Determine whether move is physical or special (damage_class)
-    is_physical = (move.damage_class == "physical")
-    # Choose attack/defense stat
-    atk = attacker.base_stats["attack"] if is_physical else attacker.base_stats["special_attack"]
-    defe = defender.base_stats["defense"] if is_physical else defender.base_stats["special_defense"]
-
-    # Core damage formula (simplified)
-    # base = (((2 * L / 5) + 2) * power * atk / defe) / 50 + 2
-    base = (((2 * level) / 5) + 2) * power * (atk / max(1, defe))
-    base = base / 50.0 + 2
-
-    # STAB
-    stab = 1.5 if (move.type and move.type.lower() in [t.lower() for t in attacker.types]) else 1.0
-
-    # type effectiveness
-    type_mult = type_effectiveness(move.type, defender.types)
-
-    # random factor
-    if deterministic:
-        rand = 1.0
-    else:
-        rand = random.uniform(0.85, 1.0)
-
-    modifier = stab * type_mult * rand
-
-    # Burn halves physical attack damage (classic behavior)
-    if is_physical and ("burn" in attacker_status):
-        modifier *= 0.5
+    # else assume name: memory -> data/ cache -> PokéAPI
+    return repository.get_pokemon(poke_input)
 
-    damage = math.floor(base * modifier)
-    if damage < 1:
-        damage = 1
-    detail = {
-        "base": base,
-        "stab": stab,
-        "type_mult": type_mult,
-        "rand": rand,
-        "modifier": modifier,
-        "final_damage": damage
-    }
-    return damage, detail
+async def aload_pokemon(poke_input: Any) -> PokemonResource:
+    """Async variant of load_pokemon for use from the event loop."""
+    if isinstance(poke_input, (dict, PokemonResource)):
+        return load_pokemon(poke_input)
+    return await repository.aget_pokemon(poke_input)
 
 def apply_status_end_of_turn(pokemon: Dict[str, Any], status: List[str]) -> Tuple[int, str]:
     """
@@ -165,116 +50,237 @@ def apply_status_end_of_turn(pokemon: Dict[str, Any], status: List[str]) -> Tupl
         msg += f"Burn deals {dmg} damage. "
     return damage, msg.strip()
 
-def simulate_battle(p1_input: Any, p2_input: Any, level: int = 50,
-                    deterministic: bool = True, max_turns: int = 200) -> Dict[str, Any]:
+LOG_LEVELS = ("none", "summary", "structured", "text")
+
+Policy = Union[str, Dict[str, str]]
+
+def side_policies(policy: Policy) -> Dict[str, str]:
+    """`policy` for both sides, or a {"p1": ..., "p2": ...} mapping (missing sides are greedy)."""
+    sides = {"p1": policy, "p2": policy} if isinstance(policy, str) else {"p1": "greedy", "p2": "greedy", **policy}
+    for side, name in sides.items():
+        if side not in ("p1", "p2") or name not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, or a mapping of p1/p2 to one")
+    return sides
+
+def iter_battle(p1_input: Any, p2_input: Any, level: int = 50,
+                deterministic: bool = True, max_turns: int = 200,
+                rng: Optional[random.Random] = None, log_level: str = "structured",
+                matchup: Optional[Tuple[CompiledCombatant, CompiledCombatant]] = None,
+                policy: Policy = "greedy", search_nodes: int = DEFAULT_NODES,
+                search_time: Optional[float] = None,
+                deadline: Optional[float] = None) -> Generator[Any, None, Dict[str, Any]]:
     """
-    Simulate a battle between p1 and p2.
-    Returns: {
-        'winner': 'p1'/'p2'/'draw',
-        'log': [ ... ],
-        'final_states': {...}
-    }
+    The battle loop as a generator: yields each log entry (see
+    simulate_battle's `log_level`) as soon as it happens and returns
+    simulate_battle's result without the "log" key. Closing the generator
+    early simply stops the battle; so does `deadline` (a time.monotonic()
+    value), with TimeoutError at the first turn that starts after it.
     """
-    if not deterministic:
-        random.seed()
+    if log_level not in LOG_LEVELS:
+        raise ValueError(f"log_level must be one of {LOG_LEVELS}")
+    policies = side_policies(policy)
+    text = log_level == "text"
+    events = log_level == "structured"
+    summary = log_level == "summary"
+    if not deterministic and rng is None:
+        rng = random.Random()
 
     p1 = load_pokemon(p1_input)
     p2 = load_pokemon(p2_input)
+    # Type ids, multipliers, base damage and move ranking are fixed for the
+    # whole battle: compute them once so the turn loop is pure arithmetic.
+    c1, c2 = matchup or compile_matchup(p1, p2, level)
+    searches = []
+    if policies["p1"] == "search":
+        searches.append((c1, MoveSearch(c1, c2, True, deterministic, search_nodes, search_time)))
+    if policies["p2"] == "search":
+        searches.append((c2, MoveSearch(c2, c1, False, deterministic, search_nodes, search_time)))
 
     # Initialize simple battle state
     state1 = {
         "name": p1.name,
         "max_hp": p1.base_stats["hp"],
         "current_hp": p1.base_stats["hp"],
-        "types": p1.types,
         "status": [],  # burn, poison, paralysis
-        "pokemon": p1
     }
     state2 = {
         "name": p2.name,
         "max_hp": p2.base_stats["hp"],
         "current_hp": p2.base_stats["hp"],
-        "types": p2.types,
         "status": [],
-        "pokemon": p2
     }
 
-    log: List[str] = []
     turn = 1
 
+    def result(winner_side: str) -> Dict[str, Any]:
+        winner = {"p1": state1["name"], "p2": state2["name"]}.get(winner_side, "draw")
+        return {"winner": winner, "winner_side": winner_side, "turns": min(turn, max_turns),
+                "final_states": {"p1": state1, "p2": state2}}
+
     while turn <= max_turns:
-        log.append(f"--- Turn {turn} ---")
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"battle exceeded its deadline at turn {turn}")
+        if text:
+            yield f"--- Turn {turn} ---"
         # Determine effective speeds
-        s1 = p1.base_stats["speed"]
-        s2 = p2.base_stats["speed"]
+        s1 = c1.speed
+        s2 = c2.speed
         if "paralysis" in state1["status"]:
             s1 = math.floor(s1 * 0.5)
         if "paralysis" in state2["status"]:
             s2 = math.floor(s2 * 0.5)
 
+        # Search policies choose simultaneously, from the state at the start of the turn.
+        planned = None
+        if searches:
+            planned = {}
+            for combatant, search in searches:
+                me, opp = (state1, state2) if combatant is c1 else (state2, state1)
+                planned[combatant] = search.choose(me["current_hp"], opp["current_hp"], me["status"],
+                                                   opp["status"], max_turns - turn + 1)
+
+        first = [(state1, state2, c1), (state2, state1, c2)]
         if s1 > s2:
-            order = [(state1, state2), (state2, state1)]
+            order = first
         elif s2 > s1:
-            order = [(state2, state1), (state1, state2)]
+            order = first[::-1]
         else:
             # speed tie
-            if deterministic:
-                order = [(state1, state2), (state2, state1)]
+            if deterministic or rng.random() < 0.5:
+                order = first
             else:
-                if random.random() < 0.5:
-                    order = [(state1, state2), (state2, state1)]
-                else:
-                    order = [(state2, state1), (state1, state2)]
+                order = first[::-1]
 
-        for attacker_state, defender_state in order:
+        for attacker_state, defender_state, combatant in order:
             if attacker_state["current_hp"] <= 0 or defender_state["current_hp"] <= 0:
                 continue  # skip if someone has fainted mid-turn
 
-            attacker: PokemonResource = attacker_state["pokemon"]
-            defender: PokemonResource = defender_state["pokemon"]
-
-            # Choose move
-            move = choose_move(attacker)
+            # Choose move (compiled ranking, unless searching)
+            if planned is not None and combatant in planned:
+                move = planned[combatant]
+            else:
+                move = combatant.pick(deterministic, rng)
             if not move:
-                log.append(f"{attacker_state['name']} has no moves and struggles (skip).")
+                if text:
+                    yield f"{attacker_state['name']} has no moves and struggles (skip)."
+                elif events:
+                    yield {"turn": turn, "actor": attacker_state["name"], "action": "no_moves"}
                 continue
 
             # Paralysis check: 25% chance to be fully paralyzed
             if "paralysis" in attacker_state["status"]:
-                stuck_roll = 0.25 if deterministic else random.random()
-                if (not deterministic and random.random() < 0.25) or (deterministic and stuck_roll <= 0.25):
-                    log.append(f"{attacker_state['name']} is paralyzed and can't move!")
+                stuck_roll = 0.25 if deterministic else rng.random()
+                if (not deterministic and rng.random() < 0.25) or (deterministic and stuck_roll <= 0.25):
+                    if text:
+                        yield f"{attacker_state['name']} is paralyzed and can't move!"
+                    elif events:
+                        yield {"turn": turn, "actor": attacker_state["name"], "action": "paralyzed"}
                     continue
 
             # Execute move
-            damage, detail = compute_damage(attacker, defender, move, level, attacker_state["status"], deterministic)
+            burned = "burn" in attacker_state["status"]
+            if move.has_power:
+                rand = 1.0 if deterministic else rng.uniform(0.85, 1.0)
+                damage = move.damage(rand, burned)
+            else:
+                rand, damage = 1.0, 0
             defender_state["current_hp"] -= damage
-            log.append(f"{attacker_state['name']} uses {move.name} (power={move.power}). Damage: {damage}. Detail: {detail}")
-            log.append(f"{defender_state['name']} HP: {max(0, defender_state['current_hp'])}/{defender_state['max_hp']}")
-
-            if defender_state["current_hp"] <= 0:
-                log.append(f"{defender_state['name']} fainted!")
-                winner = attacker_state["name"]
-                return {"winner": winner, "log": log, "final_states": {"p1": state1, "p2": state2}}
+            fainted = defender_state["current_hp"] <= 0
+            if text:
+                detail = move.detail(rand, burned)
+                yield f"{attacker_state['name']} uses {move.move.name} (power={move.move.power}). Damage: {damage}. Detail: {detail}"
+                yield f"{defender_state['name']} HP: {max(0, defender_state['current_hp'])}/{defender_state['max_hp']}"
+                if fainted:
+                    yield f"{defender_state['name']} fainted!"
+            elif events:
+                event = {"turn": turn, "actor": attacker_state["name"], "move": move.move.name, "damage": damage,
+                         "target": defender_state["name"], "hp_after": max(0, defender_state["current_hp"])}
+                if fainted:
+                    event["action"] = "faint"
+                yield event
+            elif summary and fainted:
+                yield f"{defender_state['name']} fainted!"
+
+            if fainted:
+                return result("p1" if attacker_state is state1 else "p2")
 
         # End-of-turn effects
-        d1, msg1 = apply_status_end_of_turn(state1, state1["status"])
-        if d1:
-            log.append(f"{state1['name']} end-of-turn: {msg1} Now HP: {max(0, state1['current_hp'])}/{state1['max_hp']}")
-        d2, msg2 = apply_status_end_of_turn(state2, state2["status"])
-        if d2:
-            log.append(f"{state2['name']} end-of-turn: {msg2} Now HP: {max(0, state2['current_hp'])}/{state2['max_hp']}")
+        for state in (state1, state2):
+            dmg, msg = apply_status_end_of_turn(state, state["status"])
+            if not dmg:
+                continue
+            if text:
+                yield f"{state['name']} end-of-turn: {msg} Now HP: {max(0, state['current_hp'])}/{state['max_hp']}"
+            elif events:
+                yield {"turn": turn, "actor": state["name"], "action": "status", "damage": dmg,
+                       "hp_after": max(0, state["current_hp"])}
 
         if state1["current_hp"] <= 0 and state2["current_hp"] <= 0:
-            log.append("Both Pokémon fainted — draw.")
-            return {"winner": "draw", "log": log, "final_states": {"p1": state1, "p2": state2}}
+            if text or summary:
+                yield "Both Pokémon fainted — draw."
+            elif events:
+                yield {"turn": turn, "action": "draw"}
+            return result("draw")
         if state1["current_hp"] <= 0:
-            return {"winner": state2["name"], "log": log, "final_states": {"p1": state1, "p2": state2}}
+            return result("p2")
         if state2["current_hp"] <= 0:
-            return {"winner": state1["name"], "log": log, "final_states": {"p1": state1, "p2": state2}}
+            return result("p1")
 
         turn += 1
 
     # max turns reached -> draw
-    log.append("Max turns reached -> draw.")
-    return {"winner": "draw", "log": log, "final_states": {"p1": state1, "p2": state2}}
+    if text or summary:
+        yield "Max turns reached -> draw."
+    elif events:
+        yield {"turn": max_turns, "action": "max_turns"}
+    return result("draw")
+
+
+def simulate_battle(p1_input: Any, p2_input: Any, level: int = 50,
+                    deterministic: bool = True, max_turns: int = 200,
+                    rng: Optional[random.Random] = None, log_level: str = "text",
+                    matchup: Optional[Tuple[CompiledCombatant, CompiledCombatant]] = None,
+                    policy: Policy = "greedy", search_nodes: int = DEFAULT_NODES,
+                    search_time: Optional[float] = None, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Simulate a battle between p1 and p2.
+    `rng` supplies all randomness for non-deterministic battles (a fresh,
+    OS-seeded stream if omitted). `log_level` is one of LOG_LEVELS:
+    "none" (no log), "summary" (faint/draw lines only), "structured" (event
+    dicts: turn, actor, move, damage, target, hp_after) or "text" (full
+    prose with damage breakdowns).
+    `matchup` reuses compile_matchup(p1, p2, level) across repeated battles.
+    `policy` is "greedy" (CompiledCombatant.pick) or "search" (expectimax, see
+    src/battle/search.py, limited to `search_nodes` node expansions and
+    optionally `search_time` seconds per move), for both sides or per side
+    as {"p1": ..., "p2": ...}. Past `deadline` (see iter_battle) the battle
+    raises TimeoutError.
+    Returns: {
+        'winner': winner name or 'draw',
+        'winner_side': 'p1'/'p2'/'draw',
+        'turns': number of turns played,
+        'log': [ ... ],
+        'final_states': {'p1': {name, max_hp, current_hp, status}, 'p2': {...}}
+    }
+    """
+    # One-off battles are timed here; batch callers pass `matchup` and record per batch.
+    p1, p2 = load_pokemon(p1_input), load_pokemon(p2_input)
+    timed = matchup is None
+    if timed:
+        start = time.perf_counter()
+        matchup = compile_matchup(p1, p2, level)
+        compiled = time.perf_counter()
+    battle = iter_battle(p1, p2, level=level, deterministic=deterministic, max_turns=max_turns,
+                         rng=rng, log_level=log_level, matchup=matchup, policy=policy,
+                         search_nodes=search_nodes, search_time=search_time, deadline=deadline)
+    log: List[Any] = []
+    try:
+        while True:
+            log.append(next(battle))
+    except StopIteration as done:
+        result = done.value
+    result["log"] = log
+    if timed:
+        metrics.record_battles("scalar", 1, result["turns"], compile_seconds=compiled - start,
+                               turn_seconds=time.perf_counter() - compiled)
+    return result
@@ -0,0 +1,176 @@
+# src/battle/tournament.py
+"""
+All-pairs round robin over a roster.
+
+Every unordered pair (roster[i] as p1, roster[j] as p2, i < j) is battled
+once with the deterministic rules, in chunks through the NumPy lockstep
+kernel and across processes when more than one core is available. Outcomes
+are persisted in the store keyed by both sides' battle fingerprints, so a
+re-run only simulates pairs whose Pokémon data changed. Only the newest
+MAX_STORED_MATCHUPS outcomes are kept, so rows for stale fingerprints age out.
+"""
+import math
+import os
+import threading
+from concurrent.futures import as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.pokemon.models import PokemonResource
+from src.pokemon.store import ResourceStore
+from src.battle.compiled import battle_fingerprint
+from src.battle import vectorized
+from src.battle.pool import cpu_workers, get_pool
+from src import metrics
+
+# Pairs per kernel call / pool task.
+CHUNK_PAIRS = 512
+
+# Outcomes kept in the store, newest first (a full run over N Pokémon writes N(N-1)/2).
+MAX_STORED_MATCHUPS = int(os.getenv("TOURNAMENT_STORED_MATCHUPS", "1000000"))
+
+ELO_START = 1500.0
+ELO_K = 32.0
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class TournamentCancelled(Exception):
+    """run_tournament's `cancel` event was set before it finished."""
+
+
+def _run_pairs(roster: List[Dict[str, Any]], pairs: List[Tuple[int, int]], level: int,
+               max_turns: int) -> List[Tuple[int, int, int, int]]:
+    """Worker entry point: (winner, turns, hp1, hp2) for each (i, j) in `pairs`."""
+    resources = {i: PokemonResource(**roster[i]) for pair in pairs for i in pair}
+    arrays = vectorized.build_arrays([(resources[i], resources[j]) for i, j in pairs], level)
+    res = vectorized.run_arrays(arrays, deterministic=True, max_turns=max_turns)
+    hp = res["hp"].clip(min=0)
+    return list(zip(res["winner"].tolist(), res["turns"].tolist(), hp[:, 0].tolist(), hp[:, 1].tolist()))
+
+
+def elo_ratings(names: Sequence[str], results: Sequence[Tuple[int, int, float]]) -> List[float]:
+    """
+    Single-pass Elo over (i, j, score_i) results in the given order, where
+    score_i is 1 for a win by names[i], 0 for a loss and 0.5 for a draw.
+    """
+    ratings = [ELO_START] * len(names)
+    for i, j, score in results:
+        expected = 1.0 / (1.0 + 10 ** ((ratings[j] - ratings[i]) / 400.0))
+        delta = ELO_K * (score - expected)
+        ratings[i] += delta
+        ratings[j] -= delta
+    return ratings
+
+
+def run_tournament(roster: Sequence[PokemonResource], level: int = 50, max_turns: int = 200,
+                   store: Optional[ResourceStore] = None, parallel: bool = True,
+                   progress: Optional[ProgressCallback] = None,
+                   cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Battle every pair in `roster` and return the result matrix and Elo ranking.
+
+    matrix[i][j] is 1 when roster[i] beats roster[j], 0 when it loses, 0.5 for
+    a draw and None on the diagonal. Each pair is fought once with the
+    earlier roster entry as p1 (p1 wins speed ties), so matrix[j][i] is
+    1 - matrix[i][j]. Setting `cancel` stops the run between chunks with
+    TournamentCancelled, dropping chunks still queued in the pool; finished
+    chunks are already stored.
+    """
+    seen = set()
+    unique = []
+    for resource in roster:
+        if resource.name not in seen:
+            seen.add(resource.name)
+            unique.append(resource)
+    roster = unique
+    names = [r.name for r in roster]
+    fps = [battle_fingerprint(r) for r in roster]
+    pairs = [(i, j) for i in range(len(roster)) for j in range(i + 1, len(roster))]
+    total = len(pairs)
+
+    stored = store.get_matchup_results(fps, level, max_turns) if store is not None else {}
+    outcomes: Dict[Tuple[int, int], Tuple[int, int, int, int]] = {}
+    todo = []
+    for i, j in pairs:
+        hit = stored.get((fps[i], fps[j]))
+        if hit is not None:
+            outcomes[(i, j)] = hit
+        else:
+            todo.append((i, j))
+    reused = len(outcomes)
+    if progress:
+        progress(reused, total)
+
+    def record(chunk: List[Tuple[int, int]], results: List[Tuple[int, int, int, int]]) -> None:
+        rows = []
+        for (i, j), outcome in zip(chunk, results):
+            outcomes[(i, j)] = outcome
+            winner, turns, hp1, hp2 = outcome
+            rows.append({"fp1": fps[i], "fp2": fps[j], "level": level, "max_turns": max_turns,
+                         "winner": winner, "turns": turns, "hp1": hp1, "hp2": hp2})
+        # Persist per chunk so an interrupted run keeps what it finished.
+        if store is not None:
+            store.put_matchup_results(rows, max_rows=MAX_STORED_MATCHUPS)
+        if progress:
+            progress(len(outcomes), total)
+
+    if todo:
+        workers = cpu_workers()
+        dumps = [r.model_dump() for r in roster]
+        if not parallel or workers == 1:
+            for start in range(0, len(todo), CHUNK_PAIRS):
+                if cancel is not None and cancel.is_set():
+                    raise TournamentCancelled()
+                chunk = todo[start:start + CHUNK_PAIRS]
+                record(chunk, _run_pairs(dumps, chunk, level, max_turns))
+        else:
+            # At least a few tasks per worker, so small tournaments still spread out.
+            size = max(1, min(CHUNK_PAIRS, math.ceil(len(todo) / (workers * 4))))
+            pool = get_pool()
+            futures = {}
+            for start in range(0, len(todo), size):
+                chunk = todo[start:start + size]
+                # Ship only the resources this chunk needs.
+                needed = {i for pair in chunk for i in pair}
+                sub = [dumps[i] if i in needed else None for i in range(len(dumps))]
+                futures[pool.submit(_run_pairs, sub, chunk, level, max_turns)] = chunk
+            for future in as_completed(futures):
+                if cancel is not None and cancel.is_set():
+                    # Chunks already running finish; queued ones are dropped.
+                    for pending in futures:
+                        pending.cancel()
+                    raise TournamentCancelled()
+                record(futures[future], future.result())
+        metrics.record_battles("vectorized", len(todo), sum(outcomes[pair][1] for pair in todo))
+
+    n = len(roster)
+    matrix: List[List[Optional[float]]] = [[None] * n for _ in range(n)]
+    records = [{"wins": 0, "losses": 0, "draws": 0} for _ in range(n)]
+    elo_input = []
+    for i, j in pairs:
+        winner = outcomes[(i, j)][0]
+        score = 1.0 if winner == vectorized.P1 else 0.0 if winner == vectorized.P2 else 0.5
+        matrix[i][j], matrix[j][i] = score, 1.0 - score
+        elo_input.append((i, j, score))
+        if score == 0.5:
+            records[i]["draws"] += 1
+            records[j]["draws"] += 1
+        else:
+            records[i]["wins" if score else "losses"] += 1
+            records[j]["losses" if score else "wins"] += 1
+
+    ratings = elo_ratings(names, elo_input)
+    order = sorted(range(n), key=lambda k: (-ratings[k], names[k]))
+    rankings = [{"rank": rank, "name": names[k], "elo": round(ratings[k], 1), **records[k]}
+                for rank, k in enumerate(order, start=1)]
+
+    return {
+        "roster": names,
+        "level": level,
+        "max_turns": max_turns,
+        "matchups": total,
+        "computed": total - reused,
+        "reused": reused,
+        "matrix": matrix,
+        "rankings": rankings,
+    }
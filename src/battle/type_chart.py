@@ -0,0 +1,58 @@
+# src/battle/type_chart.py
+from typing import Dict, List, Optional, Sequence
+
+# Basic type effectiveness chart (extendable)
+TYPE_CHART = {
+    # Attacking type: {defending_type: multiplier}
+    "normal": {"rock": 0.5, "ghost": 0.0, "steel": 0.5},
+    "fire": {"fire": 0.5, "water": 0.5, "grass": 2.0, "ice": 2.0, "bug": 2.0, "rock": 0.5, "dragon": 0.5, "steel": 2.0},
+    "water": {"fire": 2.0, "water": 0.5, "grass": 0.5, "ground": 2.0, "rock": 2.0, "dragon": 0.5},
+    "electric": {"water": 2.0, "electric": 0.5, "grass": 0.5, "ground": 0.0, "flying": 2.0, "dragon": 0.5},
+    "grass": {"fire": 0.5, "water": 2.0, "grass": 0.5, "poison": 0.5, "ground": 2.0, "flying": 0.5, "bug": 0.5, "rock": 2.0, "dragon": 0.5, "steel": 0.5},
+    "ice": {"fire": 0.5, "water": 0.5, "grass": 2.0, "ice": 0.5, "ground": 2.0, "flying": 2.0, "dragon": 2.0, "steel": 0.5},
+    "fighting": {"normal": 2.0, "ice": 2.0, "rock": 2.0, "dark": 2.0, "steel": 2.0, "poison": 0.5, "flying": 0.5, "psychic": 0.5, "bug": 0.5, "ghost": 0.0, "fairy": 0.5},
+    "poison": {"grass": 2.0, "poison": 0.5, "ground": 0.5, "rock": 0.5, "ghost": 0.5, "steel": 0.0, "fairy": 2.0},
+    "ground": {"fire": 2.0, "electric": 2.0, "grass": 0.5, "poison": 2.0, "flying": 0.0, "bug": 0.5, "rock": 2.0, "steel": 2.0},
+    "flying": {"electric": 0.5, "grass": 2.0, "fighting": 2.0, "bug": 2.0, "rock": 0.5, "steel": 0.5},
+    "psychic": {"fighting": 2.0, "poison": 2.0, "psychic": 0.5, "dark": 0.0, "steel": 0.5},
+    "bug": {"fire": 0.5, "grass": 2.0, "fighting": 0.5, "poison": 0.5, "flying": 0.5, "psychic": 2.0, "ghost": 0.5, "dark": 2.0, "steel": 0.5, "fairy": 0.5},
+    "rock": {"fire": 2.0, "ice": 2.0, "fighting": 0.5, "ground": 0.5, "flying": 2.0, "bug": 2.0, "steel": 0.5},
+    "ghost": {"normal": 0.0, "psychic": 2.0, "ghost": 2.0, "dark": 0.5},
+    "dragon": {"dragon": 2.0, "steel": 0.5, "fairy": 0.0},
+    "dark": {"fighting": 0.5, "psychic": 2.0, "ghost": 2.0, "dark": 0.5, "fairy": 0.5},
+    "steel": {"fire": 0.5, "water": 0.5, "electric": 0.5, "ice": 2.0, "rock": 2.0, "fairy": 2.0, "steel": 0.5},
+    "fairy": {"fire": 0.5, "fighting": 2.0, "poison": 0.5, "dragon": 2.0, "dark": 2.0, "steel": 0.5}
+}
+
+# Integer ids for the 18 types, in TYPE_CHART order
+TYPES: List[str] = list(TYPE_CHART)
+TYPE_IDS: Dict[str, int] = {t: i for i, t in enumerate(TYPES)}
+UNKNOWN_TYPE = -1
+
+# TYPE_MATRIX[attacking_id][defending_id] -> multiplier
+TYPE_MATRIX: List[List[float]] = [
+    [TYPE_CHART[attacking].get(defending, 1.0) for defending in TYPES] for attacking in TYPES
+]
+
+def type_id(type_name: Optional[str]) -> int:
+    return TYPE_IDS.get((type_name or "").lower(), UNKNOWN_TYPE)
+
+def effectiveness(move_type_id: int, defender_type_ids: Sequence[int]) -> float:
+    """Matrix lookup equivalent of type_effectiveness on integer type ids."""
+    if move_type_id == UNKNOWN_TYPE:
+        return 1.0
+    row = TYPE_MATRIX[move_type_id]
+    m = 1.0
+    for d in defender_type_ids:
+        if d != UNKNOWN_TYPE:
+            m *= row[d]
+    return m
+
+def type_effectiveness(move_type: str, defender_types: List[str]) -> float:
+    m = 1.0
+    move_type = (move_type or "").lower()
+    for d in defender_types:
+        d = d.lower()
+        if move_type in TYPE_CHART and d in TYPE_CHART[move_type]:
+            m *= TYPE_CHART[move_type][d]
+    return m
@@ -0,0 +1,153 @@
+# src/battle/vectorized.py
+"""
+Lockstep battle kernel: simulates many battles at once as NumPy arrays.
+
+Follows the same rules as simulator.simulate_battle (the compiled top-3
+candidates and damage, paralysis, speed order and end-of-turn status
+damage) but advances every battle one turn per iteration with vectorized
+damage rolls, for Monte Carlo runs and matchup matrices.
+"""
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.pokemon.models import PokemonResource
+from src.battle.compiled import compile_matchup, TOP_MOVES as CANDIDATES
+
+DRAW, P1, P2 = 0, 1, 2
+
+
+def build_arrays(pairs: Sequence[Tuple[PokemonResource, PokemonResource]], level: int = 50,
+                 statuses: Optional[Sequence[Tuple[Sequence[str], Sequence[str]]]] = None) -> Dict[str, np.ndarray]:
+    """
+    Pack B matchups into arrays indexed [battle, side] (side 0 = p1) and
+    [battle, side, candidate]. Identical matchups should be packed once and
+    expanded with `repeat_arrays` rather than recompiled per battle.
+    """
+    b = len(pairs)
+    arrays = {
+        "max_hp": np.zeros((b, 2), dtype=np.int64),
+        "speed": np.zeros((b, 2), dtype=np.int64),
+        "paralysis": np.zeros((b, 2), dtype=bool),
+        "burn": np.zeros((b, 2), dtype=bool),
+        "poison": np.zeros((b, 2), dtype=bool),
+        "n_moves": np.zeros((b, 2), dtype=np.int64),
+        "base": np.zeros((b, 2, CANDIDATES), dtype=np.float64),
+        "mult": np.zeros((b, 2, CANDIDATES), dtype=np.float64),
+        "physical": np.zeros((b, 2, CANDIDATES), dtype=bool),
+        "has_power": np.zeros((b, 2, CANDIDATES), dtype=bool),
+    }
+    for i, (p1, p2) in enumerate(pairs):
+        for side, combatant in enumerate(compile_matchup(p1, p2, level)):
+            arrays["max_hp"][i, side] = combatant.max_hp
+            arrays["speed"][i, side] = combatant.speed
+            cands = combatant.ranked[:CANDIDATES]
+            arrays["n_moves"][i, side] = len(cands)
+            for k, move in enumerate(cands):
+                arrays["base"][i, side, k] = move.base
+                arrays["mult"][i, side, k] = move.mult
+                arrays["physical"][i, side, k] = move.is_physical
+                arrays["has_power"][i, side, k] = move.has_power
+            if statuses is not None:
+                for flag in ("paralysis", "burn", "poison"):
+                    arrays[flag][i, side] = flag in statuses[i][side]
+    return arrays
+
+
+def repeat_arrays(arrays: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    """Tile every battle in `arrays` n times (battle i -> rows i*n .. i*n+n-1)."""
+    return {k: np.repeat(v, n, axis=0) for k, v in arrays.items()}
+
+
+def run_arrays(arrays: Dict[str, np.ndarray], deterministic: bool = False, max_turns: int = 200,
+               rng: Optional[np.random.Generator] = None, deadline: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Advance all battles in lockstep until each has a result.
+    Returns arrays: winner (DRAW/P1/P2), turns, hp (final HP per side).
+    Raises TimeoutError once time.monotonic() passes `deadline`.
+    """
+    if rng is None and not deterministic:
+        rng = np.random.default_rng()
+    b = arrays["max_hp"].shape[0]
+    rows = np.arange(b)
+    hp = arrays["max_hp"].copy()
+    max_hp = arrays["max_hp"]
+    paralysis, burn, poison = arrays["paralysis"], arrays["burn"], arrays["poison"]
+    n_moves = arrays["n_moves"]
+
+    speed = np.where(paralysis, np.floor(arrays["speed"] * 0.5).astype(np.int64), arrays["speed"])
+    # End-of-turn chip damage is constant per battle and side.
+    chip = (np.where(poison, max_hp // 8, 0) + np.where(burn, max_hp // 16, 0))
+    # Burn halves physical damage for the burned attacker.
+    burn_factor = np.where(arrays["physical"] & burn[:, :, None], 0.5, 1.0)
+
+    winner = np.full(b, DRAW, dtype=np.int8)
+    turns = np.full(b, max_turns, dtype=np.int64)
+    active = np.ones(b, dtype=bool)
+
+    for turn in range(1, max_turns + 1):
+        if not active.any():
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"battles exceeded their deadline at turn {turn}")
+        idx = rows[active]
+        s1, s2 = speed[idx, 0], speed[idx, 1]
+        if deterministic:
+            tie_p1 = np.ones(idx.size, dtype=bool)
+        else:
+            tie_p1 = rng.random(idx.size) < 0.5
+        p1_first = (s1 > s2) | ((s1 == s2) & tie_p1)
+
+        ended = np.zeros(idx.size, dtype=bool)
+        for slot in (0, 1):
+            att = np.where(p1_first, 0, 1) if slot == 0 else np.where(p1_first, 1, 0)
+            dfn = 1 - att
+            acting = ~ended & (hp[idx, att] > 0) & (hp[idx, dfn] > 0) & (n_moves[idx, att] > 0)
+
+            if deterministic:
+                k = np.zeros(idx.size, dtype=np.int64)
+                stuck = paralysis[idx, att]
+                rand = 1.0
+            else:
+                k = np.floor(rng.random(idx.size) * np.maximum(n_moves[idx, att], 1)).astype(np.int64)
+                stuck = paralysis[idx, att] & (rng.random(idx.size) < 0.25)
+                rand = rng.uniform(0.85, 1.0, idx.size)
+            acting &= ~stuck
+
+            # same operation order as CompiledMove.damage: base * ((stab * type_mult * rand) * burn)
+            modifier = arrays["mult"][idx, att, k] * rand * burn_factor[idx, att, k]
+            dmg = np.floor(arrays["base"][idx, att, k] * modifier).astype(np.int64)
+            dmg = np.where(arrays["has_power"][idx, att, k], np.maximum(dmg, 1), 0)
+            dmg = np.where(acting, dmg, 0)
+            hp[idx, dfn] -= dmg
+
+            fainted = acting & (hp[idx, dfn] <= 0)
+            winner[idx[fainted]] = np.where(att[fainted] == 0, P1, P2)
+            turns[idx[fainted]] = turn
+            ended |= fainted
+
+        # End-of-turn status damage for battles still running
+        live = idx[~ended]
+        hp[live] -= chip[live]
+        down1 = hp[live, 0] <= 0
+        down2 = hp[live, 1] <= 0
+        over = down1 | down2
+        winner[live[down1 & down2]] = DRAW
+        winner[live[down1 & ~down2]] = P2
+        winner[live[down2 & ~down1]] = P1
+        turns[live[over]] = turn
+        ended[~ended] = over
+        active[idx[ended]] = False
+
+    return {"winner": winner, "turns": turns, "hp": hp}
+
+
+def simulate_many(p1: PokemonResource, p2: PokemonResource, n: int, level: int = 50,
+                  deterministic: bool = False, max_turns: int = 200, seed: Optional[int] = None,
+                  statuses: Optional[Tuple[Sequence[str], Sequence[str]]] = None,
+                  deadline: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Run `n` battles of one matchup in lockstep."""
+    arrays = build_arrays([(p1, p2)], level, [statuses] if statuses is not None else None)
+    return run_arrays(repeat_arrays(arrays, n), deterministic=deterministic, max_turns=max_turns,
+                      rng=np.random.default_rng(seed), deadline=deadline)
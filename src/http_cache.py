@@ -0,0 +1,106 @@
+"""
+Pre-encoded JSON responses with strong ETags and optional gzip.
+
+Hot read endpoints keep each resource's JSON bytes (and a gzipped copy for
+larger bodies) next to the object they were encoded from, so a repeat read
+is a dict lookup plus an identity check: no pydantic validation or
+serialization. Conditional requests (`If-None-Match`) are answered with 304.
+"""
+import gzip
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.pokemon.cache import TTLCache
+
+# Bodies below this are not worth a Content-Encoding round trip.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+class EncodedJSON:
+    """A JSON body with its strong ETag and, for larger bodies, a gzipped copy."""
+
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # mtime=0 keeps the compressed bytes (and so their ETag) reproducible.
+        self.gzipped = gzip.compress(body, GZIP_LEVEL, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def json_response(request: Request, encoded: EncodedJSON) -> Response:
+    """200 with the (possibly gzipped) body, or 304 when the client's copy is current."""
+    use_gzip = encoded.gzipped is not None and accepts_gzip(request.headers.get("accept-encoding", ""))
+    # Each representation gets its own strong validator.
+    etag = encoded.etag[:-1] + '-gzip"' if use_gzip else encoded.etag
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(encoded.gzipped, media_type="application/json", headers=headers)
+    return Response(encoded.body, media_type="application/json", headers=headers)
+
+
+class EncodedCache:
+    """
+    Encoded bodies keyed by resource, reused while the source object is the
+    one the caller currently holds (so a refreshed resource is re-encoded).
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self._cache = TTLCache(maxsize, None)
+        self._lock = threading.Lock()
+        self._counts = {"hit": 0, "miss": 0}
+
+    def encoded(self, key: Hashable, value: Any, encode: Callable[[Any], bytes]) -> EncodedJSON:
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] is value:
+            result = "hit"
+            encoded = entry[1]
+        else:
+            result = "miss"
+            encoded = EncodedJSON(encode(value))
+            self._cache.set(key, (value, encoded))
+        with self._lock:
+            self._counts[result] += 1
+        return encoded
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, "entries": len(self._cache)}
+
+
+def encode_model(model) -> bytes:
+    return model.model_dump_json().encode()
+
+
+# Shared by the resource endpoints.
+encoded_cache = EncodedCache()
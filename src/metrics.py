@@ -0,0 +1,234 @@
+"""
+Minimal Prometheus instrumentation (text exposition format 0.0.4).
+
+Counters and histograms are plain dicts behind one lock each, cheap enough
+to leave on in production. State that already lives elsewhere (repository
+and result-cache counters) is read at scrape time through collectors
+instead of being double-counted on the hot path.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds; covers memory hits (~100µs) through slow upstream fetches.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Samples = Dict[Tuple[str, ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def format_metric(name: str, help: str, type: str, label_names: Sequence[str], samples: Samples) -> List[str]:
+    """Exposition lines for one metric family given {label values: value}."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+    for values, value in sorted(samples.items()):
+        lines.append(f"{name}{_labels(label_names, values)} {_number(value)}")
+    return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Samples = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Samples:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return format_metric(self.name, self.help, "counter", self.label_names, self.samples())
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, n) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels(self.label_names, values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, values)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect: Callable[[], Iterable[str]]) -> None:
+        """`collect()` returns exposition lines, evaluated on every scrape."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# -- HTTP -------------------------------------------------------------------
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ["method", "route", "status"])
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "Time to complete an HTTP response, by route template.", ["method", "route"])
+
+# -- PokéAPI client ---------------------------------------------------------
+
+client_cache = registry.counter(
+    "pokeapi_client_cache_requests_total", "PokeAPIClient response cache lookups.", ["endpoint", "result"])
+upstream_requests = registry.counter(
+    "pokeapi_upstream_requests_total", "Upstream PokéAPI requests by endpoint and outcome.", ["endpoint", "outcome"])
+upstream_latency = registry.histogram(
+    "pokeapi_upstream_request_duration_seconds", "Upstream PokéAPI request latency.", ["endpoint"])
+upstream_retries = registry.counter(
+    "pokeapi_upstream_retries_total", "Upstream PokéAPI attempts retried after a transient failure.", ["endpoint"])
+prefetch = registry.counter(
+    "pokemon_prefetch_total", "Evolution-family prefetch items by outcome.", ["result"])
+
+# -- simulator --------------------------------------------------------------
+
+battles = registry.counter("battles_total", "Battles simulated, by engine.", ["engine"])
+battle_turns = registry.counter("battle_turns_total", "Battle turns simulated, by engine.", ["engine"])
+battle_phase_seconds = registry.counter(
+    "battle_phase_seconds_total",
+    "Simulator time by phase: compile (move ranking and damage precomputation) "
+    "and turns (per-turn move picks, damage rolls and status).", ["phase"])
+battle_jobs = registry.counter(
+    "battle_jobs_total", "Battle jobs by final status, plus submissions rejected by admission control.", ["status"])
+
+
+def record_battles(engine: str, count: int, turns: int, compile_seconds: float = 0.0,
+                   turn_seconds: float = 0.0) -> None:
+    """
+    Simulator counters. Batch callers record once per batch rather than
+    once per battle, so the hot loop itself carries no instrumentation.
+    """
+    battles.inc(engine, amount=count)
+    battle_turns.inc(engine, amount=turns)
+    if compile_seconds:
+        battle_phase_seconds.inc("compile", amount=compile_seconds)
+    if turn_seconds:
+        battle_phase_seconds.inc("turns", amount=turn_seconds)
+
+
+def hit_ratio_metric(name: str, help: str, label_names: Sequence[str],
+                     hits: Samples, misses: Samples) -> List[str]:
+    """Gauge of hits / (hits + misses) per label set."""
+    ratios = {}
+    for labels in set(hits) | set(misses):
+        total = hits.get(labels, 0) + misses.get(labels, 0)
+        if total:
+            ratios[labels] = hits.get(labels, 0) / total
+    return format_metric(name, help, "gauge", label_names, ratios)
+
+
+def _collect_client_cache_ratio() -> List[str]:
+    samples = client_cache.samples()
+    hits = {(e,): v for (e, result), v in samples.items() if result == "hit"}
+    misses = {(e,): v for (e, result), v in samples.items() if result == "miss"}
+    return hit_ratio_metric("pokeapi_client_cache_hit_ratio", "PokeAPIClient response cache hit ratio.",
+                            ["endpoint"], hits, misses)
+
+
+registry.register_collector(_collect_client_cache_ratio)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP response, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router records the matched route in the shared scope.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_latency.observe(time.perf_counter() - start, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status[0]))
+
+
+def render() -> str:
+    return registry.render()
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after `ttl` seconds.
+    Bounded by entry count and, when `max_bytes` is set, by the total of the
+    sizes passed to `set`.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.bytes -= size
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int = 0) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            old = self._data.get(key)
+            if old is not None:
+                self.bytes -= old[2]
+            self._data[key] = (value, expires_at, size)
+            self._data.move_to_end(key)
+            self.bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        # The newest entry stays even if it alone exceeds max_bytes.
+        while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.bytes -= evicted
+
+    def resize(self, maxsize: int, max_bytes: Optional[int] = None) -> None:
+        """Change the bounds, evicting least recently used entries beyond them."""
+        with self._lock:
+            self.maxsize, self.max_bytes = maxsize, max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key: the first caller runs `fn`,
+    everyone else arriving while it is in flight waits for that result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,97 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Below this trigram similarity a candidate is not considered a fuzzy match.
+FUZZY_THRESHOLD = 0.3
+
+
+def _trigrams(text: str) -> Set[str]:
+    """pg_trgm-style trigrams: pad with two leading and one trailing space."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    In-memory index over Pokémon names.
+    A sorted list answers prefix queries with bisect; a trigram posting map
+    narrows substring candidates and drives typo-tolerant fuzzy matching.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._sorted: List[str] = []
+        self._grams: Dict[str, Set[str]] = {}
+        self._name_grams: Dict[str, Set[str]] = {}
+        self.add_many(names)
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._name_grams
+
+    def add(self, name: str) -> None:
+        self.add_many([name])
+
+    def add_many(self, names: Iterable[str]) -> None:
+        with self._lock:
+            new = {n.lower() for n in names} - self._name_grams.keys()
+            if not new:
+                return
+            for name in new:
+                grams = _trigrams(name)
+                self._name_grams[name] = grams
+                for g in grams:
+                    self._grams.setdefault(g, set()).add(name)
+            self._sorted = sorted(self._name_grams)
+
+    def prefix(self, query: str) -> List[str]:
+        query = query.lower()
+        names = self._sorted
+        lo = bisect.bisect_left(names, query)
+        hi = bisect.bisect_left(names, query + "\uffff", lo)
+        return names[lo:hi]
+
+    def _substring(self, query: str) -> List[str]:
+        if len(query) < 3:
+            return [n for n in self._sorted if query in n]
+        # Every name containing the query contains all of its inner trigrams.
+        inner = [query[i:i + 3] for i in range(len(query) - 2)]
+        postings = sorted((self._grams.get(g, set()) for g in inner), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        return [n for n in candidates if query in n]
+
+    def _fuzzy(self, query: str) -> List[Tuple[float, str]]:
+        q_grams = _trigrams(query)
+        shared: Dict[str, int] = {}
+        for g in q_grams:
+            for name in self._grams.get(g, ()):
+                shared[name] = shared.get(name, 0) + 1
+        scored = []
+        for name, common in shared.items():
+            similarity = common / (len(q_grams) + len(self._name_grams[name]) - common)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((similarity, name))
+        return scored
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, fuzzy: bool = True) -> List[str]:
+        """
+        Ranked matches: exact, then prefix, then substring (earlier position
+        first), then fuzzy by trigram similarity. Shorter names win ties.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        ranked: Dict[str, Tuple] = {}
+        with self._lock:
+            for name in self.prefix(query):
+                ranked[name] = (0 if name == query else 1, 0, len(name), name)
+            for name in self._substring(query):
+                ranked.setdefault(name, (2, name.index(query), len(name), name))
+            if fuzzy:
+                for similarity, name in self._fuzzy(query):
+                    ranked.setdefault(name, (3, -similarity, len(name), name))
+        ordered = sorted(ranked.values())
+        return [key[-1] for key in ordered[offset:offset + limit]]
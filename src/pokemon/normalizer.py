@@ -1,9 +1,18 @@
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from src.pokemon.models import PokemonResource, MoveShort
-from src.pokemon.poke_client import PokeAPIClient
-import traceback
+from src.pokemon.poke_client import PokeAPIClient, client
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import logging
+from src import profiling
 
-client = PokeAPIClient()
+logger = logging.getLogger(__name__)
+
+# Number of moves resolved with full details per Pokémon.
+MOVE_LIMIT = 5
+
+# Bounded pool for the per-Pokémon upstream fan-out (moves + evolution chain).
+_fetch_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="normalize")
 
 def _parse_evolution_chain(chain: Dict) -> List[str]:
     """Flatten evolution chain into a list of names."""
@@ -17,8 +26,80 @@ def _parse_evolution_chain(chain: Dict) -> List[str]:
     traverse(chain["chain"])
     return result
 
-def normalize_pokemon(raw: Dict) -> PokemonResource:
-    """Convert PokéAPI raw JSON into our PokemonResource schema."""
+def normalize_move(move_raw: Dict) -> MoveShort:
+    """Convert PokéAPI raw move JSON into our MoveShort schema."""
+    return MoveShort(
+        name=move_raw["name"],
+        type=move_raw["type"]["name"],
+        power=move_raw.get("power"),
+        accuracy=move_raw.get("accuracy"),
+        pp=move_raw.get("pp"),
+        damage_class=move_raw["damage_class"]["name"],
+        short_effect=move_raw["effect_entries"][0]["short_effect"]
+            if move_raw.get("effect_entries") else None,
+        move_resource_uri=f"/resources/move/{move_raw['name']}"
+    )
+
+def _placeholder_move(move_name: str) -> MoveShort:
+    return MoveShort(
+        name=move_name,
+        type=None,
+        power=None,
+        accuracy=None,
+        pp=None,
+        damage_class=None,
+        short_effect=None,
+        move_resource_uri=f"/resources/move/{move_name}"
+    )
+
+def _fetch_move(api: PokeAPIClient, move_name: str,
+                resolve_move: Optional[Callable[[str], MoveShort]] = None) -> MoveShort:
+    """Fetch one move; a failed fetch becomes a placeholder MoveShort."""
+    try:
+        if resolve_move is not None:
+            return resolve_move(move_name)
+        return normalize_move(api.get_move(move_name))
+    except Exception:
+        return _placeholder_move(move_name)
+
+def _fetch_evolution_chain(api: PokeAPIClient, pokemon_id: int, species_name: Optional[str] = None,
+                           resolve_chain: Optional[Callable[[str], Optional[List[str]]]] = None) -> List[str]:
+    """Fetch species -> evolution chain; a failed chain becomes []."""
+    try:
+        # A family's chain is shared by all its species: reuse a known one.
+        if resolve_chain is not None and species_name:
+            known = resolve_chain(species_name)
+            if known:
+                return known
+        species = api.get_species(pokemon_id)
+        evo_chain_url = species["evolution_chain"]["url"]
+        evo_chain_id = evo_chain_url.rstrip("/").split("/")[-1]
+        evo_raw = api.get_evolution_chain(evo_chain_id)
+        return _parse_evolution_chain(evo_raw)
+    except Exception as e:
+        logger.debug("Evolution chain fetch failed for %s: %s: %s", pokemon_id, type(e).__name__, e, exc_info=True)
+        return []
+
+def normalize_pokemon(raw: Dict, api: Optional[PokeAPIClient] = None,
+                      resolve_move: Optional[Callable[[str], MoveShort]] = None,
+                      resolve_chain: Optional[Callable[[str], Optional[List[str]]]] = None) -> PokemonResource:
+    """
+    Convert PokéAPI raw JSON into our PokemonResource schema.
+    `resolve_move(name)` and `resolve_chain(species)` let a caller serve
+    moves and evolution chains from its own cache before going upstream.
+    """
+    api = api or client
+
+    # Fan out the dependent upstream calls: each move and the
+    # species -> evolution chain path run concurrently, so a cold lookup
+    # costs the slowest branch rather than the sum of all of them.
+    move_names = [m["move"]["name"] for m in raw["moves"][:MOVE_LIMIT]]
+    species_name = (raw.get("species") or {}).get("name") or raw["name"]
+    # Each task runs in a copy of the caller's context (e.g. a background upstream budget).
+    chain_future = _fetch_pool.submit(contextvars.copy_context().run, profiling.bind(_fetch_evolution_chain),
+                                      api, raw["id"], species_name, resolve_chain)
+    move_futures = [_fetch_pool.submit(contextvars.copy_context().run, profiling.bind(_fetch_move),
+                                       api, n, resolve_move) for n in move_names]
 
     # Base stats
     stats = {s["stat"]["name"]: s["base_stat"] for s in raw["stats"]}
@@ -37,58 +118,11 @@ def normalize_pokemon(raw: Dict) -> PokemonResource:
     # Abilities
     abilities = [a["ability"]["name"] for a in raw["abilities"]]
 
-    # Moves (limit to first 5 with details)
-    moves: List[MoveShort] = []
-    for move_entry in raw["moves"][:5]:
-        move_name = move_entry["move"]["name"]
-        try:
-            move_raw = client.get_move(move_name)
-            moves.append(
-                MoveShort(
-                    name=move_raw["name"],
-                    type=move_raw["type"]["name"],
-                    power=move_raw.get("power"),
-                    accuracy=move_raw.get("accuracy"),
-                    pp=move_raw.get("pp"),
-                    damage_class=move_raw["damage_class"]["name"],
-                    short_effect=move_raw["effect_entries"][0]["short_effect"]
-                        if move_raw.get("effect_entries") else None,
-                    move_resource_uri=f"/resources/move/{move_name}"
-                )
-            )
-        except Exception:
-            moves.append(
-                MoveShort(
-                    name=move_name,
-                    type=None,
-                    power=None,
-                    accuracy=None,
-                    pp=None,
-                    damage_class=None,
-                    short_effect=None,
-                    move_resource_uri=f"/resources/move/{move_name}"
-                )
-            )
+    # Moves (limit to first 5 with details), in the original order
+    moves: List[MoveShort] = [f.result() for f in move_futures]
 
     # Evolution chain
-    try:
-        species = client.get_species(raw["id"])
-        # print(f"[DEBUG] species keys: {species.keys()}", flush=True)
-        # print(f"[DEBUG] evolution_chain URL: {species.get('evolution_chain')}", flush=True)
-
-        evo_chain_url = species["evolution_chain"]["url"]
-        evo_chain_id = evo_chain_url.rstrip("/").split("/")[-1]
-        # print(f"[DEBUG] evo_chain_id = {evo_chain_id}", flush=True)
-
-        evo_raw = client.get_evolution_chain(evo_chain_id)
-        # print(f"[DEBUG] evo_raw keys: {evo_raw.keys()}", flush=True)
-
-        evolution_chain = _parse_evolution_chain(evo_raw)
-        # print(f"[DEBUG] parsed evolution_chain: {evolution_chain}", flush=True)
-    except Exception as e:
-        # print(f"[DEBUG] Evolution chain fetch failed: {type(e).__name__}: {e}", flush=True)
-        # traceback.print_exc()
-        evolution_chain = []
+    evolution_chain = chain_future.result()
     return PokemonResource(
         id=raw["id"],
         name=raw["name"],
@@ -1,45 +1,212 @@
+import os
+import threading
+import time
 import requests
-from functools import lru_cache
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 import logging
+
+from src.pokemon.cache import TTLCache, SingleFlight
+from src.pokemon import projection
+from src.pokemon.ratelimit import TokenBucket
+from src.pokemon.resilience import UpstreamGovernor, CircuitOpenError, RetryPolicy
+from src import metrics
+
 logger = logging.getLogger(__name__)
 
 POKEAPI_BASE = "https://pokeapi.co/api/v2"
 
+# (connect, read) timeout in seconds for every upstream call
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# Per-endpoint cache sizes (entries)
+CACHE_SIZES = {
+    "pokemon": 256,
+    "move": 512,
+    "pokemon-species": 256,
+    "evolution-chain": 128,
+    "pokemon-list": 4,
+}
+
+# Per-endpoint byte bounds (compact JSON size of the slimmed documents)
+CACHE_BYTES = {
+    "pokemon": 4 << 20,
+    "move": 1 << 20,
+    "pokemon-species": 256 << 10,
+    "evolution-chain": 256 << 10,
+    "pokemon-list": 512 << 10,
+}
+
 class PokeAPIClient:
-    def __init__(self, base_url: str = POKEAPI_BASE):
+    """
+    PokéAPI client over a pooled keep-alive `requests.Session`.
+    Responses are slimmed to the fields the normalizer reads while they are
+    parsed (see projection.py) and cached per endpoint, bounded by entries
+    and bytes; concurrent requests for the same cold key are coalesced into
+    a single upstream fetch. Upstream requests go through an
+    UpstreamGovernor (concurrency cap, retries with backoff, circuit
+    breaker, optional rate limit).
+    """
+
+    def __init__(self, base_url: str = POKEAPI_BASE, pool_size: int = 20,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 governor: Optional[UpstreamGovernor] = None):
         self.base_url = base_url
+        self.host = urlsplit(base_url).netloc
+        self.timeout = timeout
+        self.governor = governor or UpstreamGovernor()
+        if rate_limiter is not None:
+            self.rate_limiter = rate_limiter
+        self.fetch_counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._caches = {endpoint: TTLCache(size, max_bytes=CACHE_BYTES[endpoint])
+                        for endpoint, size in CACHE_SIZES.items()}
+        self._flight = SingleFlight()
+
+    @property
+    def rate_limiter(self) -> Optional[TokenBucket]:
+        """Optional token bucket every upstream attempt must pass through."""
+        return self.governor.rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter: Optional[TokenBucket]) -> None:
+        self.governor.rate_limiter = limiter
+
+    def healthy(self) -> bool:
+        """False while the upstream circuit breaker is open or probing."""
+        return self.governor.healthy(self.host)
+
+    def _request(self, endpoint: str, url: str, params: Optional[Dict[str, Any]],
+                 cache_name: str) -> Dict[str, Any]:
+        """One upstream attempt."""
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(url, params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            data = projection.parse(cache_name, resp.content)
+        except Exception:
+            metrics.upstream_requests.inc(endpoint, "error")
+            raise
+        finally:
+            metrics.upstream_latency.observe(time.perf_counter() - start, endpoint)
+        metrics.upstream_requests.inc(endpoint, "ok")
+        return data
+
+    def _get(self, endpoint: str, key: str = "", params: Optional[Dict[str, Any]] = None,
+             cache_name: Optional[str] = None) -> Dict[str, Any]:
+        cache_name = cache_name or endpoint
+        cache = self._caches[cache_name]
+        cache_key = (key, tuple(sorted(params.items()))) if params else key
+        cached = cache.get(cache_key)
+        if cached is not None:
+            metrics.client_cache.inc(cache_name, "hit")
+            return cached
+        metrics.client_cache.inc(cache_name, "miss")
+
+        def fetch() -> Dict[str, Any]:
+            # Another caller may have filled the cache while we queued up.
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            url = f"{self.base_url}/{endpoint}/{key}" if key else f"{self.base_url}/{endpoint}"
+            with self._counts_lock:
+                self.fetch_counts[endpoint] = self.fetch_counts.get(endpoint, 0) + 1
+            try:
+                data = self.governor.call(self.host, lambda: self._request(endpoint, url, params, cache_name),
+                                          on_retry=lambda e: metrics.upstream_retries.inc(endpoint))
+            except CircuitOpenError:
+                metrics.upstream_requests.inc(endpoint, "rejected")
+                raise
+            cache.set(cache_key, data, projection.encoded_size(data))
+            return data
+
+        return self._flight.do((endpoint, cache_key), fetch)
 
-    @lru_cache(maxsize=256)
     def get_pokemon(self, name_or_id: str) -> Dict[str, Any]:
-        url = f"{self.base_url}/pokemon/{name_or_id.lower()}"
-        resp = requests.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get("pokemon", str(name_or_id).lower())
 
-    @lru_cache(maxsize=512)
     def get_move(self, name_or_id: str) -> Dict[str, Any]:
-        url = f"{self.base_url}/move/{name_or_id.lower()}"
-        resp = requests.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get("move", str(name_or_id).lower())
 
-    @lru_cache(maxsize=256)
     def get_species(self, name_or_id: str) -> Dict[str, Any]:
         name_or_id = str(name_or_id).lower()
-        url = f"{self.base_url}/pokemon-species/{name_or_id}"
-        resp = requests.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get("pokemon-species", name_or_id)
 
-    @lru_cache(maxsize=128)
     def get_evolution_chain(self, chain_id: str) -> Dict[str, Any]:
-        url = f"{self.base_url}/evolution-chain/{chain_id}"
-        resp = requests.get(url)
-        resp.raise_for_status()
-        return resp.json()
-# At the bottom of poke_client.py
-# if __name__ == "__main__":
-#     client = PokeAPIClient()
-#     data = client.get_evolution_chain("eevee")
-#     print(data)
+        return self._get("evolution-chain", str(chain_id))
+
+    def get_pokemon_list(self, limit: int = 2000) -> Dict[str, Any]:
+        """The paginated `/pokemon` index (names + urls)."""
+        return self._get("pokemon", params={"limit": limit}, cache_name="pokemon-list")
+
+    def get_species_count(self) -> int:
+        """Number of species in the national dex."""
+        return self._get("pokemon-species", params={"limit": 1}, cache_name="pokemon-list")["count"]
+
+    def grow_cache(self, endpoint: str, maxsize: int) -> Tuple[int, Optional[int]]:
+        """
+        Raise the cache size for one endpoint, e.g. for bulk jobs (the byte
+        bound grows in proportion). Returns the previous (maxsize, max_bytes)
+        for resize_cache to restore.
+        """
+        cache = self._caches[endpoint]
+        previous = (cache.maxsize, cache.max_bytes)
+        if maxsize > cache.maxsize:
+            max_bytes = cache.max_bytes * maxsize // cache.maxsize if cache.max_bytes is not None else None
+            cache.resize(maxsize, max_bytes)
+        return previous
+
+    def resize_cache(self, endpoint: str, maxsize: int, max_bytes: Optional[int] = None) -> None:
+        """Set one endpoint cache's bounds, evicting what no longer fits."""
+        self._caches[endpoint].resize(maxsize, max_bytes)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Entries and bytes held per endpoint cache."""
+        return {name: {"entries": len(cache), "bytes": cache.bytes, "max_bytes": cache.max_bytes}
+                for name, cache in self._caches.items()}
+
+    def clear_cache(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+# Shared process-wide instance so every caller hits the same caches.
+client = PokeAPIClient(
+    pool_size=int(os.environ.get("POKEAPI_POOL_SIZE", "20")),
+    timeout=(float(os.environ.get("POKEAPI_CONNECT_TIMEOUT", DEFAULT_TIMEOUT[0])),
+             float(os.environ.get("POKEAPI_READ_TIMEOUT", DEFAULT_TIMEOUT[1]))),
+    rate_limiter=TokenBucket(float(os.environ["POKEAPI_RATE"])) if os.environ.get("POKEAPI_RATE") else None,
+    governor=UpstreamGovernor(
+        max_concurrency=int(os.environ.get("POKEAPI_MAX_CONCURRENCY", "16")),
+        retry=RetryPolicy(attempts=int(os.environ.get("POKEAPI_RETRY_ATTEMPTS", "3")),
+                          max_total_wait=float(os.environ.get("POKEAPI_RETRY_BUDGET", "1.5"))),
+        failure_threshold=int(os.environ.get("POKEAPI_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.environ.get("POKEAPI_BREAKER_RESET", "30")),
+    ),
+)
+
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _collect_breakers() -> List[str]:
+    states = {(host,): _BREAKER_STATES[state] for host, state in client.governor.breaker_states().items()}
+    return metrics.format_metric("pokeapi_circuit_state", "Upstream circuit breaker: 0 closed, 1 half-open, 2 open.",
+                                 "gauge", ["host"], states)
+
+
+metrics.registry.register_collector(_collect_breakers)
+
+
+def _collect_cache_bytes() -> List[str]:
+    sizes = {(name,): stats["bytes"] for name, stats in client.cache_stats().items()}
+    return metrics.format_metric("pokeapi_client_cache_bytes", "Bytes of slimmed PokéAPI documents cached per endpoint.",
+                                 "gauge", ["endpoint"], sizes)
+
+
+metrics.registry.register_collector(_collect_cache_bytes)
@@ -0,0 +1,141 @@
+"""
+Background prefetch of evolution families.
+
+Clients that ask for one Pokémon usually ask for the rest of its
+evolution family (and those members' moves) next. When the repository
+normalizes a Pokémon fetched from upstream it hands it to a
+FamilyPrefetcher, which loads the other family members into the
+repository from a single low-priority worker thread:
+
+- the queue is bounded; when it is full new members are dropped, not queued;
+- a member is scheduled at most once per SEEN_TTL (and skipped if memory
+  already holds it);
+- members that need upstream requests only start while no other PokéAPI
+  request is in flight and the circuit is closed, and every upstream
+  request they make (Pokémon, species, chain, moves; retries included)
+  spends a token from a budget bucket of `rate` requests per second, so
+  prefetching yields to foreground traffic instead of competing with it.
+"""
+import logging
+import queue
+import threading
+from typing import Any, Dict, Optional
+
+from src.pokemon.cache import TTLCache
+from src.pokemon.models import PokemonResource
+from src.pokemon.ratelimit import TokenBucket
+from src.pokemon.resilience import background
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+# Scheduled member names are remembered this long (seconds) for dedup.
+SEEN_TTL = 3600.0
+SEEN_SIZE = 4096
+# How often the worker re-checks for foreground traffic while waiting.
+IDLE_POLL = 0.05
+
+
+class FamilyPrefetcher:
+    """Loads the evolution-family members of normalized Pokémon into `repository` in the background."""
+
+    def __init__(self, repository: Any, max_queue: int = 64, rate: float = 4.0, idle_poll: float = IDLE_POLL):
+        self.repository = repository
+        self.budget = TokenBucket(rate)
+        self.idle_poll = idle_poll
+        self._queue: "queue.Queue[str]" = queue.Queue(max_queue)
+        self._seen = TTLCache(SEEN_SIZE, SEEN_TTL)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _count(self, result: str) -> None:
+        with self._lock:
+            self._counts[result] = self._counts.get(result, 0) + 1
+        metrics.prefetch.inc(result)
+
+    def schedule(self, resource: PokemonResource) -> int:
+        """Queue the other members of `resource`'s family; returns how many were queued."""
+        queued = 0
+        with self._lock:
+            # Loading it is what got us here.
+            self._seen.set(resource.name.lower(), True)
+        for member in resource.evolution_chain:
+            key = member.lower()
+            if key == resource.name.lower():
+                continue
+            with self._lock:
+                if self._seen.get(key) is not None:
+                    result = "deduped"
+                else:
+                    try:
+                        self._queue.put_nowait(key)
+                        self._seen.set(key, True)
+                        result = "queued"
+                    except queue.Full:
+                        result = "dropped"
+            self._count(result)
+            queued += result == "queued"
+        if queued:
+            self._start()
+        return queued
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                key = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._prefetch(key)
+            except Exception as e:
+                logger.info("Prefetching %r failed: %s", key, e)
+                self._count("failed")
+            finally:
+                self._queue.task_done()
+
+    def _wait_for_idle_upstream(self) -> bool:
+        """Block until no PokéAPI request is in flight and the circuit is closed (False if stopped)."""
+        api = self.repository.api
+        while not self._stop.is_set():
+            if api.healthy() and api.governor.in_flight(api.host) == 0:
+                return True
+            self._stop.wait(self.idle_poll)
+        return False
+
+    def _prefetch(self, key: str) -> None:
+        repository = self.repository
+        if repository.in_memory(key):
+            self._count("cached")
+            return
+        if not repository.is_cached(key):
+            if not self._wait_for_idle_upstream():
+                return
+            self._count("upstream")
+        with background(self.budget):
+            resource = repository.get_pokemon(key)
+            # Moves of stored Pokémon are in the store too; this only warms memory.
+            for move in resource.moves:
+                if move.type is not None:
+                    repository.get_move(move.name)
+        self._count("loaded")
+
+    def join(self) -> None:
+        """Block until every queued member has been processed."""
+        self._queue.join()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {"counts": counts, "queued": self._queue.qsize(), "max_queue": self._queue.maxsize}
@@ -0,0 +1,44 @@
+"""
+Slim PokéAPI documents while they are parsed.
+
+Full PokéAPI documents are mostly data nothing here reads: a Pokémon's
+`moves` carry every version-group detail, moves and species carry every
+localized text. `parse(kind, body)` keeps, at every nesting level, only
+the keys the normalizer and repository read for that endpoint, via an
+`object_pairs_hook`: each object is filtered as soon as the parser has
+built it, so dropped subtrees are freed along the way and the full
+document never exists as Python objects.
+"""
+import json
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
+
+# Keys kept per client cache, at any depth.
+KEPT_KEYS: Dict[str, FrozenSet[str]] = {
+    "pokemon": frozenset({"id", "name", "height", "weight", "species", "stats", "stat", "base_stat", "types",
+                          "type", "abilities", "ability", "moves", "move", "sprites", "front_default"}),
+    "move": frozenset({"id", "name", "power", "accuracy", "pp", "type", "damage_class", "effect_entries",
+                       "short_effect"}),
+    "pokemon-species": frozenset({"id", "name", "evolution_chain", "url"}),
+    "evolution-chain": frozenset({"id", "chain", "species", "name", "evolves_to"}),
+    "pokemon-list": frozenset({"count", "results", "name"}),
+}
+
+
+def _keep(keys: FrozenSet[str]) -> Callable[[List[Tuple[str, Any]]], Dict[str, Any]]:
+    def hook(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        return {k: v for k, v in pairs if k in keys}
+    return hook
+
+
+_HOOKS = {kind: _keep(keys) for kind, keys in KEPT_KEYS.items()}
+
+
+def parse(kind: str, body: bytes) -> Any:
+    """Decode a response body for the `kind` cache, dropping unused keys (all kept for unknown kinds)."""
+    hook = _HOOKS.get(kind)
+    return json.loads(body, object_pairs_hook=hook) if hook else json.loads(body)
+
+
+def encoded_size(document: Any) -> int:
+    """Compact JSON size of a parsed document: what it costs a byte-bounded cache."""
+    return len(json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode())
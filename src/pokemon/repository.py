@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from src.pokemon.cache import TTLCache, SingleFlight
+from src.pokemon.models import PokemonResource, MoveShort
+from src.pokemon.poke_client import PokeAPIClient, client as default_client
+from src.pokemon.normalizer import normalize_pokemon, normalize_move
+from src.pokemon.store import ResourceStore, DB_FILE
+from src.pokemon.name_index import NameIndex
+from src.pokemon.prefetch import FamilyPrefetcher
+from src import metrics, profiling
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = "data"
+
+# After a failed download of the upstream name list, wait this long before retrying.
+NAME_LIST_RETRY = 300.0
+
+
+def _key(name_or_id: Any) -> str:
+    return str(name_or_id).strip().lower()
+
+
+class PokemonRepository:
+    """
+    Tiered lookup for normalized resources:
+    in-memory LRU -> SQLite store in data/ -> PokéAPI (fetch + normalize).
+    Upstream results are written back to the faster tiers.
+
+    Store entries older than `disk_ttl` are refetched, but the stale copy is
+    still served when upstream fails or its circuit is open. With
+    `stale_while_revalidate` it is served straight away and refreshed in
+    the background.
+
+    With a `prefetcher`, every Pokémon normalized from upstream also
+    schedules its evolution family for a background load.
+    """
+
+    def __init__(self, api: Optional[PokeAPIClient] = None, data_dir: str = DATA_DIR,
+                 memory_size: int = 512, memory_ttl: Optional[float] = 3600.0,
+                 disk_ttl: Optional[float] = None, io_workers: int = 32,
+                 stale_while_revalidate: bool = False, prefetcher: Optional[FamilyPrefetcher] = None):
+        self.api = api or default_client
+        self.data_dir = data_dir
+        self.disk_ttl = disk_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._revalidating: set = set()
+        self.prefetcher = prefetcher
+        self._pokemon = TTLCache(memory_size, memory_ttl)
+        self._moves = TTLCache(memory_size * 2, memory_ttl)
+        self._counts_lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._flight = SingleFlight()
+        # Blocking disk/upstream work for the async API runs here, not on
+        # the event loop or the web framework's shared threadpool.
+        self._executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="repository")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.store = ResourceStore(os.path.join(self.data_dir, DB_FILE))
+        self._import_legacy_json()
+        # Search index: stored names now, the upstream dex list once it loads.
+        self.name_index = NameIndex(self.store.names())
+        self._names_loaded = False
+        self._names_retry_at = 0.0
+
+    # -- counters -----------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        with self._counts_lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counts_lock:
+            counts = dict(self._counts)
+        stats = {
+            "counts": counts,
+            "memory_entries": {"pokemon": len(self._pokemon), "moves": len(self._moves)},
+            "store_entries": self.store.counts(),
+        }
+        if self.prefetcher is not None:
+            stats["prefetch"] = self.prefetcher.stats()
+        return stats
+
+    # -- disk tier ----------------------------------------------------------
+
+    def _import_legacy_json(self) -> None:
+        """Import the old per-Pokémon data/*.json cache into an empty store."""
+        if self.store.count() == 0 and any(f.endswith(".json") for f in os.listdir(self.data_dir)):
+            self.store.import_json_dir(self.data_dir)
+
+    def in_memory(self, name_or_id: Any) -> bool:
+        return self._pokemon.get(_key(name_or_id)) is not None
+
+    def is_cached(self, name_or_id: Any) -> bool:
+        return self.store.get_pokemon(_key(name_or_id), max_age=self.disk_ttl) is not None
+
+    def cached_names(self) -> List[str]:
+        """Names of all Pokémon present in the disk tier."""
+        return self.store.names()
+
+    def load_upstream_names(self) -> bool:
+        """
+        Add the full upstream name list to the search index. Downloaded once
+        per process; failures are retried at most every NAME_LIST_RETRY seconds.
+        """
+        if self._names_loaded or time.monotonic() < self._names_retry_at:
+            return self._names_loaded
+        try:
+            index = self.api.get_pokemon_list(2000)
+        except Exception as e:
+            logger.warning("Could not load upstream Pokémon list: %s", e)
+            self._names_retry_at = time.monotonic() + NAME_LIST_RETRY
+            return False
+        self.name_index.add_many(p["name"] for p in index["results"])
+        self._names_loaded = True
+        return True
+
+    def name_index_ready(self) -> bool:
+        """True when searching won't trigger a (re)download of the name list."""
+        return self._names_loaded or time.monotonic() < self._names_retry_at
+
+    def search_names(self, query: str, limit: int = 20, offset: int = 0) -> List[str]:
+        self.load_upstream_names()
+        return self.name_index.search(query, limit=limit, offset=offset)
+
+    # -- lookups ------------------------------------------------------------
+
+    def _remember(self, resource: PokemonResource) -> None:
+        self._pokemon.set(resource.name.lower(), resource)
+        self._pokemon.set(str(resource.id), resource)
+
+    def get_pokemon(self, name_or_id: Any) -> PokemonResource:
+        key = _key(name_or_id)
+
+        cached = self._pokemon.get(key)
+        if cached is not None:
+            self._count("pokemon.memory.hit")
+            return cached
+        self._count("pokemon.memory.miss")
+        # Concurrent misses for the same key share one disk/upstream load.
+        return self._flight.do(("pokemon", key), lambda: self._load_pokemon(key))
+
+    def _load_pokemon(self, key: str) -> PokemonResource:
+        cached = self._pokemon.get(key)
+        if cached is not None:
+            return cached
+
+        resource = self.store.get_pokemon(key, max_age=self.disk_ttl)
+        if resource is not None:
+            self._count("pokemon.disk.hit")
+            self._remember(resource)
+            return resource
+        self._count("pokemon.disk.miss")
+
+        stale = self.store.get_pokemon(key) if self.disk_ttl is not None else None
+        return self._fresh_or_stale("pokemon", key, stale, lambda: self._fetch_pokemon(key))
+
+    def _fetch_pokemon(self, key: str) -> PokemonResource:
+        self._count("pokemon.upstream.fetch")
+        try:
+            resource = normalize_pokemon(self.api.get_pokemon(key), api=self.api,
+                                         resolve_move=self.get_move, resolve_chain=self._stored_chain)
+        except Exception:
+            self._count("pokemon.upstream.error")
+            raise
+        self.store.put_pokemon(resource)
+        self.name_index.add(resource.name)
+        self._remember(resource)
+        if self.prefetcher is not None:
+            self.prefetcher.schedule(resource)
+        return resource
+
+    def get_move(self, name_or_id: Any) -> MoveShort:
+        key = _key(name_or_id)
+
+        cached = self._moves.get(key)
+        if cached is not None:
+            self._count("move.memory.hit")
+            return cached
+        self._count("move.memory.miss")
+        return self._flight.do(("move", key), lambda: self._load_move(key))
+
+    def _load_move(self, key: str) -> MoveShort:
+        cached = self._moves.get(key)
+        if cached is not None:
+            return cached
+
+        move = self.store.get_move(key, max_age=self.disk_ttl)
+        if move is not None:
+            self._count("move.disk.hit")
+            self._remember_move(key, move)
+            return move
+        self._count("move.disk.miss")
+
+        stale = self.store.get_move(key) if self.disk_ttl is not None else None
+        return self._fresh_or_stale("move", key, stale, lambda: self._fetch_move(key))
+
+    def _fetch_move(self, key: str) -> MoveShort:
+        self._count("move.upstream.fetch")
+        try:
+            move = normalize_move(self.api.get_move(key))
+        except Exception:
+            self._count("move.upstream.error")
+            raise
+        self.store.put_move(move)
+        self._remember_move(key, move)
+        return move
+
+    def _remember_move(self, key: str, move: MoveShort) -> None:
+        self._moves.set(key, move)
+        self._moves.set(move.name.lower(), move)
+
+    # -- stale serving ------------------------------------------------------
+
+    def _fresh_or_stale(self, kind: str, key: str, stale: Any, fetch: Callable[[], Any]) -> Any:
+        """
+        Fetch from upstream, falling back to `stale` (an expired store entry,
+        or None) on failure. Stale copies are not promoted to memory, so the
+        next request tries again.
+        """
+        if stale is not None and (self.stale_while_revalidate or not self.api.healthy()):
+            self._count(f"{kind}.stale.served")
+            self._revalidate((kind, key), fetch)
+            return stale
+        try:
+            return fetch()
+        except Exception as e:
+            if stale is None:
+                raise
+            logger.warning("Serving stale %s %r: %s", kind, key, e)
+            self._count(f"{kind}.stale.served")
+            return stale
+
+    def _revalidate(self, token: Hashable, fetch: Callable[[], Any]) -> None:
+        """Refresh one entry in the background, at most once at a time per entry."""
+        with self._counts_lock:
+            if token in self._revalidating:
+                return
+            self._revalidating.add(token)
+
+        def run():
+            try:
+                fetch()
+            except Exception as e:
+                logger.info("Revalidating %s failed: %s", token, e)
+            finally:
+                with self._counts_lock:
+                    self._revalidating.discard(token)
+
+        self._executor.submit(run)
+
+    def _stored_chain(self, species: str) -> Optional[List[str]]:
+        members = self.store.get_chain(species)
+        self._count("chain.disk.hit" if members else "chain.disk.miss")
+        return members
+
+    # -- async API ----------------------------------------------------------
+
+    async def aget_pokemon(self, name_or_id: Any) -> PokemonResource:
+        """Memory hits return inline; misses run on the repository executor."""
+        cached = self._pokemon.get(_key(name_or_id))
+        if cached is not None:
+            self._count("pokemon.memory.hit")
+            return cached
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, profiling.bind(self.get_pokemon), name_or_id)
+
+    async def aget_move(self, name_or_id: Any) -> MoveShort:
+        cached = self._moves.get(_key(name_or_id))
+        if cached is not None:
+            self._count("move.memory.hit")
+            return cached
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, profiling.bind(self.get_move), name_or_id)
+
+    async def run(self, fn, *args) -> Any:
+        """Run a blocking callable on the repository executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, profiling.bind(fn), *args)
+
+    def clear_memory(self) -> None:
+        self._pokemon.clear()
+        self._moves.clear()
+
+
+# Shared process-wide repository used by the server, simulator and seeder.
+repository = PokemonRepository(
+    data_dir=os.environ.get("REPOSITORY_DATA_DIR", DATA_DIR),
+    disk_ttl=float(os.environ["REPOSITORY_DISK_TTL"]) if os.environ.get("REPOSITORY_DISK_TTL") else None,
+    stale_while_revalidate=os.environ.get("REPOSITORY_STALE_WHILE_REVALIDATE", "0") == "1",
+)
+if os.environ.get("PREFETCH_FAMILY", "0") == "1":
+    repository.prefetcher = FamilyPrefetcher(repository, max_queue=int(os.environ.get("PREFETCH_QUEUE", "64")),
+                                             rate=float(os.environ.get("PREFETCH_RATE", "4")))
+
+
+def _collect_repository() -> List[str]:
+    """Tier counters as `kind.tier.result` -> {kind, tier, result} labels."""
+    stats = repository.stats()
+    lookups = {tuple(name.split(".", 2)): v for name, v in stats["counts"].items() if name.count(".") == 2}
+    hits = {(k, t): v for (k, t, r), v in lookups.items() if r == "hit"}
+    misses = {(k, t): v for (k, t, r), v in lookups.items() if r == "miss"}
+    entries = {("memory", kind): n for kind, n in stats["memory_entries"].items()}
+    entries.update({("store", kind): n for kind, n in stats["store_entries"].items()})
+    return (
+        metrics.format_metric("repository_events_total", "Repository lookups per cache tier and outcome.",
+                              "counter", ["kind", "tier", "result"], lookups)
+        + metrics.hit_ratio_metric("repository_cache_hit_ratio", "Hit ratio per repository cache tier.",
+                                   ["kind", "tier"], hits, misses)
+        + metrics.format_metric("repository_entries", "Entries held per tier.", "gauge", ["tier", "kind"], entries)
+    )
+
+
+metrics.registry.register_collector(_collect_repository)
@@ -0,0 +1,254 @@
+"""
+Client-side governor for upstream PokéAPI calls.
+
+Each host gets a concurrency cap, a circuit breaker and a retry policy
+(jittered exponential backoff that honors Retry-After, within a small total
+wait budget, since callers are request threads); an optional shared token
+bucket paces all attempts. Background work (e.g. the family prefetcher)
+runs inside `background(budget)`, and each of its attempts also spends a
+token from that budget. Failures that survive the retries, and
+calls refused by an open breaker, surface as UpstreamUnavailable so callers
+can fall back to stale data or answer 503 instead of 404.
+"""
+import contextlib
+import contextvars
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+
+from src.pokemon.ratelimit import TokenBucket
+
+
+# Budget of the background caller in this context, if any.
+_background_budget: "contextvars.ContextVar[Optional[TokenBucket]]" = contextvars.ContextVar(
+    "upstream_background_budget", default=None)
+
+
+@contextlib.contextmanager
+def background(budget: TokenBucket) -> Iterator[None]:
+    """Charge every upstream attempt made in this context (and contexts copied from it) to `budget`."""
+    token = _background_budget.set(budget)
+    try:
+        yield
+    finally:
+        _background_budget.reset(token)
+
+
+class UpstreamUnavailable(Exception):
+    """Upstream is failing or throttling us; `retry_after` is a hint in seconds."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Timeouts, connection failures, 429 and 5xx; other HTTP errors are final."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    status = _status(exc)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class RetryPolicy:
+    """
+    `max_total_wait` caps the seconds one call may spend sleeping between
+    attempts: a retry that would exceed it (e.g. a long Retry-After) fails
+    fast instead, so the caller can serve stale data or answer 503.
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 5.0,
+                 max_retry_after: float = 30.0, max_total_wait: float = 1.5):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.max_total_wait = max_total_wait
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter backoff for retry number `attempt` (0-based), never sooner than Retry-After."""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_retry_after))
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds, then lets a single probe through (half-open):
+    success closes it, failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class _Host:
+    def __init__(self, max_concurrency: int, breaker: CircuitBreaker):
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = breaker
+        # Calls in progress, including ones waiting for a slot or a retry.
+        self.active = 0
+
+
+class UpstreamGovernor:
+    """Per-host concurrency caps, circuit breakers and retries around blocking calls."""
+
+    def __init__(self, max_concurrency: int = 16, rate_limiter: Optional[TokenBucket] = None,
+                 retry: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, sleep: Callable[[float], None] = time.sleep):
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sleep = sleep
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> _Host:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _Host(
+                    self.max_concurrency, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+            return state
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        return self._host(host).breaker
+
+    def breaker_states(self) -> Dict[str, str]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: state.breaker.state for host, state in hosts.items()}
+
+    def healthy(self, host: str) -> bool:
+        return self._host(host).breaker.state == CircuitBreaker.CLOSED
+
+    def in_flight(self, host: str) -> int:
+        """Calls to `host` currently in progress."""
+        return self._host(host).active
+
+    def call(self, host: str, fn: Callable[[], Any],
+             on_retry: Optional[Callable[[BaseException], None]] = None) -> Any:
+        """
+        Run `fn` under `host`'s limits. Non-retryable errors (e.g. 404) are
+        re-raised as-is and count as a healthy upstream.
+        """
+        state = self._host(host)
+        with self._lock:
+            state.active += 1
+        try:
+            return self._call(host, state, fn, on_retry)
+        finally:
+            with self._lock:
+                state.active -= 1
+
+    def _call(self, host: str, state: _Host, fn: Callable[[], Any],
+              on_retry: Optional[Callable[[BaseException], None]]) -> Any:
+        waited = 0.0
+        budget = _background_budget.get()
+        for attempt in range(self.retry.attempts):
+            if budget is not None:
+                budget.acquire()
+            if not state.breaker.allow():
+                raise CircuitOpenError(f"{host} circuit is open", state.breaker.retry_after())
+            try:
+                with state.slots:
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.acquire()
+                    result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    state.breaker.record_success()
+                    raise
+                state.breaker.record_failure()
+                retry_after = parse_retry_after(getattr(getattr(e, "response", None), "headers", {}).get("Retry-After"))
+                if attempt + 1 >= self.retry.attempts:
+                    raise UpstreamUnavailable(f"{host} unavailable: {e}", retry_after) from e
+                delay = self.retry.delay(attempt, retry_after)
+                if waited + delay > self.retry.max_total_wait:
+                    raise UpstreamUnavailable(f"{host} unavailable: {e}", max(delay, retry_after or 0.0)) from e
+                if on_retry is not None:
+                    on_retry(e)
+                # Sleep outside the concurrency slot so waiting retries don't hold it.
+                self._sleep(delay)
+                waited += delay
+            else:
+                state.breaker.record_success()
+                return result
@@ -1,23 +1,87 @@
-import json
-import os
-from src.pokemon.poke_client import PokeAPIClient
-from src.pokemon.normalizer import normalize_pokemon
-
-OUTPUT_DIR = "data"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-def seed(limit: int = 151):
-    client = PokeAPIClient()
-    for i in range(1, limit + 1):
-        try:
-            raw = client.get_pokemon(i)
-            normalized = normalize_pokemon(raw)
-            out_path = os.path.join(OUTPUT_DIR, f"{normalized.name}.json")
-            with open(out_path, "w") as f:
-                json.dump(normalized.dict(), f, indent=2)
-            print(f"Seeded {normalized.name}")
-        except Exception as e:
-            print(f"Failed to seed {i}: {e}")
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional
+
+from src.pokemon.ratelimit import TokenBucket
+from src.pokemon.repository import PokemonRepository, repository
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+
+def seed(limit: Optional[int] = 151, start: int = 1, workers: int = 8, rate: float = 20.0,
+         repo: Optional[PokemonRepository] = None) -> Dict[str, Any]:
+    """
+    Seed the resource cache for dex ids `start..limit` (limit=None -> full
+    national dex) with `workers` concurrent loads and at most `rate` upstream
+    requests/sec. Each Pokémon is committed to the store as it completes, so
+    the store itself is the checkpoint: a rerun skips ids already stored.
+    """
+    repo = repo or repository
+    api = repo.api
+    if limit is None:
+        limit = api.get_species_count()
+
+    done = set(repo.store.ids())
+    todo = [i for i in range(start, limit + 1) if i not in done]
+
+    # Keep shared moves and evolution chains resident for the whole run so each
+    # one is fetched upstream only once; the shared client gets its sizes back after.
+    previous_sizes = {endpoint: api.grow_cache(endpoint, size)
+                      for endpoint, size in (("move", 2048), ("evolution-chain", 1024))}
+    previous_limiter = api.rate_limiter
+    api.rate_limiter = TokenBucket(rate) if rate else None
+
+    failed: Dict[str, str] = {}
+    started = time.monotonic()
+    completed = 0
+
+    print(f"Seeding {len(todo)} Pokémon ({limit - start + 1 - len(todo)} already stored)")
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed") as pool:
+            futures = {pool.submit(repo.get_pokemon, i): i for i in todo}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    normalized = future.result()
+                except Exception as e:
+                    failed[str(i)] = str(e)
+                    print(f"Failed to seed {i}: {e}")
+                    continue
+                completed += 1
+                elapsed = time.monotonic() - started
+                throughput = completed / elapsed if elapsed else 0.0
+                remaining = len(todo) - completed - len(failed)
+                eta = _format_eta(remaining / throughput) if throughput else "?"
+                print(f"[{completed}/{len(todo)}] Seeded {normalized.name} | "
+                      f"{throughput:.1f}/s | ETA {eta}")
+    finally:
+        api.rate_limiter = previous_limiter
+        for endpoint, (maxsize, max_bytes) in previous_sizes.items():
+            api.resize_cache(endpoint, maxsize, max_bytes)
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "seeded": completed,
+        "skipped": limit - start + 1 - len(todo),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "per_second": round(completed / elapsed, 2) if elapsed else 0.0,
+        "upstream_requests": dict(api.fetch_counts),
+    }
+    print(f"Done: {summary}")
+    return summary
+
 
 if __name__ == "__main__":
-    seed(151)  # Kanto Pokémon
+    parser = argparse.ArgumentParser(description="Seed the local Pokémon cache from PokéAPI.")
+    parser.add_argument("--limit", type=int, default=151, help="last dex id to seed (default: Kanto)")
+    parser.add_argument("--all", action="store_true", help="seed the full national dex")
+    parser.add_argument("--start", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=20.0, help="max upstream requests per second")
+    args = parser.parse_args()
+    seed(None if args.all else args.limit, start=args.start, workers=args.workers, rate=args.rate)
@@ -0,0 +1,436 @@
+import glob
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, Float, ForeignKey, Index, Integer, LargeBinary, MetaData, String, Table, Text,
+    create_engine, delete, event, func, select,
+)
+from sqlalchemy.dialects.sqlite import insert
+
+from src.pokemon.models import PokemonResource, MoveShort
+
+DB_FILE = "pokemon.db"
+
+STATS = ["hp", "attack", "defense", "special_attack", "special_defense", "speed"]
+
+# A capped battle_results table is pruned at most every this many inserts.
+BATTLE_PRUNE_EVERY = 256
+# A capped matchup_results table is pruned at most every this many rows written.
+MATCHUP_PRUNE_EVERY = 50_000
+
+metadata = MetaData()
+
+evolution_chains = Table(
+    "evolution_chains", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("root", String, nullable=False, unique=True),
+)
+
+evolution_chain_members = Table(
+    "evolution_chain_members", metadata,
+    Column("chain_id", Integer, ForeignKey("evolution_chains.id", ondelete="CASCADE"), primary_key=True),
+    Column("position", Integer, primary_key=True),
+    Column("species", String, nullable=False),
+    Index("ix_evolution_chain_members_species", "species"),
+)
+
+pokemon = Table(
+    "pokemon", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("name", String, nullable=False, unique=True),
+    *[Column(stat, Integer, nullable=False) for stat in STATS],
+    Column("height", Integer),
+    Column("weight", Integer),
+    Column("sprite_url", Text),
+    Column("evolution_chain_id", Integer, ForeignKey("evolution_chains.id")),
+    Column("updated_at", Float, nullable=False),
+    Index("ix_pokemon_speed", "speed"),
+)
+
+pokemon_types = Table(
+    "pokemon_types", metadata,
+    Column("pokemon_id", Integer, ForeignKey("pokemon.id", ondelete="CASCADE"), primary_key=True),
+    Column("slot", Integer, primary_key=True),
+    Column("type", String, nullable=False),
+    Index("ix_pokemon_types_type", "type", "pokemon_id"),
+)
+
+pokemon_abilities = Table(
+    "pokemon_abilities", metadata,
+    Column("pokemon_id", Integer, ForeignKey("pokemon.id", ondelete="CASCADE"), primary_key=True),
+    Column("slot", Integer, primary_key=True),
+    Column("ability", String, nullable=False),
+)
+
+moves = Table(
+    "moves", metadata,
+    Column("name", String, primary_key=True),
+    Column("type", String),
+    Column("power", Integer),
+    Column("accuracy", Integer),
+    Column("pp", Integer),
+    Column("damage_class", String),
+    Column("short_effect", Text),
+    Column("updated_at", Float, nullable=False),
+)
+
+pokemon_moves = Table(
+    "pokemon_moves", metadata,
+    Column("pokemon_id", Integer, ForeignKey("pokemon.id", ondelete="CASCADE"), primary_key=True),
+    Column("slot", Integer, primary_key=True),
+    Column("move_name", String, nullable=False),
+    Index("ix_pokemon_moves_move", "move_name"),
+)
+
+# Deterministic battle outcomes keyed by both sides' content fingerprints.
+matchup_results = Table(
+    "matchup_results", metadata,
+    Column("fp1", String, primary_key=True),
+    Column("fp2", String, primary_key=True),
+    Column("level", Integer, primary_key=True),
+    Column("max_turns", Integer, primary_key=True),
+    Column("winner", Integer, nullable=False),  # 0 draw, 1 p1, 2 p2
+    Column("turns", Integer, nullable=False),
+    Column("hp1", Integer, nullable=False),
+    Column("hp2", Integer, nullable=False),
+    Column("updated_at", Float, nullable=False),
+    Index("ix_matchup_results_updated_at", "updated_at"),
+)
+
+# Encoded deterministic /tools/battle responses keyed by a hash of their inputs.
+battle_results = Table(
+    "battle_results", metadata,
+    Column("key", String, primary_key=True),
+    Column("body", LargeBinary, nullable=False),
+    Column("updated_at", Float, nullable=False),
+    Index("ix_battle_results_updated_at", "updated_at"),
+)
+
+
+def _placeholder_move(name: str) -> MoveShort:
+    return MoveShort(name=name, type=None, power=None, accuracy=None, pp=None,
+                     damage_class=None, short_effect=None, move_resource_uri=f"/resources/move/{name}")
+
+
+def _move_from_row(row) -> MoveShort:
+    return MoveShort(
+        name=row.name,
+        type=row.type,
+        power=row.power,
+        accuracy=row.accuracy,
+        pp=row.pp,
+        damage_class=row.damage_class,
+        short_effect=row.short_effect,
+        move_resource_uri=f"/resources/move/{row.name}",
+    )
+
+
+class ResourceStore:
+    """
+    Single-file SQLite store (WAL mode) for normalized resources.
+    Pokémon, moves, types and evolution chains live in their own indexed
+    tables; several processes may read concurrently while one writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+        event.listen(self.engine, "connect", self._on_connect)
+        metadata.create_all(self.engine)
+        self._battle_puts = 0
+        self._matchup_rows = 0
+
+    @staticmethod
+    def _on_connect(dbapi_conn, _record) -> None:
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA busy_timeout=30000")
+        cursor.close()
+
+    # -- writes -------------------------------------------------------------
+
+    def _upsert_move(self, conn, move: MoveShort, now: float) -> None:
+        values = {
+            "name": move.name, "type": move.type, "power": move.power, "accuracy": move.accuracy,
+            "pp": move.pp, "damage_class": move.damage_class, "short_effect": move.short_effect,
+            "updated_at": now,
+        }
+        stmt = insert(moves).values(**values)
+        conn.execute(stmt.on_conflict_do_update(index_elements=["name"], set_=values))
+
+    def _upsert_chain(self, conn, members: List[str]) -> Optional[int]:
+        if not members:
+            return None
+        root = members[0]
+        conn.execute(insert(evolution_chains).values(root=root).on_conflict_do_nothing(index_elements=["root"]))
+        chain_id = conn.execute(select(evolution_chains.c.id).where(evolution_chains.c.root == root)).scalar_one()
+        conn.execute(evolution_chain_members.delete().where(evolution_chain_members.c.chain_id == chain_id))
+        conn.execute(evolution_chain_members.insert(), [
+            {"chain_id": chain_id, "position": i, "species": s} for i, s in enumerate(members)
+        ])
+        return chain_id
+
+    def put_move(self, move: MoveShort) -> None:
+        # Placeholders (failed upstream fetches) are never stored.
+        if move.type is None:
+            return
+        with self.engine.begin() as conn:
+            self._upsert_move(conn, move, time.time())
+
+    def put_pokemon(self, resource: PokemonResource) -> None:
+        now = time.time()
+        with self.engine.begin() as conn:
+            for move in resource.moves:
+                if move.type is not None:
+                    self._upsert_move(conn, move, now)
+            chain_id = self._upsert_chain(conn, resource.evolution_chain)
+
+            values = {
+                "id": resource.id, "name": resource.name.lower(),
+                **{stat: resource.base_stats.get(stat, 0) for stat in STATS},
+                "height": resource.height, "weight": resource.weight, "sprite_url": resource.sprite_url,
+                "evolution_chain_id": chain_id, "updated_at": now,
+            }
+            conn.execute(insert(pokemon).values(**values)
+                         .on_conflict_do_update(index_elements=["id"], set_=values))
+            for table in (pokemon_types, pokemon_abilities, pokemon_moves):
+                conn.execute(table.delete().where(table.c.pokemon_id == resource.id))
+            if resource.types:
+                conn.execute(pokemon_types.insert(), [
+                    {"pokemon_id": resource.id, "slot": i, "type": t.lower()} for i, t in enumerate(resource.types)
+                ])
+            if resource.abilities:
+                conn.execute(pokemon_abilities.insert(), [
+                    {"pokemon_id": resource.id, "slot": i, "ability": a} for i, a in enumerate(resource.abilities)
+                ])
+            if resource.moves:
+                conn.execute(pokemon_moves.insert(), [
+                    {"pokemon_id": resource.id, "slot": i, "move_name": m.name} for i, m in enumerate(resource.moves)
+                ])
+
+    # -- reads --------------------------------------------------------------
+
+    def _hydrate(self, conn, rows: List[Any]) -> List[PokemonResource]:
+        """Build PokemonResources for `rows` with one query per child table."""
+        if not rows:
+            return []
+        ids = [row.id for row in rows]
+        types: Dict[int, List[str]] = {i: [] for i in ids}
+        for r in conn.execute(select(pokemon_types).where(pokemon_types.c.pokemon_id.in_(ids))
+                              .order_by(pokemon_types.c.pokemon_id, pokemon_types.c.slot)):
+            types[r.pokemon_id].append(r.type)
+        abilities: Dict[int, List[str]] = {i: [] for i in ids}
+        for r in conn.execute(select(pokemon_abilities).where(pokemon_abilities.c.pokemon_id.in_(ids))
+                              .order_by(pokemon_abilities.c.pokemon_id, pokemon_abilities.c.slot)):
+            abilities[r.pokemon_id].append(r.ability)
+        move_rows: Dict[int, List[MoveShort]] = {i: [] for i in ids}
+        joined = (select(pokemon_moves.c.pokemon_id, pokemon_moves.c.move_name, moves)
+                  .select_from(pokemon_moves.outerjoin(moves, moves.c.name == pokemon_moves.c.move_name))
+                  .where(pokemon_moves.c.pokemon_id.in_(ids))
+                  .order_by(pokemon_moves.c.pokemon_id, pokemon_moves.c.slot))
+        for r in conn.execute(joined):
+            move_rows[r.pokemon_id].append(
+                _move_from_row(r) if r.name is not None else _placeholder_move(r.move_name))
+        chain_ids = {row.evolution_chain_id for row in rows if row.evolution_chain_id is not None}
+        chains: Dict[int, List[str]] = {i: [] for i in chain_ids}
+        if chain_ids:
+            for r in conn.execute(select(evolution_chain_members)
+                                  .where(evolution_chain_members.c.chain_id.in_(chain_ids))
+                                  .order_by(evolution_chain_members.c.chain_id, evolution_chain_members.c.position)):
+                chains[r.chain_id].append(r.species)
+
+        return [
+            PokemonResource(
+                id=row.id,
+                name=row.name,
+                types=types[row.id],
+                base_stats={stat: getattr(row, stat) for stat in STATS},
+                abilities=abilities[row.id],
+                moves=move_rows[row.id],
+                evolution_chain=chains.get(row.evolution_chain_id, []),
+                height=row.height,
+                weight=row.weight,
+                sprite_url=row.sprite_url,
+            )
+            for row in rows
+        ]
+
+    def get_pokemon(self, name_or_id: Any, max_age: Optional[float] = None) -> Optional[PokemonResource]:
+        key = str(name_or_id).strip().lower()
+        column = pokemon.c.id if key.isdigit() else pokemon.c.name
+        stmt = select(pokemon).where(column == (int(key) if key.isdigit() else key))
+        if max_age is not None:
+            stmt = stmt.where(pokemon.c.updated_at >= time.time() - max_age)
+        with self.engine.connect() as conn:
+            found = self._hydrate(conn, conn.execute(stmt).fetchall())
+        return found[0] if found else None
+
+    def get_move(self, name: str, max_age: Optional[float] = None) -> Optional[MoveShort]:
+        stmt = select(moves).where(moves.c.name == name.lower())
+        if max_age is not None:
+            stmt = stmt.where(moves.c.updated_at >= time.time() - max_age)
+        with self.engine.connect() as conn:
+            row = conn.execute(stmt).first()
+        return _move_from_row(row) if row is not None else None
+
+    def get_chain(self, species: str) -> Optional[List[str]]:
+        """Members of the stored evolution chain containing `species`, root first."""
+        chain_id = (select(evolution_chain_members.c.chain_id)
+                    .where(evolution_chain_members.c.species == species.lower())
+                    .limit(1).scalar_subquery())
+        stmt = (select(evolution_chain_members.c.species)
+                .where(evolution_chain_members.c.chain_id == chain_id)
+                .order_by(evolution_chain_members.c.position))
+        with self.engine.connect() as conn:
+            members = list(conn.execute(stmt).scalars())
+        return members or None
+
+    def query_pokemon(self, type: Optional[str] = None, min_stats: Optional[Dict[str, int]] = None,
+                      max_stats: Optional[Dict[str, int]] = None, limit: Optional[int] = None,
+                      offset: int = 0) -> List[PokemonResource]:
+        """
+        Filtered lookup, e.g. all fire types with speed > 100:
+        `query_pokemon(type="fire", min_stats={"speed": 101})`.
+        """
+        stmt = select(pokemon).order_by(pokemon.c.id)
+        if type:
+            stmt = stmt.where(pokemon.c.id.in_(
+                select(pokemon_types.c.pokemon_id).where(pokemon_types.c.type == type.lower())))
+        for stat, value in (min_stats or {}).items():
+            stmt = stmt.where(pokemon.c[stat] >= value)
+        for stat, value in (max_stats or {}).items():
+            stmt = stmt.where(pokemon.c[stat] <= value)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+        with self.engine.connect() as conn:
+            return self._hydrate(conn, conn.execute(stmt).fetchall())
+
+    def names(self) -> List[str]:
+        with self.engine.connect() as conn:
+            return list(conn.execute(select(pokemon.c.name).order_by(pokemon.c.id)).scalars())
+
+    def ids(self) -> List[int]:
+        with self.engine.connect() as conn:
+            return list(conn.execute(select(pokemon.c.id)).scalars())
+
+    def count(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(pokemon)).scalar_one()
+
+    def counts(self) -> Dict[str, int]:
+        """Stored entities per kind."""
+        with self.engine.connect() as conn:
+            return {name: conn.execute(select(func.count()).select_from(table)).scalar_one()
+                    for name, table in (("pokemon", pokemon), ("moves", moves), ("evolution_chains", evolution_chains))}
+
+    # -- matchup results ----------------------------------------------------
+
+    def get_matchup_results(self, fingerprints: Iterable[str], level: int,
+                            max_turns: int) -> Dict[Tuple[str, str], Tuple[int, int, int, int]]:
+        """(fp1, fp2) -> (winner, turns, hp1, hp2) for stored pairs among `fingerprints`."""
+        fps = set(fingerprints)
+        if not fps:
+            return {}
+        stmt = select(matchup_results).where(
+            matchup_results.c.level == level,
+            matchup_results.c.max_turns == max_turns,
+            matchup_results.c.fp1.in_(fps),
+        )
+        with self.engine.connect() as conn:
+            return {(r.fp1, r.fp2): (r.winner, r.turns, r.hp1, r.hp2)
+                    for r in conn.execute(stmt) if r.fp2 in fps}
+
+    def put_matchup_results(self, rows: List[Dict[str, Any]], max_rows: Optional[int] = None) -> None:
+        """
+        Upsert outcomes. With `max_rows`, the oldest rows beyond it are
+        pruned every so many rows written, so the table may briefly run over.
+        """
+        if not rows:
+            return
+        now = time.time()
+        stmt = insert(matchup_results)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["fp1", "fp2", "level", "max_turns"],
+            set_={c: stmt.excluded[c] for c in ("winner", "turns", "hp1", "hp2", "updated_at")})
+        with self.engine.begin() as conn:
+            conn.execute(stmt, [{**row, "updated_at": now} for row in rows])
+        if max_rows is None:
+            return
+        self._matchup_rows += len(rows)
+        if self._matchup_rows >= max(1, min(MATCHUP_PRUNE_EVERY, max_rows // 10)):
+            self._matchup_rows = 0
+            self.prune_matchup_results(max_rows)
+
+    def prune_matchup_results(self, max_rows: int) -> int:
+        """
+        Delete rows older than the `max_rows` most recently written ones;
+        returns how many went. Rows written together share a timestamp and
+        are kept or dropped together.
+        """
+        oldest_kept = (select(matchup_results.c.updated_at).order_by(matchup_results.c.updated_at.desc())
+                       .offset(max_rows - 1).limit(1).scalar_subquery())
+        with self.engine.begin() as conn:
+            return conn.execute(delete(matchup_results).where(matchup_results.c.updated_at < oldest_kept)).rowcount
+
+    # -- battle results -----------------------------------------------------
+
+    def get_battle_result(self, key: str) -> Optional[bytes]:
+        with self.engine.connect() as conn:
+            return conn.execute(select(battle_results.c.body).where(battle_results.c.key == key)).scalar()
+
+    def put_battle_result(self, key: str, body: bytes, max_rows: Optional[int] = None) -> None:
+        """
+        Upsert a result. With `max_rows`, the oldest rows beyond it are
+        pruned every few inserts, so the table may briefly run over.
+        """
+        values = {"key": key, "body": body, "updated_at": time.time()}
+        with self.engine.begin() as conn:
+            conn.execute(insert(battle_results).values(**values)
+                         .on_conflict_do_update(index_elements=["key"], set_=values))
+        if max_rows is None:
+            return
+        self._battle_puts += 1
+        if self._battle_puts % max(1, min(BATTLE_PRUNE_EVERY, max_rows // 10)) == 0:
+            self.prune_battle_results(max_rows)
+
+    def prune_battle_results(self, max_rows: int) -> int:
+        """Delete all but the `max_rows` most recently written results; returns how many went."""
+        keep = select(battle_results.c.key).order_by(battle_results.c.updated_at.desc()).limit(max_rows)
+        with self.engine.begin() as conn:
+            return conn.execute(delete(battle_results).where(battle_results.c.key.not_in(keep))).rowcount
+
+    # -- import -------------------------------------------------------------
+
+    def import_resources(self, resources: Iterable[PokemonResource]) -> int:
+        n = 0
+        for resource in resources:
+            self.put_pokemon(resource)
+            n += 1
+        return n
+
+    def import_json_dir(self, directory: str) -> int:
+        """One-shot import of legacy per-Pokémon `*.json` cache files."""
+        def load():
+            for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+                with open(path, "r") as f:
+                    yield PokemonResource(**json.load(f))
+        return self.import_resources(load())
+
+
+if __name__ == "__main__":
+    # python -m src.pokemon.store import data [data/pokemon.db]
+    if len(sys.argv) < 3 or sys.argv[1] != "import":
+        print("usage: python -m src.pokemon.store import <json_dir> [db_path]")
+        sys.exit(1)
+    directory = sys.argv[2]
+    db_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(directory, DB_FILE)
+    print(f"Imported {ResourceStore(db_path).import_json_dir(directory)} Pokémon into {db_path}")
@@ -0,0 +1,206 @@
+"""
+Offline stand-in for PokéAPI.
+
+FakePokeAPISession has the `get(url, params, timeout)` surface PokeAPIClient
+uses from requests.Session, so it can be swapped in as `client.session`.
+It serves raw PokéAPI-shaped documents for the Kanto dex: Pokémon recorded
+in data/*.json are replayed from those files, everything else is
+synthesized deterministically from the name. An optional per-request
+latency stands in for the network. Shared by the test suite and the
+benchmark harness.
+"""
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from src.battle.type_chart import TYPES
+from src.pokemon.poke_client import POKEAPI_BASE
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+
+KANTO = [
+    "bulbasaur", "ivysaur", "venusaur", "charmander", "charmeleon", "charizard", "squirtle",
+    "wartortle", "blastoise", "caterpie", "metapod", "butterfree", "weedle", "kakuna", "beedrill",
+    "pidgey", "pidgeotto", "pidgeot", "rattata", "raticate", "spearow", "fearow", "ekans", "arbok",
+    "pikachu", "raichu", "sandshrew", "sandslash", "nidoran-f", "nidorina", "nidoqueen", "nidoran-m",
+    "nidorino", "nidoking", "clefairy", "clefable", "vulpix", "ninetales", "jigglypuff", "wigglytuff",
+    "zubat", "golbat", "oddish", "gloom", "vileplume", "paras", "parasect", "venonat", "venomoth",
+    "diglett", "dugtrio", "meowth", "persian", "psyduck", "golduck", "mankey", "primeape",
+    "growlithe", "arcanine", "poliwag", "poliwhirl", "poliwrath", "abra", "kadabra", "alakazam",
+    "machop", "machoke", "machamp", "bellsprout", "weepinbell", "victreebel", "tentacool",
+    "tentacruel", "geodude", "graveler", "golem", "ponyta", "rapidash", "slowpoke", "slowbro",
+    "magnemite", "magneton", "farfetchd", "doduo", "dodrio", "seel", "dewgong", "grimer", "muk",
+    "shellder", "cloyster", "gastly", "haunter", "gengar", "onix", "drowzee", "hypno", "krabby",
+    "kingler", "voltorb", "electrode", "exeggcute", "exeggutor", "cubone", "marowak", "hitmonlee",
+    "hitmonchan", "lickitung", "koffing", "weezing", "rhyhorn", "rhydon", "chansey", "tangela",
+    "kangaskhan", "horsea", "seadra", "goldeen", "seaking", "staryu", "starmie", "mr-mime",
+    "scyther", "jynx", "electabuzz", "magmar", "pinsir", "tauros", "magikarp", "gyarados", "lapras",
+    "ditto", "eevee", "vaporeon", "jolteon", "flareon", "porygon", "omanyte", "omastar", "kabuto",
+    "kabutops", "aerodactyl", "snorlax", "articuno", "zapdos", "moltres", "dratini", "dragonair",
+    "dragonite", "mewtwo", "mew",
+]
+
+# Move pool for synthesized Pokémon; moves not recorded in data/ are synthesized too.
+MOVES = [
+    "tackle", "scratch", "thunderbolt", "flamethrower", "surf", "ice-beam", "psychic", "earthquake",
+    "razor-leaf", "sludge-bomb", "shadow-ball", "rock-slide", "wing-attack", "karate-chop",
+    "body-slam", "hyper-beam", "bite", "dragon-rage", "growl", "tail-whip",
+]
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+def _seed(name: str) -> bytes:
+    return hashlib.sha256(name.encode()).digest()
+
+
+class FakeResponse:
+    def __init__(self, payload: Optional[Dict[str, Any]], status: int = 200, url: str = "",
+                 headers: Optional[Dict[str, str]] = None):
+        self.payload = payload
+        self.status_code = status
+        self.url = url
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Client Error for url: {self.url}", response=self)
+
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self.payload).encode()
+
+    def json(self) -> Dict[str, Any]:
+        return self.payload
+
+
+class FakePokeAPISession:
+    """Routes PokéAPI urls to recorded or synthesized documents."""
+
+    def __init__(self, latency: float = 0.0, data_dir: str = DATA_DIR, names: Optional[List[str]] = None,
+                 base_url: str = POKEAPI_BASE):
+        self.latency = latency
+        self.base_url = base_url.rstrip("/")
+        self.names = list(names or KANTO)
+        self.ids = {name: i + 1 for i, name in enumerate(self.names)}
+        self.recorded: Dict[str, Dict[str, Any]] = {}
+        self.recorded_moves: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+            with open(path) as f:
+                resource = json.load(f)
+            self.recorded[resource["name"]] = resource
+            self.ids.setdefault(resource["name"], resource["id"])
+            for move in resource["moves"]:
+                if move.get("type") is not None:
+                    self.recorded_moves[move["name"]] = move
+        self.by_id = {i: name for name, i in self.ids.items()}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    # -- documents ----------------------------------------------------------
+
+    def _resolve(self, key: str) -> Optional[str]:
+        if key.isdigit():
+            return self.by_id.get(int(key))
+        return key if key in self.ids else None
+
+    def pokemon_doc(self, name: str) -> Dict[str, Any]:
+        pid = self.ids[name]
+        resource = self.recorded.get(name)
+        if resource is not None:
+            stats = resource["base_stats"]
+            values = [stats["hp"], stats["attack"], stats["defense"], stats["special_attack"],
+                      stats["special_defense"], stats["speed"]]
+            types, abilities = resource["types"], resource["abilities"]
+            moves = [m["name"] for m in resource["moves"]]
+            height, weight, sprite = resource["height"], resource["weight"], resource["sprite_url"]
+        else:
+            seed = _seed(name)
+            values = [30 + seed[i] % 100 for i in range(6)]
+            types = [TYPES[seed[6] % len(TYPES)]]
+            if seed[7] % 2:
+                types.append(TYPES[seed[8] % len(TYPES)])
+            types = list(dict.fromkeys(types))
+            abilities = [f"{name}-ability"]
+            moves = list(dict.fromkeys(MOVES[seed[9 + i] % len(MOVES)] for i in range(4)))
+            height, weight = 1 + seed[13] % 30, 10 + seed[14] * 4
+            sprite = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pid}.png"
+        return {
+            "id": pid,
+            "name": name,
+            "types": [{"slot": i + 1, "type": {"name": t}} for i, t in enumerate(types)],
+            "stats": [{"base_stat": v, "stat": {"name": s}} for s, v in zip(STAT_NAMES, values)],
+            "abilities": [{"ability": {"name": a}, "slot": i + 1} for i, a in enumerate(abilities)],
+            "moves": [{"move": {"name": m, "url": f"{self.base_url}/move/{m}/"}} for m in moves],
+            "height": height,
+            "weight": weight,
+            "sprites": {"front_default": sprite},
+            "species": {"name": name, "url": f"{self.base_url}/pokemon-species/{pid}/"},
+        }
+
+    def move_doc(self, name: str) -> Dict[str, Any]:
+        move = self.recorded_moves.get(name)
+        if move is None:
+            seed = _seed(name)
+            status = name in ("growl", "tail-whip")
+            move = {
+                "name": name, "type": TYPES[seed[0] % len(TYPES)], "power": None if status else 40 + seed[1] % 81,
+                "accuracy": 100, "pp": 5 + seed[2] % 31,
+                "damage_class": "status" if status else ("physical" if seed[3] % 2 else "special"),
+                "short_effect": "Inflicts regular damage with no additional effect.",
+            }
+        return {
+            "name": move["name"],
+            "type": {"name": move["type"]},
+            "power": move["power"],
+            "accuracy": move["accuracy"],
+            "pp": move["pp"],
+            "damage_class": {"name": move["damage_class"]},
+            "effect_entries": [{"short_effect": move["short_effect"], "language": {"name": "en"}}]
+            if move.get("short_effect") else [],
+        }
+
+    def chain_doc(self, name: str) -> Dict[str, Any]:
+        resource = self.recorded.get(name)
+        members = (resource or {}).get("evolution_chain") or [name]
+        node: Dict[str, Any] = {"species": {"name": members[-1]}, "evolves_to": []}
+        for member in reversed(members[:-1]):
+            node = {"species": {"name": member}, "evolves_to": [node]}
+        return {"id": self.ids[name], "chain": node}
+
+    # -- transport ----------------------------------------------------------
+
+    def route(self, url: str, params: Optional[Dict[str, Any]] = None) -> FakeResponse:
+        path = url[len(self.base_url):].strip("/") if url.startswith(self.base_url) else url
+        parts = path.split("/")
+        endpoint, key = parts[0], (parts[1].lower() if len(parts) > 1 else "")
+        if not key:
+            limit = int((params or {}).get("limit", 20))
+            results = [{"name": n, "url": f"{self.base_url}/{endpoint}/{self.ids[n]}/"} for n in self.names[:limit]]
+            return FakeResponse({"count": len(self.names), "next": None, "previous": None, "results": results})
+        if endpoint == "move":
+            return FakeResponse(self.move_doc(key)) if key in self.recorded_moves or key in MOVES \
+                else FakeResponse(None, 404, url)
+        name = self._resolve(key)
+        if name is None:
+            return FakeResponse(None, 404, url)
+        if endpoint == "pokemon":
+            return FakeResponse(self.pokemon_doc(name))
+        if endpoint == "pokemon-species":
+            return FakeResponse({"id": self.ids[name], "name": name, "evolution_chain": {
+                "url": f"{self.base_url}/evolution-chain/{self.ids[name]}/"}})
+        if endpoint == "evolution-chain":
+            return FakeResponse(self.chain_doc(name))
+        return FakeResponse(None, 404, url)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Any = None) -> FakeResponse:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.route(url, params)
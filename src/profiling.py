@@ -0,0 +1,281 @@
+"""
+Opt-in profiling of single requests.
+
+A request carrying `X-Profile: 1` (or `?profile=1`) and a matching
+`X-Admin-Token` header (the PROFILE_ADMIN_TOKEN env var; profiling is off
+when it is unset) is run under a sampling profiler. Only the threads doing
+that request's work are sampled: the event-loop thread running its handler,
+plus executor threads while they run callables wrapped with `bind` in the
+request's context (the repository executor, the normalizer fan-out and the
+server's threadpool calls do this). The event loop is shared, so its samples
+may include other requests' coroutines; process-pool work is not sampled.
+Each collapsed stack starts with its thread's name. `profile=memory` adds a
+tracemalloc peak/top-allocations report (process-wide).
+
+Profiles are kept in a small in-memory ring, returned by id via the
+X-Profile-Id response header, and can be fetched as JSON or as collapsed
+stacks (flamegraph.pl / speedscope compatible).
+"""
+import contextlib
+import contextvars
+import functools
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs
+
+ADMIN_TOKEN_ENV = "PROFILE_ADMIN_TOKEN"
+# Seconds between stack samples.
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+MAX_PROFILES = 32
+TOP_ALLOCATIONS = 15
+
+# Leaf functions of a thread that is parked rather than working.
+_IDLE_LEAVES = {"wait", "select", "poll", "_worker", "accept", "_wait_for_tstate_lock", "sleep"}
+
+_profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_profiles_lock = threading.Lock()
+_ids = itertools.count(1)
+# One profile at a time.
+_active = threading.Lock()
+# The sampler of the request being profiled, in that request's context.
+_current: "contextvars.ContextVar[Optional[StackSampler]]" = contextvars.ContextVar("profile_sampler", default=None)
+
+
+def admin_token() -> Optional[str]:
+    return os.getenv(ADMIN_TOKEN_ENV) or None
+
+
+def is_admin(token: Optional[str]) -> bool:
+    expected = admin_token()
+    return bool(expected and token and hmac.compare_digest(token, expected))
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of busy threads every `interval` seconds: all
+    of them, or with `scoped` only those inside `tracking()`.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, scoped: bool = False):
+        self.interval = interval
+        self.scoped = scoped
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        # thread id -> nesting depth of tracking()
+        self._threads: Dict[int, int] = {}
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    @contextlib.contextmanager
+    def tracking(self) -> Iterator[None]:
+        """Sample the calling thread while inside this block."""
+        thread_id = threading.get_ident()
+        with self._threads_lock:
+            self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._threads_lock:
+                self._threads[thread_id] -= 1
+                if not self._threads[thread_id]:
+                    del self._threads[thread_id]
+
+    def _sample(self, own_id: int) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        with self._threads_lock:
+            tracked = set(self._threads)
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or frame.f_code.co_name in _IDLE_LEAVES:
+                continue
+            if self.scoped and thread_id not in tracked:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            key = names.get(thread_id, str(thread_id)) + ";" + ";".join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_id)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """One `frame;frame;... count` line per distinct stack."""
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.counts.items()))
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Functions by self samples (leaf) and total samples (anywhere on the stack)."""
+        own: Dict[str, int] = {}
+        total: Dict[str, int] = {}
+        for stack, n in self.counts.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] = own.get(frames[-1], 0) + n
+            for label in set(frames):
+                total[label] = total.get(label, 0) + n
+        ranked = sorted(total, key=lambda label: total[label], reverse=True)[:limit]
+        return [{"function": label, "self": own.get(label, 0), "total": total[label]} for label in ranked]
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    `fn`, attributed to the request being profiled in the calling context (if
+    any): whichever thread later runs it is sampled for the duration of the
+    call, and callables it binds in turn are attributed too.
+    """
+    sampler = _current.get()
+    if sampler is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _current.set(sampler)
+        try:
+            with sampler.tracking():
+                return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+class RequestProfile:
+    """Profiles one request: stack samples plus optional tracemalloc."""
+
+    def __init__(self, method: str, path: str, memory: bool = False):
+        self.id = f"{int(time.time())}-{next(_ids)}"
+        self.method = method
+        self.path = path
+        self.memory = memory
+        self.sampler = StackSampler(scoped=True)
+        self._started_tracing = False
+
+    def __enter__(self) -> "RequestProfile":
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.sampler.stop()
+        duration = time.perf_counter() - self.started
+        report: Dict[str, Any] = {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(duration * 1e3, 3),
+            "samples": self.sampler.samples,
+            "interval_ms": self.sampler.interval * 1e3,
+            "top_functions": self.sampler.top_functions(),
+            "collapsed": self.sampler.collapsed(),
+        }
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            top = snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            report["memory"] = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top_allocations": [{"location": str(stat.traceback[0]), "size_bytes": stat.size,
+                                     "count": stat.count} for stat in top],
+            }
+            if self._started_tracing:
+                tracemalloc.stop()
+        with _profiles_lock:
+            _profiles[self.id] = report
+            while len(_profiles) > MAX_PROFILES:
+                _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    return _profiles.get(profile_id)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Summaries of the retained profiles, newest first."""
+    with _profiles_lock:
+        reports = list(_profiles.values())
+    return [{k: p[k] for k in ("id", "method", "path", "duration_ms", "samples")} for p in reversed(reports)]
+
+
+def _requested(scope) -> Optional[str]:
+    """The requested profile mode ("1"/"memory") from header or query, if any."""
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.decode("latin-1")
+    query = scope.get("query_string", b"")
+    if b"profile=" in query:
+        values = parse_qs(query.decode("latin-1")).get("profile")
+        if values:
+            return values[0]
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests which ask for it (admins only)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = _requested(scope) if scope["type"] == "http" else None
+        if not mode or mode in ("0", "false"):
+            await self.app(scope, receive, send)
+            return
+
+        token = dict(scope["headers"]).get(b"x-admin-token", b"").decode("latin-1")
+        if not is_admin(token):
+            await _plain(send, 403, b"profiling requires a valid X-Admin-Token")
+            return
+        if not _active.acquire(blocking=False):
+            await _plain(send, 409, b"another request is being profiled")
+            return
+
+        try:
+            profile = RequestProfile(scope["method"], scope["path"], memory=(mode == "memory"))
+
+            async def send_with_id(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": list(message.get("headers", []))
+                               + [(b"x-profile-id", profile.id.encode())]}
+                await send(message)
+
+            with profile, profile.sampler.tracking():
+                token = _current.set(profile.sampler)
+                try:
+                    await self.app(scope, receive, send_with_id)
+                finally:
+                    _current.reset(token)
+        finally:
+            _active.release()
+
+
+async def _plain(send, status: int, body: bytes) -> None:
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+    await send({"type": "http.response.body", "body": body})
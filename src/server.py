@@ -1,109 +1,495 @@
 import os
 import json
-from fastapi import FastAPI, HTTPException, Query
+import time
+import asyncio
+import threading
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi import Body, HTTPException
-from typing import Any, Dict
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+from typing import Any, Dict, Optional
 from typing import List
 from src.pokemon.models import PokemonResource, MoveShort
-from src.pokemon.poke_client import PokeAPIClient
-from src.pokemon.normalizer import normalize_pokemon
+from src.pokemon.repository import repository
+from src.pokemon.resilience import UpstreamUnavailable
 from fastapi import Body
-from src.battle.simulator import simulate_battle
+from src.battle.simulator import simulate_battle, iter_battle, aload_pokemon, side_policies, LOG_LEVELS
+from src.battle.search import DEFAULT_NODES
+from src.battle.montecarlo import run_batch
+from src.battle.analytic import battle_odds, STATUSES
+from src.battle.tournament import run_tournament, TournamentCancelled
+from src.battle.result_cache import result_cache, result_key
+from src.battle.jobs import job_queue, QueueFull, KINDS as JOB_KINDS
+from src import metrics, profiling
+from src.http_cache import EncodedJSON, encode_model, encoded_cache, json_response
 
-DATA_DIR = "data"
-os.makedirs(DATA_DIR, exist_ok=True)
+# Upper bound on max_turns for every battle-running endpoint
+MAX_TURNS = 1000
+# Upper bound on max_turns for /tools/battle/odds
+MAX_ODDS_TURNS = MAX_TURNS
+# Upper bounds for /tools/battle/batch
+MAX_BATCH_RUNS = 100_000
+MAX_BATCH_RUNS_WITH_LOGS = 100
+# Upper bound on roster size for /tools/tournament
+MAX_TOURNAMENT_ROSTER = 2000
+# Upper bound on names per /resources/*/batch call
+MAX_RESOURCE_BATCH = 200
+# Longest a /jobs/{id}/wait call blocks
+MAX_JOB_WAIT = 60.0
+# Upper bounds on the per-move budget of the "search" battle policy
+MAX_SEARCH_NODES = 20_000
+MAX_SEARCH_TIME_MS = 1000
+# How often a streamed tournament checks for a disconnected client between progress events
+DISCONNECT_POLL = 0.5
+# Log frames a streamed greedy battle advances per threadpool call / disconnect check
+STREAM_CHUNK = 64
 
 app = FastAPI(title="MCP Pokémon Server")
-client = PokeAPIClient()
-
-def load_from_cache(name: str):
-    """Check if Pokémon JSON is cached locally."""
-    path = os.path.join(DATA_DIR, f"{name.lower()}.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)
-    return None
-
-def save_to_cache(name: str, data: dict):
-    """Save normalized Pokémon JSON to cache."""
-    path = os.path.join(DATA_DIR, f"{name.lower()}.json")
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+async def run_in_threadpool(fn, *args, **kwargs) -> Any:
+    """Starlette's run_in_threadpool, with the thread attributed to a profiled request."""
+    return await _run_in_threadpool(profiling.bind(fn), *args, **kwargs)
+
+def _unavailable(e: UpstreamUnavailable) -> HTTPException:
+    """503 (not 404) when PokéAPI is down or throttling and nothing is cached."""
+    headers = {"Retry-After": str(max(1, round(e.retry_after)))} if e.retry_after is not None else None
+    return HTTPException(status_code=503, detail=str(e), headers=headers)
 
 @app.get("/resources/pokemon/{name}", response_model=PokemonResource)
-def get_pokemon_resource(name: str):
+async def get_pokemon_resource(name: str, request: Request):
     try:
-        # 1. Try cache
-        cached = load_from_cache(name)
-        if cached:
-            return cached
-
-        # 2. Fallback to PokéAPI
-        raw = client.get_pokemon(name)
-        normalized = normalize_pokemon(raw)
-        data = normalized.dict()
-
-        # 3. Save to cache
-        save_to_cache(normalized.name, data)
-        return data
+        # memory -> data/ cache -> PokéAPI
+        resource = await repository.aget_pokemon(name)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
+    # Already validated by the repository: serve pre-encoded bytes.
+    return json_response(request, encoded_cache.encoded(("pokemon", resource.name), resource, encode_model))
 
 @app.get("/resources/move/{name}", response_model=MoveShort)
-def get_move_resource(name: str):
+async def get_move_resource(name: str, request: Request):
     try:
-        move_raw = client.get_move(name)
-        return MoveShort(
-            name=move_raw["name"],
-            type=move_raw["type"]["name"],
-            power=move_raw.get("power"),
-            accuracy=move_raw.get("accuracy"),
-            pp=move_raw.get("pp"),
-            damage_class=move_raw["damage_class"]["name"],
-            short_effect=move_raw["effect_entries"][0]["short_effect"]
-                if move_raw.get("effect_entries") else None,
-            move_resource_uri=f"/resources/move/{move_raw['name']}"
-        )
+        # memory -> stored moves -> PokéAPI
+        move = await repository.aget_move(name)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
+    return json_response(request, encoded_cache.encoded(("move", move.name), move, encode_model))
+
+def _batch_names(payload: Any) -> List[str]:
+    names = payload.get("names") if isinstance(payload, dict) else payload
+    if not isinstance(names, list) or not all(isinstance(n, (str, int)) for n in names):
+        raise HTTPException(status_code=400, detail="Expected a list of names, or {\"names\": [...]}")
+    if len(names) > MAX_RESOURCE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RESOURCE_BATCH} names per batch")
+    return [str(n) for n in names]
+
+async def _batch_response(names: List[str], kind: str, fetch) -> Response:
+    """
+    `{"items": [{"name", "data"} | {"name", "error"}, ...]}` in request order.
+    Repeated names are looked up once and misses load concurrently; bodies
+    are spliced from the pre-encoded cache rather than re-serialized.
+    """
+    keys = list(dict.fromkeys(n.strip().lower() for n in names))
+    loaded = await asyncio.gather(*(fetch(k) for k in keys), return_exceptions=True)
+    bodies = {}
+    for key, value in zip(keys, loaded):
+        if isinstance(value, Exception):
+            bodies[key] = b'"error":' + json.dumps(str(value) or type(value).__name__).encode()
+        else:
+            bodies[key] = b'"data":' + encoded_cache.encoded((kind, value.name), value, encode_model).body
+    items = [b'{"name":' + json.dumps(n, ensure_ascii=False).encode() + b"," + bodies[n.strip().lower()] + b"}"
+             for n in names]
+    return Response(content=b'{"items":[' + b",".join(items) + b"]}", media_type="application/json")
+
+@app.post("/resources/pokemon/batch", response_model=None)
+async def get_pokemon_batch(payload: Any = Body(...)):
+    """Many Pokémon in one call; each item carries its data or its own error."""
+    return await _batch_response(_batch_names(payload), "pokemon", repository.aget_pokemon)
+
+@app.post("/resources/move/batch", response_model=None)
+async def get_move_batch(payload: Any = Body(...)):
+    """Many moves in one call; each item carries its data or its own error."""
+    return await _batch_response(_batch_names(payload), "move", repository.aget_move)
 
 @app.get("/resources/pokemon", response_model=List[str])
-def search_pokemon(search: str = Query(..., description="Search substring in Pokémon names")):
+async def search_pokemon(search: str = Query(..., description="Search Pokémon names (prefix, substring or fuzzy)"),
+                         limit: int = Query(50, ge=1, le=500),
+                         offset: int = Query(0, ge=0)):
     try:
-        cached_names = [f[:-5] for f in os.listdir(DATA_DIR) if f.endswith(".json")]
-        filtered = [n for n in cached_names if search.lower() in n.lower()]
-        if filtered:
-            return filtered
-
-        # fallback to PokeAPI
-        import requests
-        url = f"{client.base_url}/pokemon?limit=2000"
-        resp = requests.get(url)
-        resp.raise_for_status()
-        all_pokemon = [p["name"] for p in resp.json()["results"]]
-        return [n for n in all_pokemon if search.lower() in n.lower()]
+        if repository.name_index_ready():
+            return repository.name_index.search(search, limit=limit, offset=offset)
+        # First search in this process: pull in the upstream name list.
+        return await repository.run(repository.search_names, search, limit, offset)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _max_turns(payload: Dict[str, Any], limit: int = MAX_TURNS) -> int:
+    """max_turns from a battle request, validated."""
+    max_turns = int(payload.get("max_turns", 200))
+    if not 1 <= max_turns <= limit:
+        raise ValueError(f"max_turns must be between 1 and {limit}")
+    return max_turns
+
+def _policy_options(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """policy / search_nodes / search_time_ms from a battle request, validated."""
+    policy = payload.get("policy", "greedy")
+    side_policies(policy)
+    nodes = int(payload.get("search_nodes", DEFAULT_NODES))
+    if not 1 <= nodes <= MAX_SEARCH_NODES:
+        raise ValueError(f"search_nodes must be between 1 and {MAX_SEARCH_NODES}")
+    seconds = None
+    if payload.get("search_time_ms") is not None:
+        time_ms = float(payload["search_time_ms"])
+        if not 0 < time_ms <= MAX_SEARCH_TIME_MS:
+            raise ValueError(f"search_time_ms must be in (0, {MAX_SEARCH_TIME_MS}]")
+        seconds = time_ms / 1000
+    return {"policy": policy, "search_nodes": nodes, "search_time": seconds}
+
 @app.post("/tools/battle", response_model=None)  
-def battle_tool(payload: Dict[str, Any] = Body(...)):
+async def battle_tool(payload: Dict[str, Any] = Body(...)):
     """
     Run a battle simulation between two Pokémon.
     """
     try:
-        p1 = payload.get("pokemon1")
-        p2 = payload.get("pokemon2")
+        p1, p2 = await asyncio.gather(aload_pokemon(payload.get("pokemon1")),
+                                      aload_pokemon(payload.get("pokemon2")))
         level = int(payload.get("level", 50))
+        max_turns = _max_turns(payload)
         deterministic = bool(payload.get("deterministic", True))
-        result = simulate_battle(p1, p2, level=level, deterministic=deterministic)
-        return result
+        log_level = payload.get("log_level", "text")
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"log_level must be one of {LOG_LEVELS}")
+        options = _policy_options(payload)
+        # A wall-clock search budget makes the moves timing-dependent.
+        if not deterministic or options["search_time"] is not None:
+            # The simulation itself is CPU-bound; keep it off the event loop.
+            return await run_in_threadpool(simulate_battle, p1, p2, level=level, max_turns=max_turns,
+                                           deterministic=deterministic, log_level=log_level, **options)
+
+        # Deterministic battles are pure: serve repeats from the result cache.
+        policies = side_policies(options["policy"])
+        extra = {} if set(policies.values()) == {"greedy"} else {"policy": policies, "search_nodes": options["search_nodes"]}
+        key = result_key(p1, p2, level, max_turns, log_level=log_level, **extra)
+        body = result_cache.get(key, memory_only=True) or await repository.run(result_cache.get, key)
+        if body is None:
+            result = await run_in_threadpool(simulate_battle, p1, p2, level=level, max_turns=max_turns,
+                                             deterministic=True, log_level=log_level, **options)
+            body = json.dumps(jsonable_encoder(result)).encode()
+            await repository.run(result_cache.put, key, body)
+        return Response(content=body, media_type="application/json")
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-@app.get("/manifest")
-def get_manifest():
-    import json
-    import os
+def _steps(battle, n: int) -> tuple:
+    """(up to `n` next log entries, result or None if unfinished) from an iter_battle generator."""
+    entries = []
+    try:
+        while len(entries) < n:
+            entries.append(next(battle))
+    except StopIteration as done:
+        return entries, done.value
+    return entries, None
+
+@app.post("/tools/battle/stream", response_model=None)
+async def battle_stream_tool(request: Request, payload: Dict[str, Any] = Body(...)):
+    """
+    Streaming variant of /tools/battle: log entries are sent as the battle
+    produces them, followed by the result. NDJSON by default; Server-Sent
+    Events with "format": "sse" or `Accept: text/event-stream`. The battle
+    stops as soon as the client disconnects.
+    """
+    try:
+        p1, p2 = await asyncio.gather(aload_pokemon(payload.get("pokemon1")),
+                                      aload_pokemon(payload.get("pokemon2")))
+        level = int(payload.get("level", 50))
+        max_turns = _max_turns(payload)
+        deterministic = bool(payload.get("deterministic", True))
+        log_level = payload.get("log_level", "structured")
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"log_level must be one of {LOG_LEVELS}")
+        options = _policy_options(payload)
+        searching = "search" in side_policies(options["policy"]).values()
+        sse = payload.get("format") == "sse" or "text/event-stream" in request.headers.get("accept", "")
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def frame(event: str, data: Any) -> str:
+        if sse:
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"event": event, "data": data}) + "\n"
+
+    async def stream():
+        battle = iter_battle(p1, p2, level=level, deterministic=deterministic, max_turns=max_turns,
+                             log_level=log_level, **options)
+        # Searching turns take milliseconds each; greedy ones microseconds, so step those in chunks.
+        chunk = 1 if searching else STREAM_CHUNK
+        try:
+            while True:
+                entries, result = await run_in_threadpool(_steps, battle, chunk)
+                for entry in entries:
+                    yield frame("log", entry)
+                if result is not None:
+                    metrics.record_battles("scalar", 1, result["turns"])
+                    yield frame("result", result)
+                    return
+                # Stop early if the client left.
+                if await request.is_disconnected():
+                    return
+        finally:
+            battle.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream" if sse else "application/x-ndjson")
+
+def _batch_options(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """run_batch keyword arguments from a /tools/battle/batch body, validated."""
+    n = int(payload.get("n", 1000))
+    include_logs = bool(payload.get("include_logs", False))
+    if not 1 <= n <= MAX_BATCH_RUNS:
+        raise ValueError(f"n must be between 1 and {MAX_BATCH_RUNS}")
+    if include_logs and n > MAX_BATCH_RUNS_WITH_LOGS:
+        raise ValueError(f"include_logs is limited to n <= {MAX_BATCH_RUNS_WITH_LOGS}")
+    seed = payload.get("seed")
+    # Logs need the per-battle scalar simulator; otherwise use the array kernel.
+    engine = payload.get("engine", "scalar" if include_logs else "vectorized")
+    return {"n": n, "seed": int(seed) if seed is not None else None, "level": int(payload.get("level", 50)),
+            "max_turns": _max_turns(payload), "include_logs": include_logs, "engine": engine}
+
+@app.post("/tools/battle/batch", response_model=None)
+async def battle_batch_tool(payload: Dict[str, Any] = Body(...)):
+    """
+    Monte Carlo estimate of a matchup: run `n` stochastic battles, each on
+    its own RNG stream derived from `seed`, and return win/draw rates with
+    95% confidence intervals, the turn-count distribution and mean remaining HP.
+    """
+    try:
+        options = _batch_options(payload)
+        p1, p2 = await asyncio.gather(aload_pokemon(payload.get("pokemon1")),
+                                      aload_pokemon(payload.get("pokemon2")))
+        return await run_in_threadpool(run_batch, p1, p2, **options)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/tools/battle/odds", response_model=None)
+async def battle_odds_tool(payload: Dict[str, Any] = Body(...)):
+    """
+    Exact win/draw probabilities, turn-count distribution and mean remaining
+    HP of a matchup under greedy move choice, computed instead of sampled.
+    """
+    try:
+        statuses = [list(payload.get(key) or []) for key in ("status1", "status2")]
+        for status in statuses:
+            if not set(status) <= set(STATUSES):
+                raise ValueError(f"statuses must be among {STATUSES}")
+        max_turns = _max_turns(payload, MAX_ODDS_TURNS)
+        p1, p2 = await asyncio.gather(aload_pokemon(payload.get("pokemon1")),
+                                      aload_pokemon(payload.get("pokemon2")))
+        return await run_in_threadpool(
+            battle_odds, p1, p2, level=int(payload.get("level", 50)), max_turns=max_turns,
+            deterministic=bool(payload.get("deterministic", False)), status1=statuses[0], status2=statuses[1])
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _load_roster(roster: Any) -> List[PokemonResource]:
+    if roster == "all":
+        # Everything in the local store, in dex order.
+        return await repository.run(repository.store.query_pokemon)
+    if not isinstance(roster, list) or len(roster) < 2:
+        raise ValueError('roster must be "all" or a list of at least two Pokémon')
+    return list(await asyncio.gather(*(aload_pokemon(name) for name in roster)))
+
+@app.post("/tools/tournament", response_model=None)
+async def tournament_tool(request: Request, payload: Dict[str, Any] = Body(...)):
+    """
+    Round robin over a roster (list of names, or "all" for the local store):
+    deterministic result matrix plus Elo rankings. Outcomes are stored, so
+    re-runs only simulate pairs whose data changed. With "stream": true the
+    response is NDJSON progress events followed by the result; a streamed
+    tournament stops when the client disconnects.
+    """
+    try:
+        roster = await _load_roster(payload.get("roster", "all"))
+        if len(roster) > MAX_TOURNAMENT_ROSTER:
+            raise ValueError(f"roster is limited to {MAX_TOURNAMENT_ROSTER} Pokémon")
+        level = int(payload.get("level", 50))
+        max_turns = _max_turns(payload)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not payload.get("stream"):
+        return await run_in_threadpool(run_tournament, roster, level=level, max_turns=max_turns,
+                                       store=repository.store)
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    cancel = threading.Event()
+
+    def progress(done: int, total: int) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, {"event": "progress", "done": done, "total": total})
+
+    async def run() -> None:
+        try:
+            result = await run_in_threadpool(run_tournament, roster, level=level, max_turns=max_turns,
+                                             store=repository.store, progress=progress, cancel=cancel)
+            await events.put({"event": "result", "result": result})
+        except TournamentCancelled:
+            pass
+        except Exception as e:
+            await events.put({"event": "error", "detail": str(e)})
+
+    async def stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), DISCONNECT_POLL)
+                except asyncio.TimeoutError:
+                    event = None
+                if event is not None:
+                    yield json.dumps(event) + "\n"
+                    if event["event"] != "progress":
+                        break
+                if await request.is_disconnected():
+                    break
+        finally:
+            # No-op once finished; otherwise drops the pool's queued chunks.
+            cancel.set()
+            await task
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _job_options(kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    if kind == "batch":
+        return _batch_options(payload)
+    log_level = payload.get("log_level", "text")
+    if log_level not in LOG_LEVELS:
+        raise ValueError(f"log_level must be one of {LOG_LEVELS}")
+    return {"level": int(payload.get("level", 50)), "max_turns": _max_turns(payload),
+            "deterministic": bool(payload.get("deterministic", True)), "log_level": log_level,
+            **_policy_options(payload)}
+
+def _job_or_404(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@app.post("/jobs", response_model=None, status_code=202)
+async def submit_job(payload: Dict[str, Any] = Body(...)):
+    """
+    Queue a battle ("kind": "battle", a /tools/battle body) or a Monte Carlo
+    batch ("kind": "batch", a /tools/battle/batch body) on the process pool.
+    Returns the job id at once; 429 when too many jobs are pending.
+    """
+    try:
+        kind = payload.get("kind", "battle")
+        if kind not in JOB_KINDS:
+            raise ValueError(f"kind must be one of {JOB_KINDS}")
+        options = _job_options(kind, payload)
+        p1, p2 = await asyncio.gather(aload_pokemon(payload.get("pokemon1")),
+                                      aload_pokemon(payload.get("pokemon2")))
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job = job_queue.submit(kind, p1, p2, **options)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(1, round(e.retry_after)))})
+    return JSONResponse(job.snapshot(), status_code=202, headers={"Location": f"/jobs/{job.id}"})
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Job status, with the result once it is done."""
+    return _job_or_404(job_id).snapshot()
+
+@app.get("/jobs/{job_id}/wait")
+async def wait_job(job_id: str, timeout: float = Query(30.0, gt=0, le=MAX_JOB_WAIT)):
+    """Like GET /jobs/{id}, but blocks up to `timeout` seconds for the job to finish."""
+    job = _job_or_404(job_id)
+    if job.future is not None and not job.future.done():
+        waiter = asyncio.wrap_future(job.future)
+        # Retrieve the outcome so a failed job doesn't log "exception was never retrieved".
+        waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+        # asyncio.wait never raises (not even when the job is cancelled) and never cancels the job.
+        await asyncio.wait({waiter}, timeout=timeout)
+    return _job_or_404(job_id).snapshot()
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a job that has not started running yet."""
+    job_queue.cancel(job_id)
+    return _job_or_404(job_id).snapshot()
+
+@app.get("/stats")
+def get_stats():
+    """Cache tier hit/miss counters."""
+    return {"repository": repository.stats(), "battle_results": result_cache.stats(),
+            "encoded_responses": encoded_cache.stats(), "jobs": job_queue.stats(),
+            "client_caches": repository.api.cache_stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of route latency, cache, upstream and simulator metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _require_admin(token: Optional[str]) -> None:
+    if not profiling.is_admin(token):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Token is required")
+
+def _profile_or_404(profile_id: str) -> Dict[str, Any]:
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    return profile
+
+@app.get("/admin/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Recently captured request profiles, newest first."""
+    _require_admin(x_admin_token)
+    return profiling.list_profiles()
+
+@app.get("/admin/profiles/{profile_id}")
+def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Full profile: top functions, collapsed stacks and the tracemalloc report if requested."""
+    _require_admin(x_admin_token)
+    return _profile_or_404(profile_id)
+
+@app.get("/admin/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def get_profile_collapsed(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Collapsed stacks, ready for flamegraph.pl or speedscope."""
+    _require_admin(x_admin_token)
+    return PlainTextResponse(_profile_or_404(profile_id)["collapsed"])
+
+_manifest: Optional[EncodedJSON] = None
+
+def _load_manifest() -> EncodedJSON:
     manifest_path = os.path.join(os.path.dirname(__file__), "mcp_manifest.json")
     with open(manifest_path, "r") as f:
-        return json.load(f)
\ No newline at end of file
+        manifest = json.load(f)
+    return EncodedJSON(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode())
+
+@app.get("/manifest")
+def get_manifest(request: Request):
+    # Read and encoded once per process.
+    global _manifest
+    if _manifest is None:
+        _manifest = _load_manifest()
+    return json_response(request, _manifest)
\ No newline at end of file
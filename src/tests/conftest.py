@@ -0,0 +1,43 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import shutil
+import tempfile
+
+# The shared repository (and the battle result cache on its store) opens
+# REPOSITORY_DATA_DIR when first imported: set it before anything imports it,
+# so tests never touch data/.
+_data_dir = tempfile.mkdtemp(prefix="pokemon-store-")
+os.environ["REPOSITORY_DATA_DIR"] = _data_dir
+
+import pytest
+from src.pokemon.poke_client import client
+from src.pokemon.testing import FakePokeAPISession
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_data_dir, ignore_errors=True)
+
+
+def _clear_memory_tiers():
+    from src.pokemon.repository import repository
+    from src.battle.result_cache import result_cache
+    from src.http_cache import encoded_cache
+    repository.clear_memory()
+    result_cache.clear_memory()
+    encoded_cache.clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def offline_pokeapi():
+    """Serve the shared PokéAPI client from the offline fake (POKEAPI_LIVE=1 uses the real API)."""
+    _clear_memory_tiers()
+    if os.getenv("POKEAPI_LIVE") == "1":
+        yield client.session
+    else:
+        live = client.session
+        client.session = FakePokeAPISession()
+        client.clear_cache()
+        yield client.session
+        client.session = live
+        client.clear_cache()
+    _clear_memory_tiers()
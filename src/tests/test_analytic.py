@@ -0,0 +1,114 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import math
+import random
+import pytest
+from fastapi.testclient import TestClient
+from src.pokemon.models import PokemonResource
+from src.battle.analytic import action_distribution, battle_odds, damage_distribution
+from src.battle.compiled import compile_matchup
+from src.battle.montecarlo import run_batch
+from src.battle.simulator import simulate_battle
+from src.pokemon.repository import repository
+from src.server import app
+
+client = TestClient(app)
+
+
+def _move(name, power, damage_class, type_="normal"):
+    return {"name": name, "type": type_, "power": power, "accuracy": 100, "pp": 10,
+            "damage_class": damage_class, "short_effect": None, "move_resource_uri": None}
+
+
+def _mon(name, moves, hp, attack=50, speed=50, types=("water",)):
+    return PokemonResource(
+        id=1, name=name, types=list(types), abilities=[], evolution_chain=[], height=1, weight=1, sprite_url=None,
+        base_stats={"hp": hp, "attack": attack, "defense": 60, "special_attack": 50,
+                    "special_defense": 60, "speed": speed},
+        moves=[_move(*m) for m in moves])
+
+
+# Several turns per battle, three candidate moves each and a speed tie.
+TANK = _mon("tank", [("slam", 80, "physical"), ("jab", 40, "physical"), ("tap", 20, "physical")], hp=160)
+RIVAL = _mon("rival", [("bite", 60, "physical"), ("peck", 35, "physical")], hp=140, attack=70)
+
+
+def test_damage_distribution_matches_sampled_rolls():
+    me, _ = compile_matchup(TANK, RIVAL)
+    slam = me.ranked[0]
+    dist = dict(damage_distribution(slam))
+    assert math.isclose(sum(dist.values()), 1.0)
+    rng = random.Random(0)
+    samples = [slam.damage(rng.uniform(0.85, 1.0), False) for _ in range(20000)]
+    for damage, p in dist.items():
+        assert abs(samples.count(damage) / len(samples) - p) < 0.02
+    assert set(samples) <= set(dist)
+
+
+def test_paralysis_adds_stuck_mass():
+    me, _ = compile_matchup(TANK, RIVAL)
+    dist = dict(action_distribution(me, ["paralysis"]))
+    assert math.isclose(dist[0], 0.25)
+    assert dict(action_distribution(me, ["paralysis"], deterministic=True)) == {0: 1.0}
+
+
+def test_odds_agree_with_monte_carlo():
+    odds = battle_odds(TANK, RIVAL)
+    assert math.isclose(sum(odds["outcomes"].values()), 1.0)
+    assert math.isclose(sum(odds["turns"]["distribution"].values()), 1.0)
+    batch = run_batch(TANK, RIVAL, n=20000, seed=5, engine="vectorized")
+    for side in ("p1", "p2", "draw"):
+        assert abs(odds["outcomes"][side] - batch["outcomes"][side]["rate"]) < 0.015
+    assert abs(odds["turns"]["mean"] - batch["turns"]["mean"]) < 0.05
+    for side in ("p1", "p2"):
+        assert abs(odds["mean_remaining_hp"][side] - batch["mean_remaining_hp"][side]) < 1.0
+
+
+def test_deterministic_odds_match_the_simulator():
+    for p1, p2 in ((TANK, RIVAL), (RIVAL, TANK)):
+        odds = battle_odds(p1, p2, deterministic=True)
+        result = simulate_battle(p1, p2, log_level="none")
+        assert odds["outcomes"][result["winner_side"]] == pytest.approx(1.0)
+        assert odds["turns"]["distribution"] == {str(result["turns"]): pytest.approx(1.0)}
+
+
+def test_turn_limit_and_statuses():
+    odds = battle_odds(TANK, RIVAL, max_turns=2)
+    assert odds["turns"]["max"] == 2 and odds["outcomes"]["draw"] > 0
+    poisoned = battle_odds(TANK, RIVAL, status1=["poison"])
+    assert poisoned["outcomes"]["p1"] < battle_odds(TANK, RIVAL)["outcomes"]["p1"]
+    assert math.isclose(sum(poisoned["outcomes"].values()), 1.0)
+
+
+def test_tally_follows_turns_reached_not_max_turns():
+    # Ends within a few turns: a huge limit costs nothing extra.
+    assert battle_odds(TANK, RIVAL, max_turns=10**7) == battle_odds(TANK, RIVAL)
+    # Chip damage of 1 per turn: well past the tally's initial size.
+    slow = _mon("slow", [("tap", 1, "physical")], hp=250, attack=5)
+    wall = _mon("wall", [("tap", 1, "physical")], hp=250, attack=5)
+    odds = battle_odds(slow, wall, max_turns=500)
+    assert odds["turns"]["min"] > 64
+    assert math.isclose(sum(odds["outcomes"].values()), 1.0)
+
+
+def test_immune_defender_takes_minimum_damage():
+    ghost = _mon("ghost", [("lick", 30, "physical", "ghost")], hp=60, types=("ghost",))
+    me, _ = compile_matchup(TANK, ghost)
+    assert me.ranked[0].type_mult == 0
+    assert damage_distribution(me.ranked[0]) == [(1, 1.0)]
+    odds = battle_odds(TANK, ghost)
+    assert math.isclose(sum(odds["outcomes"].values()), 1.0)
+    result = simulate_battle(TANK, ghost, log_level="none")
+    assert battle_odds(TANK, ghost, deterministic=True)["outcomes"][result["winner_side"]] == pytest.approx(1.0)
+
+
+def test_odds_endpoint():
+    response = client.post("/tools/battle/odds", json={"pokemon1": "pikachu", "pokemon2": "eevee"})
+    assert response.status_code == 200
+    odds = response.json()
+    assert odds == battle_odds(repository.get_pokemon("pikachu"), repository.get_pokemon("eevee"))
+    assert client.post("/tools/battle/odds", json={"pokemon1": "pikachu", "pokemon2": "eevee",
+                                                   "status1": ["sleep"]}).status_code == 400
+    for max_turns in (0, 10**8):
+        assert client.post("/tools/battle/odds", json={"pokemon1": "pikachu", "pokemon2": "eevee",
+                                                       "max_turns": max_turns}).status_code == 400
@@ -1,7 +1,9 @@
-import sys, os
+import sys, os, json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import pytest
 from fastapi.testclient import TestClient
 from src.server import app
+from src.battle.simulator import simulate_battle
 
 client = TestClient(app)
 
@@ -12,3 +14,88 @@ def test_battle_draw_or_winner():
     j = r.json()
     assert "winner" in j and "log" in j
     assert isinstance(j["log"], list)
+
+
+def test_battle_batch_reproducible():
+    payload = {"pokemon1": "pikachu", "pokemon2": "eevee", "n": 300, "seed": 42}
+    first = client.post("/tools/battle/batch", json=payload)
+    assert first.status_code == 200
+    j = first.json()
+    outcomes = j["outcomes"]
+    assert outcomes["p1"]["count"] + outcomes["p2"]["count"] + outcomes["draw"]["count"] == 300
+    low, high = outcomes["p1"]["ci95"]
+    assert low <= outcomes["p1"]["rate"] <= high
+    assert sum(j["turns"]["histogram"].values()) == 300
+    assert "logs" not in j
+    assert client.post("/tools/battle/batch", json=payload).json() == j
+
+
+def test_battle_batch_parallel_matches_serial():
+    from src.battle.montecarlo import run_batch
+    from src.battle.simulator import load_pokemon
+    p1, p2 = load_pokemon("pikachu"), load_pokemon("eevee")
+    serial = run_batch(p1, p2, n=400, seed=7, parallel=False)
+    assert run_batch(p1, p2, n=400, seed=7) == serial
+
+
+def test_deterministic_battle_is_served_from_cache():
+    from src.battle.result_cache import result_cache
+    payload = {"pokemon1": "pikachu", "pokemon2": "eevee", "level": 37, "deterministic": True}
+    first = client.post("/tools/battle", json=payload)
+    hits = result_cache.stats()["counts"]["memory.hit"]
+    again = client.post("/tools/battle", json=payload)
+    assert again.status_code == 200
+    assert again.json() == first.json()
+    assert result_cache.stats()["counts"]["memory.hit"] == hits + 1
+
+
+@pytest.mark.parametrize("log_level", ["none", "summary", "structured", "text"])
+def test_log_levels_agree_on_outcome(log_level):
+    base = simulate_battle("pikachu", "eevee", log_level="text")
+    result = simulate_battle("pikachu", "eevee", log_level=log_level)
+    assert (result["winner"], result["turns"], result["final_states"]) == \
+        (base["winner"], base["turns"], base["final_states"])
+    assert set(result["final_states"]["p1"]) == {"name", "max_hp", "current_hp", "status"}
+    if log_level == "none":
+        assert result["log"] == []
+    elif log_level == "structured":
+        moves = [e for e in result["log"] if "move" in e]
+        assert moves and all(set(e) >= {"turn", "actor", "move", "damage", "target", "hp_after"} for e in moves)
+        assert moves[-1].get("action") == "faint" or result["winner"] == "draw"
+    elif log_level == "summary":
+        assert len(result["log"]) <= 1
+
+
+def test_battle_rejects_unknown_log_level():
+    payload = {"pokemon1": "pikachu", "pokemon2": "eevee", "log_level": "verbose"}
+    assert client.post("/tools/battle", json=payload).status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/tools/battle", "/tools/battle/stream", "/tools/battle/batch", "/jobs",
+                                  "/tools/tournament"])
+def test_battle_endpoints_bound_max_turns(path):
+    for max_turns in (0, 10**9):
+        payload = {"pokemon1": "pikachu", "pokemon2": "eevee", "roster": ["pikachu", "eevee"], "max_turns": max_turns}
+        assert client.post(path, json=payload).status_code == 400
+
+
+def test_battle_stream_ndjson_matches_battle():
+    payload = {"pokemon1": "pikachu", "pokemon2": "eevee", "log_level": "structured"}
+    r = client.post("/tools/battle/stream", json=payload)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    frames = [json.loads(line) for line in r.text.splitlines()]
+    assert [f["event"] for f in frames[:-1]] == ["log"] * (len(frames) - 1)
+    assert frames[-1]["event"] == "result"
+    full = client.post("/tools/battle", json=payload).json()
+    assert [f["data"] for f in frames[:-1]] == full["log"]
+    assert frames[-1]["data"]["winner"] == full["winner"]
+
+
+def test_battle_stream_sse():
+    payload = {"pokemon1": "pikachu", "pokemon2": "eevee", "format": "sse"}
+    r = client.post("/tools/battle/stream", json=payload)
+    assert r.headers["content-type"].startswith("text/event-stream")
+    blocks = r.text.strip().split("\n\n")
+    assert blocks[-1].startswith("event: result\ndata: ")
+    assert all(b.startswith("event: log\n") for b in blocks[:-1])
@@ -0,0 +1,52 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.battle.type_chart import TYPES, TYPE_MATRIX, type_id, effectiveness, type_effectiveness
+from src.battle.compiled import compile_matchup
+from src.pokemon.models import PokemonResource
+
+
+def test_type_matrix_matches_chart():
+    assert len(TYPES) == 18 and all(len(row) == 18 for row in TYPE_MATRIX)
+    for attacking in TYPES:
+        for d1 in TYPES:
+            for d2 in (None, "steel", "Ghost"):
+                defenders = [d1] + ([d2] if d2 else [])
+                assert effectiveness(type_id(attacking), [type_id(d) for d in defenders]) == \
+                    type_effectiveness(attacking, defenders)
+    assert effectiveness(type_id(None), [type_id("fire")]) == 1.0
+
+
+def _move(name, type_, power, damage_class):
+    return {"name": name, "type": type_, "power": power, "accuracy": 100, "pp": 10,
+            "damage_class": damage_class, "short_effect": None, "move_resource_uri": None}
+
+
+def _mon(name, types, moves):
+    return PokemonResource(
+        id=1, name=name, types=types, abilities=[], evolution_chain=[], height=1, weight=1, sprite_url=None,
+        base_stats={"hp": 100, "attack": 55, "defense": 40, "special_attack": 50,
+                    "special_defense": 60, "speed": 90},
+        moves=[_move(*m) for m in moves])
+
+
+def test_move_ranking_and_damage_formula():
+    attacker = _mon("sparky", ["electric"], [("tackle", "normal", 40, "physical"),
+                                             ("surf", "water", 90, "special"),
+                                             ("thunder", "electric", 90, "special")])
+    defender = _mon("splashy", ["water"], [("growl", "normal", None, "status")])
+    me, them = compile_matchup(attacker, defender, 50)
+    # power * 1.5 (STAB) * type multiplier: 270, 45, 40
+    assert [m.move.name for m in me.ranked] == ["thunder", "surf", "tackle"]
+    assert [m.score for m in me.ranked] == [270.0, 45.0, 40.0]
+    assert me.pick(deterministic=True).move.name == "thunder"
+    thunder, tackle = me.ranked[0], me.ranked[2]
+    # base = ((2*50/5 + 2) * 90 * 50/60) / 50 + 2 = 35, times 1.5 STAB * 2 super effective
+    assert thunder.base == 35.0 and thunder.damage(1.0, False) == 105
+    assert thunder.damage(1.0, True) == 105  # burn only halves physical moves
+    # base = (22 * 40 * 55/40) / 50 + 2 = 26.2, halved by burn
+    assert tackle.damage(1.0, True) == 13 and tackle.damage(0.85, False) == 22
+    assert thunder.detail(1.0, False) == {"base": 35.0, "stab": 1.5, "type_mult": 2.0, "rand": 1.0,
+                                          "modifier": 3.0, "final_damage": 105}
+    # No move with power: the first move is used and does nothing.
+    assert them.fallback and them.pick(deterministic=False).move.name == "growl"
+    assert them.ranked[0].detail(1.0, False) == {"reason": "move has no power"}
@@ -0,0 +1,107 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import threading
+import time
+from concurrent.futures import Future
+import pytest
+from fastapi.testclient import TestClient
+from src.battle.jobs import JobQueue, QueueFull, job_timeout, _run_job
+from src.battle.montecarlo import run_batch
+from src.battle.simulator import simulate_battle
+from src.pokemon.repository import repository
+from src.server import app
+
+client = TestClient(app)
+
+
+def test_battle_job_matches_direct_simulation():
+    submitted = client.post("/jobs", json={"kind": "battle", "pokemon1": "pikachu", "pokemon2": "eevee",
+                                           "log_level": "none"})
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert submitted.headers["location"] == f"/jobs/{job['job_id']}"
+    finished = client.get(f"/jobs/{job['job_id']}/wait", params={"timeout": 30}).json()
+    assert finished["status"] == "done"
+    expected = simulate_battle(repository.get_pokemon("pikachu"), repository.get_pokemon("eevee"), log_level="none")
+    assert finished["result"] == expected
+    assert client.get(f"/jobs/{job['job_id']}").json()["status"] == "done"
+
+
+def test_batch_job_matches_direct_batch():
+    body = {"kind": "batch", "pokemon1": "pikachu", "pokemon2": "eevee", "n": 200, "seed": 3}
+    job = client.post("/jobs", json=body).json()
+    finished = client.get(f"/jobs/{job['job_id']}/wait").json()
+    assert finished["status"] == "done"
+    expected = run_batch(repository.get_pokemon("pikachu"), repository.get_pokemon("eevee"), n=200, seed=3,
+                         parallel=False, engine="vectorized")
+    assert finished["result"]["outcomes"] == expected["outcomes"]
+
+
+def test_admission_control_rejects_when_full(monkeypatch):
+    queue = JobQueue(max_pending=0)
+    with pytest.raises(QueueFull):
+        queue.submit("battle", repository.get_pokemon("pikachu"), repository.get_pokemon("eevee"))
+    monkeypatch.setattr("src.server.job_queue", queue)
+    response = client.post("/jobs", json={"pokemon1": "pikachu", "pokemon2": "eevee"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_invalid_and_unknown_jobs():
+    assert client.post("/jobs", json={"kind": "tournament", "pokemon1": "pikachu",
+                                      "pokemon2": "eevee"}).status_code == 400
+    assert client.post("/jobs", json={"kind": "batch", "pokemon1": "pikachu", "pokemon2": "eevee",
+                                      "n": 0}).status_code == 400
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.delete("/jobs/nope").status_code == 404
+
+
+def test_timeout_scales_with_work():
+    battle = job_timeout("battle", {"max_turns": 200})
+    assert job_timeout("batch", {"max_turns": 200, "n": 1000}) > battle
+    assert job_timeout("battle", {"max_turns": 200, "policy": "search", "search_time": 0.01}) > battle
+
+
+class _HeldPool:
+    """Executor whose futures stay queued until the test moves them along."""
+
+    def submit(self, fn, *args):
+        return Future()
+
+
+def test_queued_jobs_do_not_time_out(monkeypatch):
+    monkeypatch.setattr("src.battle.jobs.get_pool", lambda: _HeldPool())
+    queue = JobQueue()
+    job = queue.submit("battle", repository.get_pokemon("pikachu"), repository.get_pokemon("eevee"))
+    job.timeout = 0.01
+    time.sleep(0.05)
+    assert queue.get(job.id).status == "queued"
+    job.future.set_running_or_notify_cancel()
+    assert queue.get(job.id).status == "running"
+    # The worker enforces the timeout and reports it.
+    job.future.set_exception(TimeoutError("battle exceeded its deadline"))
+    assert queue.get(job.id).status == "timeout"
+    assert queue.pending == 0
+
+
+@pytest.mark.parametrize("kind, options", [("battle", {"log_level": "none"}),
+                                           ("batch", {"n": 10, "engine": "vectorized"}),
+                                           ("batch", {"n": 10, "engine": "scalar"})])
+def test_worker_stops_at_its_deadline(kind, options):
+    # Without moves neither side can faint: only the deadline ends these.
+    stuck = repository.get_pokemon("pikachu").model_copy(update={"moves": []}).model_dump()
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        _run_job(kind, stuck, stuck, {"max_turns": 10**7, **options}, timeout=0.05)
+    assert time.perf_counter() - started < 5
+
+
+def test_wait_returns_when_job_is_cancelled(monkeypatch):
+    monkeypatch.setattr("src.battle.jobs.get_pool", lambda: _HeldPool())
+    queue = JobQueue()
+    monkeypatch.setattr("src.server.job_queue", queue)
+    job = queue.submit("battle", repository.get_pokemon("pikachu"), repository.get_pokemon("eevee"))
+    threading.Timer(0.2, queue.cancel, args=(job.id,)).start()
+    response = client.get(f"/jobs/{job.id}/wait", params={"timeout": 10})
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
@@ -0,0 +1,40 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from fastapi.testclient import TestClient
+from src.server import app
+from src.metrics import Registry
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("op_seconds", "Op latency.", ["op"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "read")
+    lines = registry.render().splitlines()
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in lines
+    assert 'op_seconds_bucket{op="read",le="1.0"} 3' in lines
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in lines
+    assert 'op_seconds_count{op="read"} 4' in lines
+    assert "# TYPE op_seconds histogram" in lines
+
+
+def test_counter_labels_are_escaped():
+    registry = Registry()
+    registry.counter("events_total", "Events.", ["name"]).inc('say "hi"', amount=2)
+    assert 'events_total{name="say \\"hi\\""} 2' in registry.render()
+
+
+def test_metrics_endpoint_reports_routes_and_simulator():
+    client.get("/resources/pokemon/pikachu")
+    client.post("/tools/battle", json={"pokemon1": "pikachu", "pokemon2": "eevee", "level": 12})
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/resources/pokemon/{name}"}' in text
+    assert 'http_requests_total{method="POST",route="/tools/battle",status="200"}' in text
+    assert 'battles_total{engine="scalar"}' in text
+    assert 'repository_cache_hit_ratio{kind="pokemon",tier="memory"}' in text
+    assert "battle_result_cache_lookups_total" in text
@@ -0,0 +1,26 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.pokemon.name_index import NameIndex
+
+NAMES = ["charmander", "charmeleon", "charizard", "pikachu", "raichu", "pichu", "mr-mime", "chansey", "char"]
+
+
+def test_ranking_exact_prefix_substring():
+    index = NameIndex(NAMES)
+    assert index.search("char", fuzzy=False) == ["char", "charizard", "charmander", "charmeleon"]
+    assert index.search("chu", fuzzy=False) == ["pichu", "raichu", "pikachu"]
+
+
+def test_fuzzy_typos():
+    index = NameIndex(NAMES)
+    assert index.search("pikachoo")[0] == "pikachu"
+    assert index.search("charzard")[0] == "charizard"
+
+
+def test_pagination_and_updates():
+    index = NameIndex(NAMES)
+    assert index.search("char", limit=2, offset=1, fuzzy=False) == ["charizard", "charmander"]
+    index.add("Charjabug")
+    assert "charjabug" in index
+    assert index.prefix("charj") == ["charjabug"]
+    assert len(index) == len(NAMES) + 1
@@ -0,0 +1,76 @@
+import sys, os, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.pokemon.normalizer import normalize_pokemon
+
+RAW = {
+    "id": 133,
+    "name": "eevee",
+    "stats": [{"stat": {"name": "hp"}, "base_stat": 55}],
+    "types": [{"type": {"name": "normal"}}],
+    "abilities": [{"ability": {"name": "run-away"}}],
+    "moves": [{"move": {"name": n}} for n in ["pay-day", "tackle", "bite", "growl", "swift", "extra"]],
+    "height": 3,
+    "weight": 65,
+    "sprites": {"front_default": None},
+}
+
+
+class SlowClient:
+    """Every upstream call takes `delay` seconds; `broken` moves fail."""
+
+    def __init__(self, delay=0.1, broken=(), broken_chain=False):
+        self.delay = delay
+        self.broken = set(broken)
+        self.broken_chain = broken_chain
+
+    def get_move(self, name):
+        time.sleep(self.delay)
+        if name in self.broken:
+            raise RuntimeError(name)
+        return {"name": name, "type": {"name": "normal"}, "power": 40, "accuracy": 100, "pp": 35,
+                "damage_class": {"name": "physical"}, "effect_entries": []}
+
+    def get_species(self, pokemon_id):
+        time.sleep(self.delay)
+        return {"evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/67/"}}
+
+    def get_evolution_chain(self, chain_id):
+        time.sleep(self.delay)
+        if self.broken_chain:
+            raise RuntimeError(chain_id)
+        return {"chain": {"species": {"name": "eevee"}, "evolves_to": [
+            {"species": {"name": "vaporeon"}, "evolves_to": []}]}}
+
+
+def test_fan_out_is_bounded_by_slowest_branch():
+    start = time.perf_counter()
+    resource = normalize_pokemon(RAW, api=SlowClient(delay=0.1))
+    elapsed = time.perf_counter() - start
+    # serial would be 5 moves + species + chain = 0.7s
+    assert elapsed < 0.4
+    assert [m.name for m in resource.moves] == ["pay-day", "tackle", "bite", "growl", "swift"]
+    assert resource.evolution_chain == ["eevee", "vaporeon"]
+
+
+def test_partial_failures_keep_placeholders():
+    resource = normalize_pokemon(RAW, api=SlowClient(delay=0, broken={"bite"}, broken_chain=True))
+    bite = resource.moves[2]
+    assert bite.name == "bite" and bite.power is None and bite.type is None
+    assert bite.move_resource_uri == "/resources/move/bite"
+    assert resource.moves[1].power == 40
+    assert resource.evolution_chain == []
+
+
+def test_fake_pokeapi_replays_recorded_resources():
+    import json
+    from src.pokemon.models import PokemonResource
+    from src.pokemon.poke_client import PokeAPIClient
+    from src.pokemon.testing import FakePokeAPISession, DATA_DIR
+    api = PokeAPIClient(base_url="http://pokeapi.test")
+    api.session = FakePokeAPISession(base_url="http://pokeapi.test")
+    with open(os.path.join(DATA_DIR, "pikachu.json")) as f:
+        expected = PokemonResource(**json.load(f))
+    assert normalize_pokemon(api.get_pokemon("pikachu"), api) == expected
+    assert normalize_pokemon(api.get_pokemon("25"), api) == expected
+    charmander = normalize_pokemon(api.get_pokemon("charmander"), api)
+    assert charmander.id == 4 and all(m.type for m in charmander.moves)
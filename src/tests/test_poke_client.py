@@ -0,0 +1,115 @@
+import sys, os, json, threading, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.pokemon.poke_client import PokeAPIClient
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        return json.dumps(self.payload).encode()
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.urls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.urls.append(url)
+        time.sleep(self.delay)
+        return FakeResponse({"name": url.rsplit("/", 1)[-1]})
+
+
+def test_concurrent_requests_share_one_fetch():
+    api = PokeAPIClient(base_url="http://pokeapi.test")
+    api.session = FakeSession()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(api.get_pokemon("Pikachu")))
+               for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 50
+    assert api.session.urls == ["http://pokeapi.test/pokemon/pikachu"]
+
+    # warm call is served from the cache
+    api.get_pokemon("pikachu")
+    assert len(api.session.urls) == 1
+
+
+def test_endpoints_are_cached_separately():
+    api = PokeAPIClient(base_url="http://pokeapi.test")
+    api.session = FakeSession(delay=0)
+    api.get_pokemon("1")
+    api.get_species("1")
+    api.get_pokemon_list(10)
+    api.get_pokemon_list(10)
+    assert api.session.urls == [
+        "http://pokeapi.test/pokemon/1",
+        "http://pokeapi.test/pokemon-species/1",
+        "http://pokeapi.test/pokemon",
+    ]
+
+
+def _full_pokemon_doc(name, n_moves=80):
+    """PokéAPI-shaped document with the bulky fields the real API returns."""
+    return {
+        "id": 25, "name": name, "height": 4, "weight": 60, "base_experience": 112,
+        "species": {"name": name, "url": "http://pokeapi.test/pokemon-species/25/"},
+        "stats": [{"base_stat": 35, "effort": 0, "stat": {"name": "hp", "url": "u"}}],
+        "types": [{"slot": 1, "type": {"name": "electric", "url": "u"}}],
+        "abilities": [{"ability": {"name": "static", "url": "u"}, "is_hidden": False, "slot": 1}],
+        "moves": [{"move": {"name": f"move-{i}", "url": f"http://pokeapi.test/move/{i}/"},
+                   "version_group_details": [{"level_learned_at": 1, "move_learn_method": {"name": "level-up"},
+                                              "version_group": {"name": f"vg-{v}"}} for v in range(20)]}
+                  for i in range(n_moves)],
+        "game_indices": [{"game_index": 84, "version": {"name": f"v-{v}"}} for v in range(20)],
+        "sprites": {"front_default": "front.png", "back_default": "back.png",
+                    "versions": {"generation-i": {"red-blue": {"front_default": "rb.png"}}}},
+    }
+
+
+class FullDocSession(FakeSession):
+    def get(self, url, params=None, timeout=None):
+        self.urls.append(url)
+        return FakeResponse(_full_pokemon_doc(url.rsplit("/", 1)[-1]))
+
+
+def test_documents_are_slimmed_before_caching():
+    api = PokeAPIClient(base_url="http://pokeapi.test")
+    api.session = FullDocSession(delay=0)
+    doc = api.get_pokemon("pikachu")
+    assert set(doc) == {"id", "name", "height", "weight", "species", "stats", "types", "abilities", "moves",
+                        "sprites"}
+    assert doc["moves"][0] == {"move": {"name": "move-0"}}
+    assert doc["sprites"] == {"front_default": "front.png"}
+    assert doc["stats"] == [{"base_stat": 35, "stat": {"name": "hp"}}]
+    full = len(json.dumps(_full_pokemon_doc("pikachu")))
+    assert api.cache_stats()["pokemon"]["bytes"] < full / 10
+
+
+def test_cache_is_bounded_by_bytes():
+    api = PokeAPIClient(base_url="http://pokeapi.test")
+    api.session = FullDocSession(delay=0)
+    api.get_pokemon("a")
+    one = api.cache_stats()["pokemon"]["bytes"]
+    api._caches["pokemon"].max_bytes = int(one * 2.5)
+    for name in ("b", "c", "d"):
+        api.get_pokemon(name)
+    stats = api.cache_stats()["pokemon"]
+    assert stats["entries"] == 2 and stats["bytes"] <= stats["max_bytes"]
+    # the least recently used documents went first
+    api.get_pokemon("d")
+    api.get_pokemon("a")
+    assert api.session.urls.count("http://pokeapi.test/pokemon/d") == 1
+    assert api.session.urls.count("http://pokeapi.test/pokemon/a") == 2
@@ -0,0 +1,100 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import threading
+import time
+import pytest
+from src.pokemon.poke_client import PokeAPIClient
+from src.pokemon.prefetch import FamilyPrefetcher
+from src.pokemon.repository import PokemonRepository
+from src.pokemon.ratelimit import TokenBucket
+from src.pokemon.resilience import UpstreamGovernor
+from src.pokemon.testing import FakePokeAPISession
+
+FAMILY = ["bulbasaur", "ivysaur", "venusaur"]
+
+
+class FamilySession(FakePokeAPISession):
+    """Synthesized Kanto dex in which the bulbasaur line is one evolution family."""
+
+    def chain_doc(self, name):
+        if name not in FAMILY:
+            return super().chain_doc(name)
+        node = {"species": {"name": FAMILY[-1]}, "evolves_to": []}
+        for member in reversed(FAMILY[:-1]):
+            node = {"species": {"name": member}, "evolves_to": [node]}
+        return {"id": self.ids[name], "chain": node}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    api = PokeAPIClient(governor=UpstreamGovernor(sleep=lambda s: None))
+    api.session = FamilySession(data_dir=str(tmp_path))
+    repository = PokemonRepository(api=api, data_dir=str(tmp_path))
+    repository.prefetcher = FamilyPrefetcher(repository, rate=100, idle_poll=0.01)
+    yield repository
+    repository.prefetcher.stop()
+
+
+def test_family_members_and_moves_are_prefetched(repo):
+    bulbasaur = repo.get_pokemon("bulbasaur")
+    assert bulbasaur.evolution_chain == FAMILY
+    repo.prefetcher.join()
+    assert repo.in_memory("ivysaur") and repo.in_memory("venusaur")
+    counts = repo.stats()["prefetch"]["counts"]
+    assert counts["queued"] == 2 and counts["loaded"] == 2 and counts["upstream"] == 2
+    # Members' own normalization scheduled nothing new.
+    assert counts.get("deduped", 0) >= 2
+    before = repo.api.session.requests
+    for move in repo.get_pokemon("venusaur").moves:
+        repo.get_move(move.name)
+    assert repo.api.session.requests == before
+
+
+def test_queue_is_bounded_and_deduplicated(repo):
+    prefetcher = FamilyPrefetcher(repo, max_queue=1)
+    prefetcher._start = lambda: None
+    bulbasaur = repo.get_pokemon("bulbasaur")
+    assert prefetcher.schedule(bulbasaur) == 1
+    assert prefetcher.schedule(bulbasaur) == 0
+    assert prefetcher.stats()["counts"] == {"queued": 1, "dropped": 2, "deduped": 1}
+
+
+def test_prefetch_waits_for_foreground_requests(repo):
+    api = repo.api
+    gate = threading.Event()
+    foreground = threading.Thread(target=lambda: api.governor.call(api.host, lambda: gate.wait(5)))
+    foreground.start()
+    try:
+        repo.get_pokemon("bulbasaur")
+        time.sleep(0.2)
+        assert not repo.in_memory("ivysaur")
+    finally:
+        gate.set()
+        foreground.join()
+    repo.prefetcher.join()
+    assert repo.in_memory("ivysaur") and repo.in_memory("venusaur")
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self, rate):
+        super().__init__(rate)
+        self.spent = 0
+
+    def acquire(self, tokens=1.0, timeout=None):
+        self.spent += tokens
+        return super().acquire(tokens, timeout)
+
+
+def test_budget_is_charged_per_upstream_request(repo):
+    prefetcher = repo.prefetcher
+    prefetcher.budget = CountingBucket(1000)
+    prefetcher._start = lambda: None  # hold the worker until the foreground load is counted
+    repo.get_pokemon("bulbasaur")
+    before = repo.api.session.requests
+    del prefetcher._start
+    prefetcher._start()
+    prefetcher.join()
+    prefetched = repo.api.session.requests - before
+    # Two members, each with its Pokémon document and moves (the chain is shared).
+    assert prefetched > 2
+    assert prefetcher.budget.spent == prefetched
@@ -0,0 +1,98 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import threading
+import time
+from fastapi.testclient import TestClient
+from src.server import app
+from src import profiling
+from src.profiling import StackSampler, ADMIN_TOKEN_ENV
+
+client = TestClient(app)
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_collapses_busy_stacks():
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    # On a loaded single-core box either thread may be descheduled for a while:
+    # keep busy until the sampler has caught _busy.
+    deadline = time.perf_counter() + 2.0
+    while True:
+        _busy(0.05)
+        if any("_busy" in stack for stack in list(sampler.counts)) or time.perf_counter() > deadline:
+            break
+    sampler.stop()
+    assert sampler.samples > 0
+    lines = sampler.collapsed().splitlines()
+    assert any("test_profiling:_busy" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+    assert any(f["function"].endswith("test_profiling:_busy") for f in sampler.top_functions())
+
+
+def _bystander(stop):
+    while not stop.is_set():
+        pass
+
+
+def test_scoped_sampler_only_samples_bound_threads():
+    sampler = StackSampler(interval=0.001, scoped=True)
+    token = profiling._current.set(sampler)
+    try:
+        bound = profiling.bind(_busy)
+    finally:
+        profiling._current.reset(token)
+    assert profiling.bind(_busy) is _busy  # nothing profiled in this context
+    stop = threading.Event()
+    threading.Thread(target=_bystander, args=(stop,), name="bystander", daemon=True).start()
+    sampler.start()
+    deadline = time.perf_counter() + 2.0
+    while True:
+        worker = threading.Thread(target=bound, args=(0.05,), name="request-worker")
+        worker.start()
+        worker.join()
+        if any("_busy" in stack for stack in list(sampler.counts)) or time.perf_counter() > deadline:
+            break
+    sampler.stop()
+    stop.set()
+    assert any(stack.startswith("request-worker;") for stack in sampler.counts)
+    assert not any("_bystander" in stack or stack.startswith("MainThread;") for stack in sampler.counts)
+
+
+def test_profiling_requires_admin_token(monkeypatch):
+    monkeypatch.delenv(ADMIN_TOKEN_ENV, raising=False)
+    assert client.get("/resources/pokemon/pikachu?profile=1").status_code == 403
+    monkeypatch.setenv(ADMIN_TOKEN_ENV, "secret")
+    r = client.get("/resources/pokemon/pikachu", headers={"X-Profile": "1", "X-Admin-Token": "wrong"})
+    assert r.status_code == 403
+    assert client.get("/admin/profiles").status_code == 403
+    # Unprofiled requests are untouched.
+    r = client.get("/resources/pokemon/pikachu")
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+
+
+def test_profiled_battle_is_stored_and_retrievable(monkeypatch):
+    monkeypatch.setenv(ADMIN_TOKEN_ENV, "secret")
+    admin = {"X-Admin-Token": "secret"}
+    r = client.post("/tools/battle?profile=memory", headers=admin,
+                    json={"pokemon1": "pikachu", "pokemon2": "eevee", "deterministic": False})
+    assert r.status_code == 200
+    assert r.json()["winner"]
+    profile_id = r.headers["x-profile-id"]
+
+    profile = client.get(f"/admin/profiles/{profile_id}", headers=admin).json()
+    assert profile["path"] == "/tools/battle"
+    assert profile["duration_ms"] > 0
+    assert profile["memory"]["peak_bytes"] > 0
+    assert profile["memory"]["top_allocations"]
+    assert profile_id in [p["id"] for p in client.get("/admin/profiles", headers=admin).json()]
+
+    collapsed = client.get(f"/admin/profiles/{profile_id}/collapsed", headers=admin)
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert collapsed.text == profile["collapsed"]
+    assert client.get("/admin/profiles/nope", headers=admin).status_code == 404
@@ -0,0 +1,191 @@
+import sys, os, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import pytest
+from src.pokemon.repository import PokemonRepository
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+
+RAW_BULBASAUR = {
+    "id": 1,
+    "name": "bulbasaur",
+    "stats": [{"stat": {"name": "hp"}, "base_stat": 45}, {"stat": {"name": "speed"}, "base_stat": 45}],
+    "types": [{"type": {"name": "grass"}}, {"type": {"name": "poison"}}],
+    "abilities": [{"ability": {"name": "overgrow"}}],
+    "moves": [{"move": {"name": "tackle"}}],
+    "height": 7,
+    "weight": 69,
+    "sprites": {"front_default": None},
+}
+
+RAW_TACKLE = {
+    "name": "tackle",
+    "type": {"name": "normal"},
+    "power": 40,
+    "accuracy": 100,
+    "pp": 35,
+    "damage_class": {"name": "physical"},
+    "effect_entries": [{"short_effect": "Inflicts regular damage."}],
+}
+
+
+class StubClient:
+    def __init__(self):
+        self.calls = []
+
+    def get_pokemon(self, name_or_id):
+        self.calls.append(("pokemon", name_or_id))
+        if name_or_id not in ("bulbasaur", "1"):
+            raise LookupError(name_or_id)
+        return RAW_BULBASAUR
+
+    def get_move(self, name_or_id):
+        self.calls.append(("move", name_or_id))
+        return RAW_TACKLE
+
+    def get_species(self, name_or_id):
+        self.calls.append(("species", name_or_id))
+        return {"evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/1/"}}
+
+    def get_evolution_chain(self, chain_id):
+        self.calls.append(("evolution-chain", chain_id))
+        return {"chain": {"species": {"name": "bulbasaur"}, "evolves_to": [
+            {"species": {"name": "ivysaur"}, "evolves_to": []}]}}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, "pikachu.json"), tmp_path / "pikachu.json")
+    return PokemonRepository(api=StubClient(), data_dir=str(tmp_path))
+
+
+def test_disk_then_memory_tier(repo):
+    first = repo.get_pokemon("Pikachu")
+    second = repo.get_pokemon("pikachu")
+    assert first is second
+    assert repo.api.calls == []
+    counts = repo.stats()["counts"]
+    assert counts["pokemon.disk.hit"] == 1
+    assert counts["pokemon.memory.hit"] == 1
+
+
+def test_upstream_is_written_through(repo, tmp_path):
+    resource = repo.get_pokemon("bulbasaur")
+    assert resource.evolution_chain == ["bulbasaur", "ivysaur"]
+    assert repo.store.get_pokemon("bulbasaur") == resource
+
+    calls = len(repo.api.calls)
+    assert repo.get_pokemon(1) is resource
+    repo.clear_memory()
+    assert repo.get_pokemon("bulbasaur").name == "bulbasaur"
+    assert len(repo.api.calls) == calls
+
+
+def test_memory_ttl_expiry(tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, "eevee.json"), tmp_path / "eevee.json")
+    repo = PokemonRepository(api=StubClient(), data_dir=str(tmp_path), memory_ttl=-1)
+    repo.get_pokemon("eevee")
+    repo.get_pokemon("eevee")
+    assert repo.stats()["counts"]["pokemon.disk.hit"] == 2
+
+
+def test_upstream_errors_are_counted(repo):
+    with pytest.raises(LookupError):
+        repo.get_pokemon("missingno")
+    assert repo.stats()["counts"]["pokemon.upstream.error"] == 1
+
+
+def test_concurrent_cold_lookups_are_coalesced(tmp_path):
+    import threading, time
+
+    class CountingClient(StubClient):
+        def get_pokemon(self, name_or_id):
+            time.sleep(0.05)
+            return super().get_pokemon(name_or_id)
+
+    repo = PokemonRepository(api=CountingClient(), data_dir=str(tmp_path))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(repo.get_pokemon("bulbasaur")))
+               for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 20
+    assert len({id(r) for r in results}) == 1
+    assert [c for c in repo.api.calls if c[0] == "pokemon"] == [("pokemon", "bulbasaur")]
+
+
+def test_moves_are_stored_once_and_served_from_store(repo, tmp_path):
+    repo.get_pokemon("bulbasaur")
+    assert repo.api.calls.count(("move", "tackle")) == 1
+    assert repo.store.get_move("tackle").power == 40
+
+    # A fresh process (new repository over the same store) never refetches it.
+    fresh = PokemonRepository(api=StubClient(), data_dir=str(tmp_path))
+    assert fresh.get_move("tackle").power == 40
+    assert fresh.api.calls == []
+    assert fresh.stats()["counts"]["move.disk.hit"] == 1
+
+
+def test_family_members_reuse_the_stored_chain(tmp_path):
+    class FamilyClient(StubClient):
+        def get_pokemon(self, name_or_id):
+            self.calls.append(("pokemon", name_or_id))
+            if name_or_id == "ivysaur":
+                return {**RAW_BULBASAUR, "id": 2, "name": "ivysaur"}
+            return super().get_pokemon(name_or_id)
+
+    repo = PokemonRepository(api=FamilyClient(), data_dir=str(tmp_path))
+    repo.get_pokemon("bulbasaur")
+    assert repo.get_pokemon("ivysaur").evolution_chain == ["bulbasaur", "ivysaur"]
+    assert [c[0] for c in repo.api.calls].count("evolution-chain") == 1
+    assert [c[0] for c in repo.api.calls].count("species") == 1
+    assert repo.stats()["store_entries"] == {"pokemon": 2, "moves": 1, "evolution_chains": 1}
+
+
+def test_stale_entry_served_when_upstream_fails(tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, "pikachu.json"), tmp_path / "pikachu.json")
+
+    class DownClient(StubClient):
+        def healthy(self):
+            return True
+
+        def get_pokemon(self, name_or_id):
+            self.calls.append(("pokemon", name_or_id))
+            raise ConnectionError("upstream down")
+
+    # disk_ttl=-1: every stored entry is already expired.
+    repo = PokemonRepository(api=DownClient(), data_dir=str(tmp_path), disk_ttl=-1)
+    assert repo.get_pokemon("pikachu").name == "pikachu"
+    assert repo.api.calls == [("pokemon", "pikachu")]
+    assert repo.stats()["counts"]["pokemon.stale.served"] == 1
+    # Stale copies stay out of memory, so the next lookup tries upstream again.
+    repo.get_pokemon("pikachu")
+    assert len(repo.api.calls) == 2
+    with pytest.raises(ConnectionError):
+        repo.get_pokemon("bulbasaur")
+
+
+def test_stale_while_revalidate_refreshes_in_background(tmp_path):
+    import threading
+    shutil.copy(os.path.join(DATA_DIR, "pikachu.json"), tmp_path / "pikachu.json")
+    release = threading.Event()
+
+    class SlowClient(StubClient):
+        def healthy(self):
+            return True
+
+        def get_pokemon(self, name_or_id):
+            release.wait(5)
+            self.calls.append(("pokemon", name_or_id))
+            return {**RAW_BULBASAUR, "id": 25, "name": "pikachu", "height": 99}
+
+    repo = PokemonRepository(api=SlowClient(), data_dir=str(tmp_path), disk_ttl=-1, stale_while_revalidate=True)
+    # Served immediately while upstream is still answering.
+    assert repo.get_pokemon("pikachu").height != 99
+    assert repo.get_pokemon("pikachu").height != 99
+    release.set()
+    repo._executor.shutdown(wait=True)
+    assert [c for c in repo.api.calls if c[0] == "pokemon"] == [("pokemon", "pikachu")]
+    assert repo.get_pokemon("pikachu").height == 99
+    assert repo.stats()["counts"]["pokemon.stale.served"] == 2
@@ -0,0 +1,113 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from src.pokemon.poke_client import PokeAPIClient
+from src.pokemon.resilience import (CircuitBreaker, CircuitOpenError, RetryPolicy, UpstreamGovernor,
+                                    UpstreamUnavailable, parse_retry_after)
+from src.pokemon.testing import FakePokeAPISession, FakeResponse
+
+
+class FlakySession(FakePokeAPISession):
+    """Answers with the given statuses first, then normally."""
+
+    def __init__(self, statuses, headers=None):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        if self.statuses:
+            return FakeResponse(None, self.statuses.pop(0), url, headers=self.headers)
+        return self.route(url, params)
+
+
+def _client(session, **governor):
+    sleeps = []
+    api = PokeAPIClient(governor=UpstreamGovernor(sleep=sleeps.append, **governor))
+    api.session = session
+    return api, sleeps
+
+
+def test_retries_transient_errors_honoring_retry_after():
+    api, sleeps = _client(FlakySession([429, 503], headers={"Retry-After": "2"}),
+                          retry=RetryPolicy(max_total_wait=10.0))
+    assert api.get_pokemon("pikachu")["name"] == "pikachu"
+    assert api.session.requests == 3
+    assert len(sleeps) == 2 and all(s >= 2 for s in sleeps)
+
+
+def test_long_retry_after_fails_fast():
+    api, sleeps = _client(FlakySession([429], headers={"Retry-After": "20"}), retry=RetryPolicy(max_total_wait=1.5))
+    with pytest.raises(UpstreamUnavailable) as info:
+        api.get_pokemon("pikachu")
+    assert info.value.retry_after == 20.0
+    assert api.session.requests == 1 and sleeps == []
+
+
+def test_not_found_is_not_retried():
+    api, sleeps = _client(FlakySession([404]))
+    with pytest.raises(requests.HTTPError):
+        api.get_pokemon("pikachu")
+    assert api.session.requests == 1 and sleeps == []
+    assert api.healthy()
+
+
+def test_breaker_opens_after_repeated_failures_and_rejects():
+    api, _ = _client(FlakySession([500] * 6), retry=RetryPolicy(attempts=3), failure_threshold=3)
+    with pytest.raises(UpstreamUnavailable):
+        api.get_pokemon("pikachu")
+    assert not api.healthy()
+    with pytest.raises(CircuitOpenError) as info:
+        api.get_pokemon("eevee")
+    assert info.value.retry_after > 0
+    assert api.session.requests == 3
+
+
+def test_breaker_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0, max_retry_after=5.0)
+    delays = [policy.delay(6) for _ in range(50)]
+    assert all(0 <= d <= 1.0 for d in delays) and len(set(delays)) > 1
+    assert policy.delay(0, retry_after=60) == 5.0
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_server_answers_503_when_upstream_is_down(monkeypatch):
+    from src.server import app
+    from src.pokemon.poke_client import client as shared
+    monkeypatch.setattr(shared, "governor", UpstreamGovernor(sleep=lambda s: None, failure_threshold=100))
+    monkeypatch.setattr(shared, "session", FlakySession([503] * 3, headers={"Retry-After": "7"}))
+    response = TestClient(app).get("/resources/pokemon/missingno")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/tools/battle", {"pokemon1": "missingno", "pokemon2": "eevee"}),
+    ("/tools/battle/stream", {"pokemon1": "missingno", "pokemon2": "eevee"}),
+    ("/tools/battle/batch", {"pokemon1": "missingno", "pokemon2": "eevee", "n": 10}),
+    ("/tools/battle/odds", {"pokemon1": "missingno", "pokemon2": "eevee"}),
+    ("/tools/tournament", {"roster": ["missingno", "eevee"]}),
+])
+def test_tools_answer_503_when_upstream_is_down(monkeypatch, path, payload):
+    from src.server import app
+    from src.pokemon.poke_client import client as shared
+    monkeypatch.setattr(shared, "governor", UpstreamGovernor(sleep=lambda s: None, failure_threshold=100))
+    monkeypatch.setattr(shared, "session", FlakySession([503] * 3, headers={"Retry-After": "7"}))
+    response = TestClient(app).post(path, json=payload)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
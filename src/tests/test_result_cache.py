@@ -0,0 +1,54 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import pytest
+from src.pokemon.store import ResourceStore
+from src.battle.simulator import load_pokemon
+from src.battle.result_cache import BattleResultCache, result_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResourceStore(str(tmp_path / "pokemon.db"))
+
+
+def test_key_follows_content_not_names():
+    p1, p2 = load_pokemon("pikachu"), load_pokemon("eevee")
+    key = result_key(p1, p2, 50, 200)
+    assert result_key(p1, p2, 50, 200) == key
+    assert result_key(p2, p1, 50, 200) != key
+    assert result_key(p1, p2, 51, 200) != key
+    stronger = p1.model_copy(update={"base_stats": {**p1.base_stats, "attack": 200}})
+    assert result_key(stronger, p2, 50, 200) != key
+
+
+def test_lru_and_persistence(store):
+    cache = BattleResultCache(maxsize=2, store=store)
+    assert cache.get("a") is None
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")  # evicts "b", the least recently used
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get("b", memory_only=True) is None
+    assert cache.get("b") == b"2"  # still on disk
+
+    fresh = BattleResultCache(store=store)
+    assert fresh.get("c") == b"3"
+    assert cache.stats()["counts"] == {"memory.hit": 1, "disk.hit": 1, "miss": 1}
+    assert fresh.stats()["counts"]["disk.hit"] == 1
+
+
+def test_memory_only_cache_misses_after_clear():
+    cache = BattleResultCache()
+    cache.put("a", b"1")
+    cache.clear_memory()
+    assert cache.get("a") is None
+
+
+def test_stored_results_are_capped(store):
+    cache = BattleResultCache(maxsize=2, store=store, max_stored=3)
+    for key in "abcde":
+        cache.put(key, key.encode())
+    cache.clear_memory()
+    assert [cache.get(key) for key in "abcde"] == [None, None, b"c", b"d", b"e"]
+    assert store.prune_battle_results(1) == 2
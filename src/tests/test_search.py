@@ -0,0 +1,87 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import random
+import pytest
+from fastapi.testclient import TestClient
+from src.pokemon.models import PokemonResource
+from src.battle.compiled import compile_matchup
+from src.battle.search import MoveSearch
+from src.battle.simulator import simulate_battle
+from src.server import app
+
+client = TestClient(app)
+
+
+def _move(name, power, damage_class, type_="normal"):
+    return {"name": name, "type": type_, "power": power, "accuracy": 100, "pp": 10,
+            "damage_class": damage_class, "short_effect": None, "move_resource_uri": None}
+
+
+def _mon(name, moves, attack=50, special_attack=50, speed=50, hp=100):
+    return PokemonResource(
+        id=1, name=name, types=["water"], abilities=[], evolution_chain=[], height=1, weight=1, sprite_url=None,
+        base_stats={"hp": hp, "attack": attack, "defense": 60, "special_attack": special_attack,
+                    "special_defense": 60, "speed": speed},
+        moves=[_move(*m) for m in moves])
+
+
+# Greedy ranks by power alone; this attacker hits far harder with its weaker special move.
+WIZARD = _mon("wizard", [("club", 100, "physical"), ("spark", 70, "special")], attack=20, special_attack=150)
+BRUTE = _mon("brute", [("slam", 80, "physical"), ("jab", 40, "physical")], attack=90, speed=60)
+
+
+def test_search_picks_the_move_that_deals_more_damage():
+    me, opp = compile_matchup(WIZARD, BRUTE)
+    assert me.pick(deterministic=True).move.name == "club"
+    for deterministic in (True, False):
+        search = MoveSearch(me, opp, True, deterministic)
+        assert search.choose(me.max_hp, opp.max_hp).move.name == "spark"
+
+
+def test_unpruned_search_agrees_and_respects_node_budget():
+    me, opp = compile_matchup(WIZARD, BRUTE)
+    search = MoveSearch(me, opp, True, deterministic=False, nodes=50, prune=False)
+    assert search.choose(me.max_hp, opp.max_hp).move.name == "spark"
+    assert search.depth_reached >= 1
+    assert search.nodes <= 51
+    assert search.tt
+    # The table carries over to later turns of the same battle.
+    before = len(search.tt)
+    search.choose(me.max_hp - 30, opp.max_hp - 40)
+    assert len(search.tt) >= before
+
+
+def test_rolls_are_memoized_and_cover_the_roll_range():
+    me, opp = compile_matchup(WIZARD, BRUTE)
+    search = MoveSearch(me, opp, True, deterministic=False)
+    spark = next(m for m in me.ranked if m.move.name == "spark")
+    rolls = search.rolls(spark, False)
+    assert rolls is search.rolls(spark, False)
+    assert rolls[0] == spark.damage(0.85, False) and rolls[-1] == spark.damage(1.0, False)
+
+
+def test_search_policy_beats_greedy_mirror():
+    wins = 0
+    for seed in range(40):
+        result = simulate_battle(WIZARD, WIZARD.model_copy(update={"name": "apprentice"}), deterministic=False,
+                                 rng=random.Random(seed), log_level="none", policy={"p2": "search"})
+        wins += result["winner_side"] == "p2"
+    assert wins > 30
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        simulate_battle(WIZARD, BRUTE, policy="minimax")
+    response = client.post("/tools/battle", json={"pokemon1": "pikachu", "pokemon2": "eevee", "policy": "minimax"})
+    assert response.status_code == 400
+
+
+def test_battle_endpoint_accepts_search_policy():
+    body = {"pokemon1": "pikachu", "pokemon2": "eevee", "policy": "search", "search_nodes": 200,
+            "log_level": "structured"}
+    first = client.post("/tools/battle", json=body)
+    assert first.status_code == 200
+    assert first.json() == client.post("/tools/battle", json=body).json()
+    timed = client.post("/tools/battle", json={**body, "deterministic": False, "search_time_ms": 5})
+    assert timed.status_code == 200 and timed.json()["winner"]
+    assert client.post("/tools/battle", json={**body, "search_nodes": 0}).status_code == 400
@@ -0,0 +1,87 @@
+import sys, os, json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.pokemon.poke_client import PokeAPIClient
+from src.pokemon.repository import PokemonRepository
+from src.pokemon.seed_db import seed
+
+NAMES = {1: "bulbasaur", 2: "ivysaur", 3: "venusaur"}
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status != 200:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    @property
+    def content(self):
+        return json.dumps(self.payload).encode()
+
+    def json(self):
+        return self.payload
+
+
+class FakeDexSession:
+    """Routes PokéAPI urls for a three-member family sharing one move."""
+
+    def __init__(self, broken=()):
+        self.urls = []
+        self.broken = set(broken)
+
+    def get(self, url, params=None, timeout=None):
+        self.urls.append(url)
+        endpoint, key = url.split("/")[-2:]
+        if endpoint == "pokemon":
+            if int(key) in self.broken:
+                return FakeResponse({}, status=500)
+            return FakeResponse({
+                "id": int(key), "name": NAMES[int(key)],
+                "stats": [{"stat": {"name": "hp"}, "base_stat": 45}],
+                "types": [{"type": {"name": "grass"}}],
+                "abilities": [], "moves": [{"move": {"name": "tackle"}}],
+                "height": 7, "weight": 69, "sprites": {"front_default": None},
+            })
+        if endpoint == "move":
+            return FakeResponse({"name": key, "type": {"name": "normal"}, "power": 40, "accuracy": 100,
+                                 "pp": 35, "damage_class": {"name": "physical"}, "effect_entries": []})
+        if endpoint == "pokemon-species":
+            return FakeResponse({"evolution_chain": {"url": "http://pokeapi.test/evolution-chain/1/"}})
+        return FakeResponse({"chain": {"species": {"name": "bulbasaur"}, "evolves_to": []}})
+
+
+def _repo(tmp_path, session):
+    api = PokeAPIClient(base_url="http://pokeapi.test")
+    api.session = session
+    return PokemonRepository(api=api, data_dir=str(tmp_path))
+
+
+def test_seed_dedupes_shared_entities(tmp_path):
+    session = FakeDexSession()
+    summary = seed(3, workers=3, rate=1000, repo=_repo(tmp_path, session))
+    assert summary["seeded"] == 3 and not summary["failed"]
+    assert summary["skipped"] == 0
+    # one shared move and one shared chain, fetched once each
+    assert summary["upstream_requests"]["move"] == 1
+    assert summary["upstream_requests"]["evolution-chain"] == 1
+
+
+def test_seed_resumes_from_store(tmp_path):
+    summary = seed(3, workers=2, rate=1000, repo=_repo(tmp_path, FakeDexSession(broken={2})))
+    assert summary["seeded"] == 2 and list(summary["failed"]) == ["2"]
+
+    session = FakeDexSession()
+    summary = seed(3, workers=2, rate=1000, repo=_repo(tmp_path, session))
+    assert summary["seeded"] == 1 and summary["skipped"] == 2
+    assert "http://pokeapi.test/pokemon/2" in session.urls
+    assert "http://pokeapi.test/pokemon/1" not in session.urls
+
+
+def test_seed_restores_client_cache_sizes(tmp_path):
+    repo = _repo(tmp_path, FakeDexSession())
+    bounds = lambda: {k: (c.maxsize, c.max_bytes) for k, c in repo.api._caches.items()}
+    before = bounds()
+    seed(3, workers=2, rate=1000, repo=repo)
+    assert bounds() == before
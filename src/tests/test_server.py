@@ -28,3 +28,52 @@ def test_move_endpoint():
     data = response.json()
     assert data["name"] == "thunderbolt"
     assert "power" in data
+
+
+def test_pokemon_etag_and_not_modified():
+    response = client.get("/resources/pokemon/pikachu", headers={"Accept-Encoding": "identity"})
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and "content-encoding" not in response.headers
+    again = client.get("/resources/pokemon/pikachu", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    # The body matches the model's own serialization.
+    from src.pokemon.models import PokemonResource
+    assert PokemonResource(**response.json()).model_dump_json().encode() == response.content
+
+
+def test_large_resources_are_served_gzipped():
+    plain = client.get("/resources/pokemon/pikachu", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/resources/pokemon/pikachu", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json() == plain.json()
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    assert client.get("/resources/pokemon/pikachu", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]}).status_code == 304
+
+
+def test_manifest_is_cached_with_etag():
+    response = client.get("/manifest")
+    assert response.status_code == 200
+    assert "resources" in response.json()
+    assert client.get("/manifest", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_pokemon_batch_reports_items_in_order():
+    response = client.post("/resources/pokemon/batch", json={"names": ["pikachu", "not-a-pokemon", "Pikachu", "eevee"]})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["name"] for item in items] == ["pikachu", "not-a-pokemon", "Pikachu", "eevee"]
+    assert items[0]["data"]["name"] == "pikachu" and items[2]["data"] == items[0]["data"]
+    assert "error" in items[1] and "data" not in items[1]
+    assert items[3]["data"]["name"] == "eevee"
+
+
+def test_move_batch_accepts_plain_list():
+    items = client.post("/resources/move/batch", json=["thunderbolt", "tackle"]).json()["items"]
+    assert [item["data"]["name"] for item in items] == ["thunderbolt", "tackle"]
+
+
+def test_batch_rejects_bad_payloads():
+    assert client.post("/resources/pokemon/batch", json={"names": "pikachu"}).status_code == 400
+    assert client.post("/resources/pokemon/batch", json=["pikachu"] * 201).status_code == 400
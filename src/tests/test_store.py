@@ -0,0 +1,76 @@
+import sys, os, json, threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import pytest
+from src.pokemon.models import PokemonResource, MoveShort
+from src.pokemon.store import ResourceStore
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+
+
+def _pokemon(id, name, types, speed, moves=()):
+    return PokemonResource(
+        id=id, name=name, types=types,
+        base_stats={"hp": 50, "attack": 50, "defense": 50, "special_attack": 50, "special_defense": 50, "speed": speed},
+        abilities=["blaze"], moves=list(moves), evolution_chain=[], height=1, weight=1, sprite_url=None,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResourceStore(str(tmp_path / "pokemon.db"))
+
+
+def test_import_roundtrip(store):
+    assert store.import_json_dir(DATA_DIR) == 2
+    with open(os.path.join(DATA_DIR, "pikachu.json")) as f:
+        expected = PokemonResource(**json.load(f))
+    assert store.get_pokemon("pikachu") == expected
+    assert store.get_pokemon(25) == expected
+    assert store.get_move("mega-punch").power == 80
+    assert sorted(store.names()) == ["eevee", "pikachu"]
+
+
+def test_filtered_query(store):
+    store.import_resources([
+        _pokemon(4, "charmander", ["fire"], 65),
+        _pokemon(78, "rapidash", ["fire"], 105),
+        _pokemon(135, "jolteon", ["electric"], 130),
+        _pokemon(146, "moltres", ["fire", "flying"], 90),
+    ])
+    fast_fire = store.query_pokemon(type="fire", min_stats={"speed": 101})
+    assert [p.name for p in fast_fire] == ["rapidash"]
+    assert [p.name for p in store.query_pokemon(type="flying")] == ["moltres"]
+    assert store.query_pokemon(type="flying")[0].types == ["fire", "flying"]
+
+
+def test_placeholder_moves_are_not_stored(store):
+    placeholder = MoveShort(name="mystery", type=None, power=None, accuracy=None, pp=None,
+                            damage_class=None, short_effect=None, move_resource_uri="/resources/move/mystery")
+    store.put_pokemon(_pokemon(1, "bulbasaur", ["grass"], 45, moves=[placeholder]))
+    assert store.get_move("mystery") is None
+    assert store.get_pokemon("bulbasaur").moves == [placeholder]
+
+
+def test_concurrent_writes(store):
+    def write(start):
+        for i in range(start, start + 20):
+            store.put_pokemon(_pokemon(i, f"mon-{i}", ["normal"], i))
+    threads = [threading.Thread(target=write, args=(n * 20 + 1,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.count() == 80
+
+
+def test_matchup_results_are_capped(store):
+    def rows(tag):
+        return [{"fp1": f"{tag}{i}", "fp2": f"{tag}{i + 1}", "level": 50, "max_turns": 200,
+                 "winner": 1, "turns": 3, "hp1": 10, "hp2": 0} for i in range(3)]
+    for tag in "abc":
+        store.put_matchup_results(rows(tag), max_rows=4)
+    fps = [f"{tag}{i}" for tag in "abc" for i in range(4)]
+    # Rows written together are kept together: the oldest chunk went, the newest two stayed.
+    assert {fp1[0] for fp1, _ in store.get_matchup_results(fps, 50, 200)} == {"b", "c"}
+    assert store.prune_matchup_results(3) == 3
+    assert len(store.get_matchup_results(fps, 50, 200)) == 3
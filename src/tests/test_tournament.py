@@ -0,0 +1,80 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import threading
+import pytest
+from src.pokemon.models import PokemonResource, MoveShort
+from src.pokemon.store import ResourceStore
+from src.battle.simulator import simulate_battle
+from src.battle.tournament import run_tournament, elo_ratings, ELO_START, TournamentCancelled
+
+
+def _move(name, type, power):
+    return MoveShort(name=name, type=type, power=power, accuracy=100, pp=10, damage_class="physical",
+                     short_effect=None, move_resource_uri=f"/resources/move/{name}")
+
+
+def _mon(name, types, moves, hp=60, speed=50, attack=60):
+    return PokemonResource(
+        id=1, name=name, types=types, abilities=[], moves=moves, evolution_chain=[],
+        base_stats={"hp": hp, "attack": attack, "defense": 60, "special_attack": 55,
+                    "special_defense": 65, "speed": speed},
+        height=None, weight=None, sprite_url=None,
+    )
+
+
+ROSTER = [
+    _mon("charmander", ["fire"], [_move("ember", "fire", 40)], speed=65),
+    _mon("squirtle", ["water"], [_move("water-gun", "water", 40)], speed=43),
+    _mon("bulbasaur", ["grass"], [_move("vine-whip", "grass", 45)], speed=45),
+    _mon("snorlax", ["normal"], [_move("body-slam", "normal", 85)], hp=160, speed=30, attack=110),
+    _mon("ditto", ["normal"], [], hp=48, speed=48),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResourceStore(str(tmp_path / "pokemon.db"))
+
+
+def test_matrix_matches_scalar_simulator(store):
+    result = run_tournament(ROSTER, store=store, parallel=False)
+    matrix = result["matrix"]
+    assert result["matchups"] == 10 and result["computed"] == 10
+    for i, p1 in enumerate(ROSTER):
+        assert matrix[i][i] is None
+        for j in range(i + 1, len(ROSTER)):
+            side = simulate_battle(p1, ROSTER[j], deterministic=True, log_level="none")["winner_side"]
+            assert matrix[i][j] == {"p1": 1.0, "p2": 0.0, "draw": 0.5}[side]
+            assert matrix[j][i] == 1.0 - matrix[i][j]
+    ranks = result["rankings"]
+    assert [r["rank"] for r in ranks] == [1, 2, 3, 4, 5]
+    assert all(r["wins"] + r["losses"] + r["draws"] == 4 for r in ranks)
+
+
+def test_rerun_only_computes_changed_pairs(store):
+    events = []
+    first = run_tournament(ROSTER, store=store, parallel=False)
+    again = run_tournament(ROSTER, store=store, parallel=False, progress=lambda d, t: events.append((d, t)))
+    assert again["computed"] == 0 and again["reused"] == 10
+    assert again["matrix"] == first["matrix"]
+    assert events == [(10, 10)]
+
+    # A data change invalidates only that Pokémon's pairs.
+    changed = ROSTER[:3] + [ROSTER[3].model_copy(update={"base_stats": {**ROSTER[3].base_stats, "speed": 99}})] + ROSTER[4:]
+    third = run_tournament(changed, store=store, parallel=False)
+    assert third["computed"] == 4 and third["reused"] == 6
+
+
+def test_cancelled_tournament_stops(store):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(TournamentCancelled):
+        run_tournament(ROSTER, store=store, parallel=False, cancel=cancel)
+    # Nothing was simulated, so nothing was stored.
+    assert run_tournament(ROSTER, store=store, parallel=False)["computed"] == 10
+
+
+def test_elo_is_zero_sum():
+    ratings = elo_ratings(["a", "b", "c"], [(0, 1, 1.0), (0, 2, 0.5), (1, 2, 0.0)])
+    assert ratings[0] > ELO_START > ratings[1]
+    assert sum(ratings) == pytest.approx(3 * ELO_START)
@@ -0,0 +1,68 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import pytest
+from src.pokemon.models import PokemonResource, MoveShort
+from src.battle.simulator import simulate_battle, load_pokemon
+from src.battle.montecarlo import run_batch
+from src.battle import vectorized
+
+
+def _move(name, type, power, damage_class="physical"):
+    return MoveShort(name=name, type=type, power=power, accuracy=100, pp=10, damage_class=damage_class,
+                     short_effect=None, move_resource_uri=f"/resources/move/{name}")
+
+
+def _mon(name, types, moves, hp=60, speed=50, attack=60, defense=60):
+    return PokemonResource(
+        id=1, name=name, types=types, abilities=[], moves=moves, evolution_chain=[],
+        base_stats={"hp": hp, "attack": attack, "defense": defense, "special_attack": 55,
+                    "special_defense": 65, "speed": speed},
+        height=None, weight=None, sprite_url=None,
+    )
+
+
+GENGAR = _mon("gengar", ["ghost"], [_move("lick", "ghost", 30), _move("night-shade", "ghost", None)], speed=110)
+SNORLAX = _mon("snorlax", ["normal"], [_move("body-slam", "normal", 85)], hp=160, speed=30, attack=110)
+MAGIKARP = _mon("magikarp", ["water"], [_move("splash", "normal", None)], hp=20, speed=80)
+DITTO = _mon("ditto", ["normal"], [], hp=48, speed=48)
+TANK = _mon("tank", ["steel"], [_move("tap", "normal", 1)], hp=250, speed=48, defense=250)
+
+
+def _pairs():
+    pikachu, eevee = load_pokemon("pikachu"), load_pokemon("eevee")
+    return [(pikachu, eevee), (eevee, pikachu), (pikachu, pikachu), (GENGAR, SNORLAX),
+            (SNORLAX, GENGAR), (MAGIKARP, eevee), (DITTO, TANK), (TANK, TANK)]
+
+
+@pytest.mark.parametrize("max_turns", [5, 200])
+def test_deterministic_parity_with_scalar(max_turns):
+    pairs = _pairs()
+    res = vectorized.run_arrays(vectorized.build_arrays(pairs), deterministic=True, max_turns=max_turns)
+    sides = {vectorized.P1: "p1", vectorized.P2: "p2", vectorized.DRAW: "draw"}
+    for i, (p1, p2) in enumerate(pairs):
+        scalar = simulate_battle(p1, p2, deterministic=True, max_turns=max_turns, log_level="none")
+        assert sides[int(res["winner"][i])] == scalar["winner_side"], (p1.name, p2.name)
+        assert int(res["turns"][i]) == scalar["turns"]
+        assert res["hp"][i].tolist() == [scalar["final_states"]["p1"]["current_hp"],
+                                         scalar["final_states"]["p2"]["current_hp"]]
+
+
+def test_stochastic_rates_match_scalar():
+    p1, p2 = load_pokemon("pikachu"), load_pokemon("eevee")
+    scalar = run_batch(p1, p2, n=4000, seed=11, parallel=False)
+    fast = run_batch(p1, p2, n=4000, seed=11, engine="vectorized")
+    for side in ("p1", "p2", "draw"):
+        assert abs(scalar["outcomes"][side]["rate"] - fast["outcomes"][side]["rate"]) < 0.04
+    assert abs(scalar["turns"]["mean"] - fast["turns"]["mean"]) < 0.1
+    assert run_batch(p1, p2, n=4000, seed=11, engine="vectorized") == fast
+
+
+def test_status_effects():
+    # Poisoned magikarp loses 20 // 8 = 2 HP at the end of each turn; nobody deals damage.
+    res = vectorized.simulate_many(DITTO, MAGIKARP, 3, deterministic=True, max_turns=3,
+                                   statuses=([], ["poison"]))
+    assert res["hp"][:, 1].tolist() == [14, 14, 14]
+    # A paralyzed attacker never moves in deterministic mode.
+    res = vectorized.simulate_many(SNORLAX, DITTO, 1, deterministic=True, max_turns=4,
+                                   statuses=(["paralysis"], []))
+    assert res["hp"][0, 1] == DITTO.base_stats["hp"]